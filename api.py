@@ -0,0 +1,408 @@
+import argparse
+import asyncio
+import contextvars
+import json
+import re
+import secrets
+import threading
+import traceback
+from collections import namedtuple
+from urllib.parse import parse_qs, urlsplit
+
+from async_database import AsyncDatabase
+from services import AuthError, NotFound, ServiceError
+
+HOST = "127.0.0.1"
+PORT = 8080
+WORKERS = 16                 # service calls running at once; the rest queue
+MAX_BODY = 1024 * 1024
+READ_TIMEOUT = 30            # seconds a client may take to send a request
+REQUEST_TIMEOUT = 30         # default and upper bound for X-Request-Timeout
+DISCONNECT_POLL = 0.05       # seconds between hang-up checks while a request runs
+
+JOB_FIELDS = ("id", "title", "description", "budget", "category", "client_email")
+CLIENT_JOB_FIELDS = ("id", "title", "budget", "category", "applicants")
+USER_FIELDS = ("id", "fullname", "email", "role")
+APPLICATION_FIELDS = ("job_id", "job_title", "freelancer_email", "freelancer_name", "skills")
+APPLICANT_FIELDS = ("freelancer_email", "freelancer_name", "skills")
+
+STATUS_TEXT = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request",
+               401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large",
+               500: "Internal Server Error", 504: "Gateway Timeout"}
+
+# time budget of the request being handled, in seconds
+request_timeout = contextvars.ContextVar("request_timeout", default=REQUEST_TIMEOUT)
+
+Request = namedtuple("Request", "method path query headers body params session")
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def records(rows, fields):
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def jobs_page(rows, offset=None):
+    # keyset paging: pass next_after_id back as after_id for the next page;
+    # sorted results page by offset instead (next_offset)
+    page = {"jobs": records(rows, JOB_FIELDS), "next_after_id": rows[-1][0] if rows else None}
+    if offset is not None:
+        page["next_offset"] = offset + len(rows)
+    return page
+
+
+class Sessions:
+    """Bearer tokens of logged-in users, kept in memory."""
+
+    def __init__(self):
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def create(self, session):
+        token = secrets.token_urlsafe(24)
+        with self._lock:
+            self._tokens[token] = session
+        return token
+
+    def get(self, token):
+        with self._lock:
+            return self._tokens.get(token)
+
+    def drop(self, token):
+        with self._lock:
+            self._tokens.pop(token, None)
+
+
+class Api:
+    """HTTP/1.1 JSON API over Services, served with asyncio.
+
+    Each connection is its own task, so slow clients never hold up others.
+    Service calls go through AsyncDatabase: at most `workers` run at once,
+    each is bounded by the request's timeout, and a client that hangs up
+    gets its in-flight query cancelled.
+    """
+
+    def __init__(self, services, workers=WORKERS, timeout=REQUEST_TIMEOUT):
+        self.services = services
+        self.sessions = Sessions()
+        self.timeout = timeout
+        self.db = AsyncDatabase(services.db, max_workers=workers, timeout=timeout)
+        self.routes = []
+        route = self.routes.append
+        route(("POST", r"/register", self.register))
+        route(("POST", r"/login", self.login))
+        route(("POST", r"/logout", self.logout))
+        route(("GET", r"/jobs", self.browse_jobs))
+        route(("GET", r"/jobs/search", self.search_jobs))
+        route(("GET", r"/jobs/facets", self.job_facets))
+        route(("GET", r"/jobs/recommended", self.recommend_jobs))
+        route(("POST", r"/jobs", self.post_job))
+        route(("DELETE", r"/jobs/(?P<job_id>\d+)", self.delete_job))
+        route(("GET", r"/jobs/(?P<job_id>\d+)/applicants", self.applicants))
+        route(("GET", r"/my/jobs", self.client_jobs))
+        route(("POST", r"/applications", self.apply))
+        route(("GET", r"/admin/users", self.list_users))
+        route(("PUT", r"/admin/users/(?P<user_id>\d+)", self.update_user))
+        route(("DELETE", r"/admin/users/(?P<user_id>\d+)", self.delete_user))
+        route(("GET", r"/admin/applications", self.all_applications))
+        route(("GET", r"/metrics", self.metrics))
+        self.routes = [(method, re.compile(pattern + "$"), handler)
+                       for method, pattern, handler in self.routes]
+
+    @property
+    def instrumentation(self):
+        return getattr(self.services.db, "instrumentation", None)
+
+    async def call(self, fn, *args, **kwargs):
+        if self.instrumentation is not None:
+            # one trace per service call, e.g. "login" -> its queries
+            fn = self.instrumentation.traced(fn.__name__, fn)
+        return await self.db.run(fn, *args, timeout=request_timeout.get(), **kwargs)
+
+    # ------------------------------
+    # Handlers
+    # ------------------------------
+    async def register(self, req):
+        b = req.body
+        session = await self.call(self.services.register, b.get("fullname"), b.get("email"),
+                                  b.get("password"), b.get("role"))
+        return 201, {"email": session.email, "role": session.role}
+
+    async def login(self, req):
+        b = req.body
+        session = await self.call(self.services.login, b.get("email"), b.get("password"),
+                                  b.get("role"))
+        token = self.sessions.create(session)
+        return 200, {"token": token, "email": session.email, "role": session.role}
+
+    async def logout(self, req):
+        self.sessions.drop(self.token_from(req.headers))
+        return 204, None
+
+    async def browse_jobs(self, req):
+        q = req.query
+        rows = await self.call(self.services.browse_jobs, int(q.get("after_id", 0)), q.get("limit"))
+        return 200, jobs_page(rows)
+
+    async def search_jobs(self, req):
+        q = req.query
+        offset = int(q.get("offset", 0))
+        rows = await self.call(self.services.search_jobs, q.get("q"), q.get("category"),
+                               int(q.get("after_id", 0)) or None, q.get("limit"),
+                               q.get("min_budget"), q.get("max_budget"), q.get("sort"), offset)
+        return 200, jobs_page(rows, offset if q.get("sort") else None)
+
+    async def job_facets(self, req):
+        facets = await self.call(self.services.job_facets, req.query.get("q"))
+        return 200, {"total": facets["total"], "categories": facets["categories"],
+                     "budgets": [{"min": low, "max": high, "count": count}
+                                 for low, high, count in facets["budgets"]]}
+
+    async def recommend_jobs(self, req):
+        q = req.query
+        rows = await self.call(self.services.recommend_jobs, q.get("skills"),
+                               int(q.get("k", 50)), req.session)
+        return 200, {"jobs": records(rows, JOB_FIELDS)}
+
+    async def post_job(self, req):
+        b = req.body
+        job_id = await self.call(self.services.post_job, req.session, b.get("title"),
+                                 b.get("description"), b.get("budget"), b.get("category"))
+        return 201, {"id": job_id}
+
+    async def delete_job(self, req):
+        await self.call(self.services.delete_job, req.session, int(req.params["job_id"]))
+        return 204, None
+
+    async def applicants(self, req):
+        rows = await self.call(self.services.applicants, req.session, int(req.params["job_id"]))
+        return 200, {"applicants": records(rows, APPLICANT_FIELDS)}
+
+    async def client_jobs(self, req):
+        rows = await self.call(self.services.client_jobs, req.session)
+        return 200, {"jobs": records(rows, CLIENT_JOB_FIELDS)}
+
+    async def apply(self, req):
+        b = req.body
+        ids = await self.call(self.services.apply, req.session, b.get("job_ids") or [],
+                              b.get("name"), b.get("skills"))
+        return 201, {"ids": ids}
+
+    async def list_users(self, req):
+        rows = await self.call(self.services.list_users, req.session)
+        return 200, {"users": records(rows, USER_FIELDS)}
+
+    async def update_user(self, req):
+        b = req.body
+        await self.call(self.services.update_user, req.session, int(req.params["user_id"]),
+                        b.get("fullname"), b.get("email"), b.get("password"), b.get("role"))
+        return 204, None
+
+    async def delete_user(self, req):
+        await self.call(self.services.delete_user, req.session, int(req.params["user_id"]))
+        return 204, None
+
+    async def all_applications(self, req):
+        rows = await self.call(self.services.all_applications, req.session)
+        return 200, {"applications": records(rows, APPLICATION_FIELDS)}
+
+    async def metrics(self, req):
+        # Prometheus scrape target; only there when instrumentation is on
+        if self.instrumentation is None:
+            raise HttpError(404, "Metrics are not enabled (set FJMS_METRICS=1)")
+        return 200, self.instrumentation.metrics.to_prometheus()
+
+    # ------------------------------
+    # HTTP plumbing
+    # ------------------------------
+    async def dispatch(self, method, target, headers, raw_body):
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        allowed = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(url.path)
+            if not match:
+                continue
+            allowed = True
+            if route_method != method:
+                continue
+            try:
+                body = json.loads(raw_body) if raw_body else {}
+            except ValueError:
+                raise HttpError(400, "Request body must be JSON")
+            if not isinstance(body, dict):
+                raise HttpError(400, "Request body must be a JSON object")
+            session = self.sessions.get(self.token_from(headers))
+            return await handler(Request(method, url.path, query, headers, body,
+                                         match.groupdict(), session))
+        if allowed:
+            raise HttpError(405, f"{method} not allowed on {url.path}")
+        raise HttpError(404, f"No route for {url.path}")
+
+    def timeout_for(self, headers):
+        # clients may ask for a shorter budget, never a longer one
+        try:
+            requested = float(headers.get("x-request-timeout", self.timeout))
+        except ValueError:
+            raise HttpError(400, "X-Request-Timeout must be a number of seconds")
+        return max(0.001, min(requested, self.timeout))
+
+    async def respond(self, method, target, headers, raw_body):
+        try:
+            request_timeout.set(self.timeout_for(headers))
+            return await self.dispatch(method, target, headers, raw_body)
+        except asyncio.TimeoutError:
+            return 504, {"error": "The request took too long and was cancelled"}
+        except HttpError as e:
+            return e.status, {"error": str(e)}
+        except AuthError as e:
+            return (403 if self.sessions.get(self.token_from(headers)) else 401), {"error": str(e)}
+        except NotFound as e:
+            return 404, {"error": str(e)}
+        except (ServiceError, ValueError) as e:
+            return 400, {"error": str(e)}
+        except Exception:
+            traceback.print_exc()
+            return 500, {"error": "Internal error"}
+
+    @staticmethod
+    def token_from(headers):
+        auth = headers.get("authorization", "")
+        return auth[7:].strip() if auth.lower().startswith("bearer ") else None
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self.read_request(reader)
+                if request is None:
+                    break
+                method, target, version, headers, raw_body = request
+                task = asyncio.ensure_future(self.respond(method, target, headers, raw_body))
+                if not await self.finished_unless_hung_up(task, reader):
+                    break
+                status, payload = task.result()
+                keep_alive = (version == "HTTP/1.1"
+                              and headers.get("connection", "").lower() != "close")
+                await self.write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except HttpError as e:
+            await self.write_response(writer, e.status, {"error": str(e)}, False)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            pass    # client went away or stalled
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def finished_unless_hung_up(task, reader):
+        # the client closing its end shows up as EOF on the reader; stop
+        # working for it (cancelling its queries) instead of finishing
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL)
+            if done:
+                return True
+            if reader.at_eof():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+                return False
+
+    @staticmethod
+    async def read_request(reader):
+        line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+        if not line.strip():
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0) or 0)
+        if length > MAX_BODY:
+            raise HttpError(413, "Request body too large")
+        body = await asyncio.wait_for(reader.readexactly(length), READ_TIMEOUT) if length else b""
+        return method.upper(), target, version, headers, body
+
+    @staticmethod
+    async def write_response(writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = b"" if payload is None else json.dumps(payload, default=str).encode("utf-8")
+            content_type = "application/json"
+        head = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+                f"Content-Length: {len(body)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if body:
+            head.append(f"Content-Type: {content_type}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host=HOST, port=PORT):
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self):
+        self.db.close()
+
+
+def build_services():
+    from cache import cached
+    from database import Database
+    from indexer import Indexer
+    from instrumentation import from_config
+    from services import Services
+
+    db = cached(from_config(Database()))
+    indexer = Indexer(db)
+    engine = []
+    lock = threading.Lock()
+
+    def get_matcher():
+        with lock:
+            if not engine:
+                engine.append(indexer.start())
+            return engine[0]
+
+    return Services(db, get_matcher), indexer
+
+
+async def run(host, port, workers):
+    services, indexer = build_services()
+    api = Api(services, workers)
+    server = await api.serve(host, port)
+    print(f"FJMS API listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        api.close()
+        indexer.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FJMS HTTP JSON API")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(run(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from database import CancelScope
+
+MAX_WORKERS = 8        # statements in flight at once; more callers wait their turn
+DEFAULT_TIMEOUT = 30   # seconds per call unless the caller says otherwise
+
+
+class AsyncDatabase:
+    """Coroutine counterpart of Database for asyncio code such as api.py.
+
+    Every Database method is available as a coroutine with the same name
+    and arguments (await adb.search_jobs("python")). Calls run on a
+    bounded thread pool, so a thousand waiting requests still use at most
+    max_workers threads and connections. A call that times out or whose
+    task is cancelled (e.g. the HTTP client hung up) has its running
+    statement cancelled on the server, and is dropped unstarted if it was
+    still queued.
+    """
+
+    def __init__(self, db, max_workers=MAX_WORKERS, timeout=DEFAULT_TIMEOUT):
+        self.db = db
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="fjms-db")
+
+    def __getattr__(self, name):
+        attr = getattr(self.db, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, timeout=None, **kwargs):
+            return await self.run(attr, *args, timeout=timeout, **kwargs)
+        call.__name__ = name
+        return call
+
+    async def run(self, fn, *args, timeout=None, **kwargs):
+        """Run fn(*args, **kwargs), which may make several Database calls,
+        on the pool under one cancel scope."""
+        scope = CancelScope()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self.executor, functools.partial(self._run_scoped, scope, fn, args, kwargs))
+        try:
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            scope.cancel()
+            raise
+
+    def _run_scoped(self, scope, fn, args, kwargs):
+        with self.db.cancel_scope(scope):
+            return fn(*args, **kwargs)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
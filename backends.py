@@ -0,0 +1,313 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+
+SQLSERVER_CONNECTION_STRING = (
+    'DRIVER={ODBC Driver 18 for SQL Server};'
+    'SERVER=DESKTOP-63LBVQG\\SQLEXPRESS;'
+    'DATABASE=FreelancerDB;'
+    'Trusted_Connection=yes;'
+    'Encrypt=no;'
+)
+
+SQLITE_PATH = "fjms.db"
+
+# SQLSTATEs pyodbc reports when the link to the server has gone away
+DISCONNECT_STATES = ("08S01", "08003", "08001", "08004", "08007")
+
+
+def fulltext_words(keyword):
+    return [w for w in (w.replace('"', "") for w in keyword.split()) if w]
+
+
+def escape_like(text):
+    for ch in ("\\", "%", "_", "["):
+        text = text.replace(ch, "\\" + ch)
+    return text
+
+
+def like_clause(keyword):
+    pattern = f"%{escape_like(keyword)}%"
+    return "(title LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\')", [pattern, pattern]
+
+
+def returning_columns(returning):
+    return (returning,) if isinstance(returning, str) else tuple(returning)
+
+
+def values_list(columns, rows=1):
+    # "(?, ?), (?, ?)" for a multi-row INSERT
+    marks = "(" + ", ".join("?" for _ in columns) + ")"
+    return ", ".join(marks for _ in range(rows))
+
+
+# ------------------------------
+# SQL Server (pyodbc)
+# ------------------------------
+class SqlServerBackend:
+    name = "sqlserver"
+    max_params = 2100     # parameters per statement
+
+    def __init__(self, connection_string=SQLSERVER_CONNECTION_STRING):
+        self.connection_string = connection_string
+        self.location = connection_string     # identifies the database for schema markers
+        self.fulltext_enabled = False
+
+    def connect(self):
+        import pyodbc
+        return pyodbc.connect(self.connection_string)
+
+    @staticmethod
+    def is_disconnect(exc):
+        return bool(getattr(exc, "args", None)) and str(exc.args[0]) in DISCONNECT_STATES
+
+    @staticmethod
+    def cancel(conn, cur):
+        # SQLCancel: safe to call from another thread, the running
+        # statement fails with HY008 and the connection stays usable
+        cur.cancel()
+
+    # ---- schema (tables and indexes live in migrations.py)
+    def create_fulltext(self, db):
+        # full-text DDL cannot run inside a user transaction, so switch to
+        # autocommit for the duration. Express editions without full-text
+        # search simply fall back to LIKE matching in search_jobs.
+        with db.pool.connection() as conn:
+            try:
+                conn.autocommit = True
+                cur = conn.cursor()
+                cur.execute("""
+                    IF FULLTEXTSERVICEPROPERTY('IsFullTextInstalled') = 1
+                       AND NOT EXISTS (SELECT * FROM sys.fulltext_indexes
+                                       WHERE object_id = OBJECT_ID('Jobs'))
+                    BEGIN
+                        IF NOT EXISTS (SELECT * FROM sys.fulltext_catalogs WHERE name='FJMSCatalog')
+                            CREATE FULLTEXT CATALOG FJMSCatalog;
+
+                        DECLARE @pk SYSNAME = (SELECT name FROM sys.indexes
+                                               WHERE object_id = OBJECT_ID('Jobs') AND is_primary_key = 1);
+                        EXEC('CREATE FULLTEXT INDEX ON Jobs(title, description) KEY INDEX '
+                             + QUOTENAME(@pk) + ' ON FJMSCatalog WITH CHANGE_TRACKING AUTO');
+                    END
+                """)
+                cur.execute("""
+                    SELECT COUNT(*) FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('Jobs')
+                """)
+                return cur.fetchone()[0] > 0
+            except Exception:
+                return False
+            finally:
+                conn.autocommit = False
+
+    @staticmethod
+    @contextmanager
+    def migration(conn):
+        # T-SQL DDL is transactional: the statements commit or roll back together
+        cur = conn.cursor()
+        try:
+            yield cur
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+    # ---- dialect
+    def keyword_clause(self, keyword):
+        words = fulltext_words(keyword)
+        # a keyword of quotes only leaves no terms, and CONTAINS rejects ''
+        if self.fulltext_enabled and words:
+            # every word must match, each as a prefix term: "pyth*" AND "dev*"
+            terms = " AND ".join(f'"{w}*"' for w in words)
+            return "CONTAINS((title, description), ?)", [terms]
+        return like_clause(keyword)
+
+    @staticmethod
+    def limit_clause(limit, offset=0):
+        # needs an ORDER BY in front of it
+        if limit is not None:
+            return " OFFSET ? ROWS FETCH NEXT ? ROWS ONLY", [offset or 0, limit]
+        if offset:
+            return " OFFSET ? ROWS", [offset]
+        return "", []
+
+    @staticmethod
+    def insert_returning(table, columns, returning="id", rows=1):
+        cols = ", ".join(columns)
+        output = ", ".join(f"INSERTED.{c}" for c in returning_columns(returning))
+        return f"INSERT INTO {table}({cols}) OUTPUT {output} VALUES {values_list(columns, rows)}"
+
+    @staticmethod
+    def insert_ordered_returning(table, columns, rows=1):
+        # INSERT ... SELECT ... ORDER BY assigns IDENTITY values in that
+        # order, so the returned ids sorted line up with the rows as given
+        cols = ", ".join(columns)
+        marks = ", ".join(f"({', '.join('?' for _ in columns)}, {n})" for n in range(rows))
+        return (f"INSERT INTO {table}({cols}) OUTPUT INSERTED.id "
+                f"SELECT {cols} FROM (VALUES {marks}) AS v({cols}, ordinal) ORDER BY ordinal")
+
+    @staticmethod
+    def prepare_bulk(cur):
+        # send executemany parameters as one array instead of a round trip per row
+        cur.fast_executemany = True
+
+    @staticmethod
+    def delete_returning(table, where, returning):
+        return f"DELETE FROM {table} OUTPUT DELETED.{returning} WHERE {where}"
+
+
+# ------------------------------
+# SQLite (embedded)
+# ------------------------------
+class SqliteBackend:
+    name = "sqlite"
+    max_params = 32766    # SQLITE_MAX_VARIABLE_NUMBER since 3.32
+
+    # WAL lets readers run alongside the single writer; NORMAL sync is
+    # durable across application crashes and much cheaper than FULL
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA foreign_keys=ON",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-65536",        # 64 MB page cache per connection
+        "PRAGMA mmap_size=268435456",      # 256 MB memory-mapped reads
+        "PRAGMA busy_timeout=5000",
+    )
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self.location = os.path.abspath(path)
+        self.fulltext_enabled = False
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @staticmethod
+    def is_disconnect(exc):
+        return False      # embedded, nothing to lose a link to
+
+    @staticmethod
+    def cancel(conn, cur):
+        conn.interrupt()  # the running statement fails with "interrupted"
+
+    # ---- schema (tables and indexes live in migrations.py)
+    def create_fulltext(self, db):
+        # external-content FTS5 table kept in sync with Jobs by triggers
+        try:
+            with db._cursor(commit=True) as cur:
+                cur.execute("SELECT 1 FROM sqlite_master WHERE name='JobsFTS'")
+                exists = cur.fetchone() is not None
+
+                cur.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS JobsFTS
+                    USING fts5(title, description, content='Jobs', content_rowid='id')
+                """)
+                cur.execute("""
+                    CREATE TRIGGER IF NOT EXISTS Jobs_fts_insert AFTER INSERT ON Jobs BEGIN
+                        INSERT INTO JobsFTS(rowid, title, description)
+                        VALUES (new.id, new.title, new.description);
+                    END
+                """)
+                cur.execute("""
+                    CREATE TRIGGER IF NOT EXISTS Jobs_fts_delete AFTER DELETE ON Jobs BEGIN
+                        INSERT INTO JobsFTS(JobsFTS, rowid, title, description)
+                        VALUES ('delete', old.id, old.title, old.description);
+                    END
+                """)
+                cur.execute("""
+                    CREATE TRIGGER IF NOT EXISTS Jobs_fts_update AFTER UPDATE ON Jobs BEGIN
+                        INSERT INTO JobsFTS(JobsFTS, rowid, title, description)
+                        VALUES ('delete', old.id, old.title, old.description);
+                        INSERT INTO JobsFTS(rowid, title, description)
+                        VALUES (new.id, new.title, new.description);
+                    END
+                """)
+                if not exists:
+                    # index rows that were there before the FTS table
+                    cur.execute("INSERT INTO JobsFTS(JobsFTS) VALUES ('rebuild')")
+            return True
+        except Exception:
+            return False     # SQLite built without FTS5: LIKE fallback
+
+    @staticmethod
+    @contextmanager
+    def migration(conn):
+        # table rebuilds need foreign key enforcement off, which can only
+        # be switched outside a transaction; sqlite3 does not open one for
+        # DDL on its own, hence the explicit BEGIN
+        conn.execute("PRAGMA foreign_keys=OFF")
+        cur = conn.cursor()
+        try:
+            cur.execute("BEGIN")
+            yield cur
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.execute("PRAGMA foreign_keys=ON")
+
+    # ---- dialect
+    def keyword_clause(self, keyword):
+        words = fulltext_words(keyword)
+        # a keyword of quotes only leaves no terms, an FTS5 syntax error
+        if self.fulltext_enabled and words:
+            # FTS5 spelling of the same query: "pyth"* "dev"*
+            terms = " ".join(f'"{w}"*' for w in words)
+            return "id IN (SELECT rowid FROM JobsFTS WHERE JobsFTS MATCH ?)", [terms]
+        return like_clause(keyword)
+
+    @staticmethod
+    def limit_clause(limit, offset=0):
+        if limit is not None:
+            return " LIMIT ? OFFSET ?", [limit, offset or 0]
+        if offset:
+            return " LIMIT -1 OFFSET ?", [offset]
+        return "", []
+
+    @staticmethod
+    def insert_returning(table, columns, returning="id", rows=1):
+        cols = ", ".join(columns)
+        output = ", ".join(returning_columns(returning))
+        return f"INSERT INTO {table}({cols}) VALUES {values_list(columns, rows)} RETURNING {output}"
+
+    @staticmethod
+    def insert_ordered_returning(table, columns, rows=1):
+        # a multi-row VALUES inserts its rows in order, so ids ascend with them
+        return SqliteBackend.insert_returning(table, columns, "id", rows)
+
+    @staticmethod
+    def prepare_bulk(cur):
+        pass      # sqlite3 executemany already runs in-process
+
+    @staticmethod
+    def delete_returning(table, where, returning):
+        return f"DELETE FROM {table} WHERE {where} RETURNING {returning}"
+
+
+BACKENDS = {
+    SqlServerBackend.name: SqlServerBackend,
+    SqliteBackend.name: SqliteBackend,
+}
+
+
+def backend_from_config(env=None):
+    """Pick the storage backend from the environment.
+
+    FJMS_DB_BACKEND      sqlserver (default) or sqlite
+    FJMS_SQLSERVER_DSN   ODBC connection string for SQL Server
+    FJMS_SQLITE_PATH     database file for SQLite (default fjms.db)
+    """
+    env = os.environ if env is None else env
+    name = env.get("FJMS_DB_BACKEND", SqlServerBackend.name).strip().lower()
+    if name == SqliteBackend.name:
+        return SqliteBackend(env.get("FJMS_SQLITE_PATH", SQLITE_PATH))
+    if name == SqlServerBackend.name:
+        return SqlServerBackend(env.get("FJMS_SQLSERVER_DSN", SQLSERVER_CONNECTION_STRING))
+    raise Exception(f"Unknown database backend '{name}' (expected one of: {', '.join(BACKENDS)})")
@@ -0,0 +1,180 @@
+import math
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:     # only the admin match report needs numpy
+    np = None
+
+from matching import TITLE_BOOST, tokenize
+
+
+class SparseRows:
+    """CSR-style sparse matrix: row i owns data[indptr[i]:indptr[i+1]]."""
+
+    def __init__(self, indptr, indices, data, n_cols):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.n_cols = n_cols
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def dense(self, start, stop):
+        # rows [start, stop) as a dense float32 block
+        lo, hi = self.indptr[start], self.indptr[stop]
+        block = np.zeros((stop - start, self.n_cols), dtype=np.float32)
+        rows = np.repeat(np.arange(stop - start), np.diff(self.indptr[start:stop + 1]))
+        block[rows, self.indices[lo:hi]] = self.data[lo:hi]
+        return block
+
+
+class BatchMatcher:
+    """Scores every job against every applicant in one vectorized pass.
+
+    Job texts and freelancer skills are encoded as L2-normalised TF-IDF
+    rows over their shared vocabulary, so the block products J @ A.T are
+    cosine similarities. Applicant blocks are densified one at a time and
+    the job blocks scored against each run in parallel on a thread pool
+    (numpy releases the GIL inside matmul). Block sizes are derived from
+    memory_budget_mb so the dense working set stays within it, however
+    many jobs and applicants and workers there are.
+    """
+
+    def __init__(self, k=5, memory_budget_mb=256, workers=None):
+        if np is None:
+            raise Exception("The match report needs numpy (pip install numpy)")
+        self.k = k
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.workers = workers or os.cpu_count() or 1
+        self.job_ids = []
+        self.job_titles = []
+        self.job_tokens = []
+        self.applicant_keys = []
+        self.applicant_tokens = []
+        self._applicant_index = {}
+
+    @classmethod
+    def from_database(cls, db, page_size=1000, **kwargs):
+        matcher = cls(**kwargs)
+        after_id = 0
+        while True:
+            rows = db.get_jobs_page(after_id, page_size)
+            for r in rows:
+                matcher.add_job(r[0], r[1], r[2])
+            if len(rows) < page_size:
+                break
+            after_id = rows[-1][0]
+
+        after_id = 0
+        while True:
+            rows = db.get_applications_page(after_id, page_size)
+            for app_id, job_id, email, name, skills in rows:
+                matcher.add_applicant(email, skills)
+            if len(rows) < page_size:
+                break
+            after_id = rows[-1][0]
+        return matcher
+
+    def add_job(self, job_id, title, description):
+        self.job_ids.append(job_id)
+        self.job_titles.append(title)
+        self.job_tokens.append(tokenize(title) * TITLE_BOOST + tokenize(description))
+
+    def add_applicant(self, key, skills):
+        # several applications by one freelancer merge into one profile
+        pos = self._applicant_index.get(key)
+        if pos is None:
+            self._applicant_index[key] = len(self.applicant_keys)
+            self.applicant_keys.append(key)
+            self.applicant_tokens.append(tokenize(skills))
+        else:
+            self.applicant_tokens[pos].extend(tokenize(skills))
+
+    # ------------------------------
+    # encoding
+    # ------------------------------
+    def _vocabulary(self):
+        job_df = Counter(t for toks in self.job_tokens for t in set(toks))
+        app_df = Counter(t for toks in self.applicant_tokens for t in set(toks))
+        # terms on only one side can never contribute to a dot product
+        shared = sorted(set(job_df) & set(app_df))
+        n_docs = len(self.job_tokens) + len(self.applicant_tokens)
+        vocab = {t: i for i, t in enumerate(shared)}
+        idf = [math.log((1 + n_docs) / (1 + job_df[t] + app_df[t])) + 1 for t in shared]
+        return vocab, idf
+
+    @staticmethod
+    def _encode(token_lists, vocab, idf):
+        indptr = [0]
+        indices = []
+        data = []
+        for toks in token_lists:
+            counts = Counter(t for t in toks if t in vocab)
+            weights = [(vocab[t], tf * idf[vocab[t]]) for t, tf in counts.items()]
+            norm = math.sqrt(sum(w * w for _, w in weights)) or 1.0
+            for col, w in weights:
+                indices.append(col)
+                data.append(w / norm)
+            indptr.append(len(indices))
+        return SparseRows(np.asarray(indptr, dtype=np.int64),
+                          np.asarray(indices, dtype=np.int64),
+                          np.asarray(data, dtype=np.float32), len(vocab))
+
+    def _block_sizes(self, n_jobs, n_apps, n_cols):
+        floats = self.memory_budget // 4
+        # half the budget for applicant rows, the rest shared by the workers
+        app_rows = max(1, min(n_apps, floats // 2 // max(n_cols, 1)))
+        per_worker = max(1, (floats - app_rows * n_cols) // self.workers)
+        job_rows = max(1, min(n_jobs, per_worker // (n_cols + 2 * app_rows + self.k)))
+        return job_rows, app_rows
+
+    # ------------------------------
+    # scoring
+    # ------------------------------
+    def run(self):
+        """Return {job_id: [(applicant_key, score), ...]} best first."""
+        if not self.job_ids or not self.applicant_keys:
+            return {job_id: [] for job_id in self.job_ids}
+
+        vocab, idf = self._vocabulary()
+        jobs = self._encode(self.job_tokens, vocab, idf)
+        apps = self._encode(self.applicant_tokens, vocab, idf)
+        job_rows, app_rows = self._block_sizes(len(jobs), len(apps), len(vocab))
+
+        # applicant blocks on the outside: each is densified once and shared
+        # by the parallel job blocks, so only one is ever resident; every
+        # job keeps its running top k across the blocks
+        app_bounds = [(s, min(s + app_rows, len(apps))) for s in range(0, len(apps), app_rows)]
+        k = min(self.k, len(apps))
+        best_scores = np.full((len(jobs), k), -1.0, dtype=np.float32)
+        best_idx = np.zeros((len(jobs), k), dtype=np.int64)
+
+        def score_block(start, A, s, e):
+            stop = min(start + job_rows, len(jobs))
+            S = jobs.dense(start, stop) @ A.T
+            scores = np.concatenate([best_scores[start:stop], S], axis=1)
+            idx = np.concatenate([best_idx[start:stop],
+                                  np.broadcast_to(np.arange(s, e), S.shape)], axis=1)
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            # job blocks are disjoint row ranges, so workers never share a row
+            best_scores[start:stop] = np.take_along_axis(scores, top, axis=1)
+            best_idx[start:stop] = np.take_along_axis(idx, top, axis=1)
+
+        starts = range(0, len(jobs), job_rows)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for s, e in app_bounds:
+                A = apps.dense(s, e)
+                list(pool.map(lambda start: score_block(start, A, s, e), starts))
+
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_idx = np.take_along_axis(best_idx, order, axis=1)
+        report = {}
+        for row, job_id in enumerate(self.job_ids):
+            report[job_id] = [(self.applicant_keys[i], float(sc))
+                              for sc, i in zip(best_scores[row], best_idx[row]) if sc > 0]
+        return report
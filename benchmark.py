@@ -0,0 +1,302 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import islice
+
+from backends import SqliteBackend
+from database import Database
+from matching import MatchingEngine
+from services import CATEGORIES
+
+# name -> (users, jobs, applications)
+SCALES = {
+    "small": (200, 1000, 3000),
+    "medium": (2000, 10000, 30000),
+    "large": (20000, 100000, 300000),
+}
+
+# words for titles, descriptions and skills, most common first
+VOCABULARY = (
+    "python developer web design api data react backend frontend writer "
+    "logo mobile android ios sql cloud devops marketing seo content "
+    "translation video editing excel analyst blockchain rust kubernetes "
+    "accounting legal illustration animation unity tensorflow scraping "
+    "wordpress shopify copywriting podcast fortran cobol"
+).split()
+
+SKEW = 1.1          # Zipf exponent for categories, words, clients and popular jobs
+CHUNK_SIZE = 5000   # rows per bulk_insert transaction while loading
+
+
+def zipf_weights(n, s=SKEW):
+    return [1 / (rank ** s) for rank in range(1, n + 1)]
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ------------------------------
+# Synthetic marketplace
+# ------------------------------
+class Marketplace:
+    """A reproducible synthetic marketplace of users, jobs and applications.
+
+    Half the users are clients and half freelancers. Categories, words,
+    the number of jobs per client and the number of applications per job
+    all follow a Zipf distribution, so a few are very popular and most
+    are rare, as on a real job board. The same seed gives the same rows.
+    Rows are generated lazily, in TABLE_COLUMNS order.
+    """
+
+    def __init__(self, users, jobs, applications, seed=0):
+        self.users = max(2, users)
+        self.jobs = jobs
+        self.applications = applications
+        self.seed = seed
+        self.clients = (self.users + 1) // 2
+
+    def email(self, user_index):
+        return f"user{user_index}@example.com"
+
+    def client_emails(self):
+        return [self.email(i) for i in range(self.clients)]
+
+    def freelancer_emails(self):
+        return [self.email(i) for i in range(self.clients, self.users)]
+
+    def user_rows(self):
+        for i in range(self.users):
+            role = "Client" if i < self.clients else "Freelancer"
+            yield (f"User {i}", self.email(i), f"password{i}", role)
+
+    def job_rows(self):
+        rng = random.Random(self.seed)
+        clients = self.client_emails()
+        client_weights = zipf_weights(len(clients))
+        category_weights = zipf_weights(len(CATEGORIES))
+        word_weights = zipf_weights(len(VOCABULARY))
+        for _ in range(self.jobs):
+            title = " ".join(rng.choices(VOCABULARY, word_weights, k=3))
+            description = " ".join(rng.choices(VOCABULARY, word_weights, k=rng.randint(10, 40)))
+            yield (title.capitalize(), description, rng.randint(1, 200) * 25,
+                   rng.choices(CATEGORIES, category_weights)[0],
+                   rng.choices(clients, client_weights)[0])
+
+    def application_rows(self):
+        # job ids are 1..jobs, as assigned when loaded into an empty database
+        if not self.jobs:
+            return
+        rng = random.Random(self.seed + 1)
+        freelancers = self.freelancer_emails()
+        job_cum_weights = []
+        total = 0
+        for weight in zipf_weights(self.jobs):
+            total += weight
+            job_cum_weights.append(total)
+        job_ids = range(1, self.jobs + 1)
+        word_weights = zipf_weights(len(VOCABULARY))
+        for _ in range(self.applications):
+            email = rng.choice(freelancers)
+            yield (rng.choices(job_ids, cum_weights=job_cum_weights)[0], email,
+                   email.split("@")[0].title(),
+                   ", ".join(rng.choices(VOCABULARY, word_weights, k=4)))
+
+    def load(self, db, chunk_size=CHUNK_SIZE):
+        """Bulk insert every row into db; returns seconds spent per table."""
+        timings = {}
+        for table, rows in (("Users", self.user_rows()), ("Jobs", self.job_rows()),
+                            ("Applications", self.application_rows())):
+            start = time.perf_counter()
+            for chunk in chunked(rows, chunk_size):
+                db.bulk_insert(table, chunk)
+            timings[table] = time.perf_counter() - start
+        return timings
+
+
+# ------------------------------
+# Timing
+# ------------------------------
+def measure(fn, args_list):
+    """Call fn once per args tuple; returns stats in milliseconds."""
+    times = []
+    rows = 0
+    for args in args_list:
+        start = time.perf_counter()
+        result = fn(*args)
+        times.append((time.perf_counter() - start) * 1000)
+        if isinstance(result, list):
+            rows += len(result)
+    if not times:
+        return {"calls": 0, "rows": 0}
+    return {
+        "calls": len(times),
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "mean_ms": round(statistics.fmean(times), 3),
+        "max_ms": round(max(times), 3),
+        "rows": rows,
+    }
+
+
+def run_scale(market, repeat=5):
+    """Load market into a fresh SQLite database and time each hot path."""
+    with tempfile.TemporaryDirectory() as tmp:
+        # keep stdout clean for the JSON report
+        with contextlib.redirect_stdout(sys.stderr):
+            db = Database(SqliteBackend(os.path.join(tmp, "bench.db")), marker_dir=None)
+        try:
+            loaded = market.load(db)
+            rng = random.Random(market.seed + 2)
+            users = [rng.randrange(market.users) for _ in range(repeat)]
+            jobs = [rng.randint(1, market.jobs) for _ in range(repeat)] if market.jobs else []
+            results = {
+                "bulk_insert": {
+                    table: {"rows": count, "seconds": round(loaded[table], 3),
+                            "rows_per_s": round(count / loaded[table]) if loaded[table] else None}
+                    for table, count in (("Users", market.users), ("Jobs", market.jobs),
+                                         ("Applications", market.applications))
+                },
+                "get_jobs": measure(db.get_jobs, [()] * repeat),
+                "get_jobs_page": measure(db.get_jobs_page, [(0, 200)] * repeat),
+                "search_common_word": measure(db.search_jobs, [(VOCABULARY[0],)] * repeat),
+                "search_rare_word": measure(db.search_jobs, [(VOCABULARY[-1],)] * repeat),
+                "search_prefix": measure(db.search_jobs, [(VOCABULARY[1][:3],)] * repeat),
+                "search_category": measure(db.search_jobs,
+                                           [(None, CATEGORIES[-1])] * repeat),
+                "search_budget_sorted": measure(
+                    lambda offset: db.search_jobs(limit=200, offset=offset, min_budget=1000,
+                                                  order_by="budget", descending=True),
+                    [(200 * i,) for i in range(repeat)]),
+                "job_facets": measure(db.get_job_facets, [(VOCABULARY[0],)] * repeat),
+                "login": measure(db.validate_login,
+                                 [(market.email(i), f"password{i}",
+                                   "Client" if i < market.clients else "Freelancer")
+                                  for i in users]),
+                "client_jobs": measure(db.get_jobs_by_client,
+                                       [(market.email(i % market.clients), True) for i in users]),
+                "get_applications": measure(db.get_applications, [(j,) for j in jobs]),
+                **index_results(db, repeat),
+                "show_applications": measure(db.get_applications_with_titles, [()] * repeat),
+                # the busiest clients first: each delete cascades to their
+                # jobs and those jobs' applications (ids start at 1)
+                "delete_user_cascade": measure(db.delete_user,
+                                               [(i + 1,) for i in range(min(repeat, market.clients))]),
+            }
+        finally:
+            db.close()
+    return results
+
+
+def index_results(db, repeat):
+    # the in-memory keyword index behind search-as-you-type
+    start = time.perf_counter()
+    engine = MatchingEngine.from_database(db)
+    build = time.perf_counter() - start
+    typo = VOCABULARY[0][0] + VOCABULARY[0][2] + VOCABULARY[0][1] + VOCABULARY[0][3:]
+    return {
+        "index_build": {"jobs": len(engine.jobs), "seconds": round(build, 3)},
+        "index_prefix_search": measure(lambda q: engine.search_jobs(q)[0],
+                                       [(VOCABULARY[0][:3],)] * repeat),
+        "index_fuzzy_search": measure(engine.fuzzy_search_jobs, [(typo,)] * repeat),
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+                                timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(),
+            "platform": platform.platform(), "backend": "sqlite",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def run(scales, repeat=5, seed=0):
+    report = dict(environment(), repeat=repeat, seed=seed, scales={})
+    for name in scales:
+        users, jobs, applications = SCALES[name]
+        report["scales"][name] = {
+            "users": users, "jobs": jobs, "applications": applications,
+            "results": run_scale(Marketplace(users, jobs, applications, seed), repeat),
+        }
+    return report
+
+
+# ------------------------------
+# Comparing two runs
+# ------------------------------
+def compare(old, new, threshold=1.25):
+    """Yield (scale, benchmark, old_ms, new_ms, ratio) for medians present
+    in both reports that got slower than threshold times the old value."""
+    for scale, entry in new["scales"].items():
+        before = old["scales"].get(scale, {}).get("results", {})
+        for name, stats in entry["results"].items():
+            if "median_ms" not in stats or "median_ms" not in before.get(name, {}):
+                continue
+            old_ms, new_ms = before[name]["median_ms"], stats["median_ms"]
+            ratio = new_ms / old_ms if old_ms else float("inf")
+            if ratio > threshold:
+                yield scale, name, old_ms, new_ms, ratio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark FJMS database hot paths")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="generate data and time every hot path")
+    run_parser.add_argument("--scales", default="small,medium",
+                            help=f"comma separated, from: {', '.join(SCALES)}")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", help="write the JSON report here instead of stdout")
+
+    compare_parser = sub.add_parser("compare", help="report regressions between two runs")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=1.25,
+                                help="flag medians slower than this factor")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+        unknown = [s for s in scales if s not in SCALES]
+        if unknown:
+            parser.error(f"unknown scale(s): {', '.join(unknown)}")
+        report = json.dumps(run(scales, args.repeat, args.seed), indent=2)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(report + "\n")
+        else:
+            print(report)
+        return 0
+
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    regressions = list(compare(old, new, args.threshold))
+    for scale, name, old_ms, new_ms, ratio in regressions:
+        print(f"{scale:8} {name:24} {old_ms:10.3f} ms -> {new_ms:10.3f} ms  x{ratio:.2f}")
+    if not regressions:
+        print("No regressions.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
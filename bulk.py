@@ -0,0 +1,196 @@
+import argparse
+import csv
+import json
+import os
+
+from database import TABLE_COLUMNS
+
+# command-line table names -> Database tables
+TABLES = {name.lower(): name for name in TABLE_COLUMNS}
+
+INT_COLUMNS = {"budget", "job_id"}
+OPTIONAL_COLUMNS = {"description"}
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return "jsonl" if os.path.splitext(path)[1].lower() in (".jsonl", ".ndjson") else "csv"
+
+
+# ------------------------------
+# Readers (generators, one record at a time)
+# ------------------------------
+def read_csv(f):
+    # line numbers count the header, so they match what an editor shows
+    for line_no, record in enumerate(csv.DictReader(f), start=2):
+        yield line_no, record, None
+
+
+def read_jsonl(f):
+    for line_no, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, line.rstrip("\n"), f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, record, "Expected a JSON object"
+            continue
+        yield line_no, record, None
+
+
+def to_row(table, record):
+    """Validate one record and return it as a tuple in TABLE_COLUMNS order."""
+    row = []
+    for col in TABLE_COLUMNS[table]:
+        value = record.get(col)
+        if isinstance(value, str):
+            value = value.strip()
+        if value in (None, ""):
+            if col not in OPTIONAL_COLUMNS:
+                raise ValueError(f"'{col}' is required")
+            value = ""
+        elif col in INT_COLUMNS:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"'{col}' must be a whole number")
+            if value < 0:
+                raise ValueError(f"'{col}' cannot be negative")
+        row.append(value)
+    return tuple(row)
+
+
+# ------------------------------
+# Import
+# ------------------------------
+class RejectWriter:
+    """Appends rejected records, with the reason, as JSON Lines."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = None
+
+    def write(self, line_no, record, error):
+        self.count += 1
+        if self.path is None:
+            return
+        if self._file is None:
+            self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(json.dumps({"line": line_no, "error": str(error), "record": record},
+                                    default=str) + "\n")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def import_records(db, table, records, chunk_size=1000, rejects=None):
+    """Insert (line_no, record, error) triples in chunk_size transactions.
+
+    Invalid records go to rejects. If the database refuses a whole chunk
+    (e.g. a duplicate email), its rows are retried one by one so only the
+    offending rows are rejected. Returns (imported, batches).
+    """
+    rejects = rejects or RejectWriter(None)
+    imported = batches = 0
+    chunk = []
+
+    def flush():
+        nonlocal imported, batches
+        try:
+            imported += db.bulk_insert(table, [row for _, row, _ in chunk])
+            batches += 1
+        except Exception:
+            for line_no, row, record in chunk:
+                try:
+                    imported += db.bulk_insert(table, [row])
+                    batches += 1
+                except Exception as e:
+                    rejects.write(line_no, record, e)
+        chunk.clear()
+
+    for line_no, record, error in records:
+        if error is None:
+            try:
+                chunk.append((line_no, to_row(table, record), record))
+            except ValueError as e:
+                error = e
+        if error is not None:
+            rejects.write(line_no, record, error)
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return imported, batches
+
+
+def import_file(db, table, path, fmt=None, chunk_size=1000, reject_path=None):
+    table = TABLES.get(table.lower(), table)
+    if table not in TABLE_COLUMNS:
+        raise Exception(f"Import Failed: unknown table '{table}'")
+    reader = read_jsonl if detect_format(path, fmt) == "jsonl" else read_csv
+    rejects = RejectWriter(reject_path)
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            imported, batches = import_records(db, table, reader(f), chunk_size, rejects)
+    finally:
+        rejects.close()
+    return {"imported": imported, "rejected": rejects.count, "batches": batches}
+
+
+# ------------------------------
+# Export
+# ------------------------------
+def export_file(db, table, path, fmt=None, fetch_size=1000):
+    table = TABLES.get(table.lower(), table)
+    if table not in TABLE_COLUMNS:
+        raise Exception(f"Export Failed: unknown table '{table}'")
+    header = ("id",) + TABLE_COLUMNS[table]
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if detect_format(path, fmt) == "jsonl":
+            for row in db.iter_rows(table, fetch_size):
+                f.write(json.dumps(dict(zip(header, row)), default=str) + "\n")
+                count += 1
+        else:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for row in db.iter_rows(table, fetch_size):
+                writer.writerow(row)
+                count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import/export FJMS data")
+    parser.add_argument("action", choices=("import", "export"))
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("csv", "jsonl"))
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="rows per transaction (import) or per fetch (export)")
+    parser.add_argument("--rejects", help="JSON Lines file for rows that could not be imported")
+    args = parser.parse_args(argv)
+
+    from database import Database
+    db = Database()
+    try:
+        if args.action == "import":
+            result = import_file(db, args.table, args.path, args.format,
+                                 args.chunk_size, args.rejects)
+            print(f"Imported {result['imported']} rows in {result['batches']} batches, "
+                  f"rejected {result['rejected']}")
+        else:
+            count = export_file(db, args.table, args.path, args.format, args.chunk_size)
+            print(f"Exported {count} rows")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
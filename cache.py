@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import OrderedDict
+
+import events
+
+# read method -> function(*args, **kwargs) returning the tags its result depends on.
+# Point lookups, bounded pages and the admin user list are cached; the
+# whole-table reads and paging scans behind index builds (get_jobs,
+# get_jobs_page, get_job_summaries_page, get_job_ids, get_all_applications,
+# get_applications_page, get_applications_with_titles) would fill the LRU
+# with rows that are read once and never hit.
+READ_TAGS = {
+    "get_job_descriptions": lambda *a, **kw: {"jobs"},
+    "search_jobs": lambda *a, **kw: {"jobs"},
+    "get_job_facets": lambda *a, **kw: {"jobs"},
+    "get_jobs_by_ids": lambda *a, **kw: {"jobs"},
+    "get_jobs_by_client": lambda email, with_counts=False: (
+        {f"client:{email}", "applications"} if with_counts else {f"client:{email}"}),
+    "get_job_title": lambda job_id: {f"job:{job_id}"},
+    "get_all_users": lambda: {"users"},
+    "get_user_by_id": lambda user_id: {f"user:{user_id}"},
+    "get_applications": lambda job_id: {f"applications:job:{job_id}"},
+}
+
+
+def tags_for_event(event):
+    """Cache tags made stale by a Database change event (None means all)."""
+    data = event.data
+    if event.kind == events.BULK_IMPORTED:
+        return None     # rows for any client or job may have arrived
+    if event.kind == events.USER_REGISTERED:
+        return {"users"}
+    if event.kind == events.USER_UPDATED:
+        tags = {"users", f"user:{data['user_id']}"}
+        previous = data.get("previous_email")
+        if previous and previous != data["email"]:
+            # the client's jobs moved to the new email
+            tags |= {"jobs", f"client:{previous}", f"client:{data['email']}"}
+        return tags
+    if event.kind == events.JOB_INSERTED:
+        return {"jobs", f"job:{data['job_id']}", f"client:{data['client_email']}"}
+    if event.kind == events.JOB_DELETED:
+        return {"jobs", f"job:{data['job_id']}", f"client:{data.get('client_email')}",
+                "applications", f"applications:job:{data['job_id']}"}
+    if event.kind == events.USER_DELETED:
+        tags = {"users", f"user:{data['user_id']}", "jobs", f"client:{data['email']}",
+                "applications"}
+        for job_id in data.get("job_ids", ()):
+            tags.add(f"job:{job_id}")
+            tags.add(f"applications:job:{job_id}")
+        return tags
+    if event.kind == events.APPLICATION_INSERTED:
+        return {"applications", f"applications:job:{data['job_id']}"}
+    return set()
+
+
+def _freeze(value):
+    if isinstance(value, (list, set, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class CachedDatabase:
+    """Read-through LRU + TTL cache in front of a Database.
+
+    Results of the read methods in READ_TAGS are cached per method and
+    arguments. Each entry carries tags (e.g. "jobs", "job:42",
+    "client:a@b.com"); the change events the Database publishes after each
+    write invalidate exactly the tags that write affected. Everything else
+    (writes, events, pool, ...) is passed straight through.
+    """
+
+    def __init__(self, db, max_entries=1024, ttl=60):
+        self._db = db
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires, value, tags)
+        self._by_tag = {}               # tag -> set of keys
+        self._lock = threading.Lock()
+        self._generation = 0            # bumped by every invalidation
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        db.events.subscribe(self._on_change)
+
+    def __getattr__(self, name):
+        attr = getattr(self._db, name)
+        if name in READ_TAGS and callable(attr):
+            return lambda *args, **kwargs: self._read(name, attr, args, kwargs)
+        return attr
+
+    def _read(self, name, method, args, kwargs):
+        key = (name, _freeze(args), _freeze(tuple(sorted(kwargs.items()))))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        value = method(*args, **kwargs)
+
+        with self._lock:
+            # a write that landed while we were reading may have made this
+            # value stale already; serve it but do not cache it
+            if generation == self._generation:
+                self._store(key, value, READ_TAGS[name](*args, **kwargs), now + self.ttl)
+        return value
+
+    def _store(self, key, value, tags, expires):
+        self._drop(key)
+        self._entries[key] = (expires, value, tags)
+        for tag in tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def _on_change(self, event):
+        self.invalidate(tags_for_event(event))
+
+    def invalidate(self, tags=None):
+        """Drop entries carrying any of tags (everything when tags is None)."""
+        with self._lock:
+            self._generation += 1
+            if tags is None:
+                keys = list(self._entries)
+            else:
+                keys = {k for tag in tags for k in self._by_tag.get(tag, ())}
+            for key in keys:
+                self._drop(key)
+            self.invalidations += len(keys)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def cached(db, **kwargs):
+    """Wrap db in a CachedDatabase when it publishes change events.
+
+    Without events the cache could never be invalidated, so such databases
+    (e.g. test doubles) are returned unwrapped.
+    """
+    if hasattr(db, "events"):
+        return CachedDatabase(db, **kwargs)
+    return db
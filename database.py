@@ -1,64 +1,235 @@
-import pyodbc
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import events
+import migrations
+from backends import backend_from_config
+
+# insertable columns per table, in import/export order
+TABLE_COLUMNS = {
+    "Users": ("fullname", "email", "password", "role"),
+    "Jobs": ("title", "description", "budget", "category", "client_email"),
+    "Applications": ("job_id", "freelancer_email", "freelancer_name", "skills"),
+}
+
+# columns search_jobs can order by; ties are broken by id so pages are stable
+JOB_SORT_COLUMNS = ("id", "budget", "category")
+
+# where the budget facet buckets of get_job_facets start; the last is open-ended
+BUDGET_BUCKETS = (0, 100, 500, 1000, 5000)
+
+
+# ------------------------------
+# Cancellation
+# ------------------------------
+class QueryCancelled(Exception):
+    pass
+
+
+class CancelScope:
+    """Lets another thread abort the statements of one Database call.
+
+    While a scope is active on a thread (Database.cancel_scope), every
+    cursor that thread opens is registered with it; cancel() stops the
+    statement running right now and makes any later one fail at once.
+    """
 
-class Database:
     def __init__(self):
+        self._lock = threading.Lock()
+        self._active = None     # (backend, conn, cur)
+        self.cancelled = False
+
+    def attach(self, backend, conn, cur):
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelled("Query cancelled")
+            self._active = (backend, conn, cur)
+
+    def detach(self):
+        with self._lock:
+            self._active = None
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._active is not None:
+                backend, conn, cur = self._active
+                try:
+                    backend.cancel(conn, cur)
+                except Exception:
+                    pass    # statement already finished
+
+
+# ------------------------------
+# Connection pool
+# ------------------------------
+class ConnectionPool:
+    """Bounded pool of DB connections.
+
+    At most max_size connections exist at once; checkout() blocks up to
+    `timeout` seconds for a free slot. Connections idle for longer than
+    `health_check_after` seconds are pinged before reuse and replaced if
+    the server dropped them.
+    """
+
+    def __init__(self, connect, max_size=5, timeout=30, health_check_after=60,
+                 is_disconnect=None):
+        self._connect = connect
+        self._is_disconnect = is_disconnect or (lambda exc: False)
+        self._timeout = timeout
+        self._health_check_after = health_check_after
+        self._idle = queue.LifoQueue()       # (conn, last_used)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._closed = False
+
+    def checkout(self):
+        if self._closed:
+            raise Exception("Connection pool is closed")
+        if not self._slots.acquire(timeout=self._timeout):
+            raise Exception("Timed out waiting for a free database connection")
         try:
-            self.conn = pyodbc.connect(
-                'DRIVER={ODBC Driver 18 for SQL Server};'
-                'SERVER=DESKTOP-63LBVQG\\SQLEXPRESS;'
-                'DATABASE=FreelancerDB;'
-                'Trusted_Connection=yes;'
-                'Encrypt=no;'
-            )
-            self.cursor = self.conn.cursor()
+            while True:
+                try:
+                    conn, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+
+                if time.monotonic() - last_used < self._health_check_after:
+                    return conn
+                if self._is_alive(conn):
+                    return conn
+                self._discard(conn)   # dropped while idle, reconnect
+        except Exception:
+            self._slots.release()
+            raise
+
+    def checkin(self, conn, broken=False):
+        try:
+            if broken or self._closed:
+                self._discard(conn)
+            else:
+                self._idle.put((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        conn = self.checkout()
+        broken = False
+        try:
+            yield conn
+        except Exception as e:
+            broken = self._is_disconnect(e)
+            raise
+        finally:
+            self.checkin(conn, broken)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    @staticmethod
+    def _is_alive(conn):
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+            cur.close()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+class Database:
+    def __init__(self, backend=None, pool_size=5, marker_dir=migrations.MARKER_DIR):
+        self.marker_dir = marker_dir   # None checks the schema on every start
+        self._scopes = threading.local()  # CancelScope active on each thread
+        self.instrumentation = None       # set by instrumentation.instrument()
+        try:
+            # SQL Server or SQLite, chosen by FJMS_DB_BACKEND unless given
+            self.backend = backend or backend_from_config()
+            self.pool = ConnectionPool(self.backend.connect, max_size=pool_size,
+                                       is_disconnect=self.backend.is_disconnect)
+            self.events = events.EventBus()   # change events for indexes/caches
             self.initialize_tables()
             print("DB Connected Successfully")
         except Exception as e:
             raise Exception(f"Database Connection Failed: {e}")
 
+    @contextmanager
+    def _cursor(self, commit=False):
+        # fresh cursor on a pooled connection for every operation, so one
+        # failed statement can never leave state behind for the next caller
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            instrumentation = self.instrumentation
+            if instrumentation is not None:
+                cur = instrumentation.wrap_cursor(cur)
+            scope = getattr(self._scopes, "current", None)
+            try:
+                if scope is not None:
+                    scope.attach(self.backend, conn, cur)
+                yield cur
+                if commit:
+                    conn.commit()
+            except Exception:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                raise
+            finally:
+                if scope is not None:
+                    scope.detach()
+                if instrumentation is not None:
+                    cur.finish()
+                try:
+                    cur.close()
+                except Exception:
+                    pass
+
+    @contextmanager
+    def cancel_scope(self, scope):
+        """Register this thread's statements with scope (see CancelScope)."""
+        previous = getattr(self._scopes, "current", None)
+        self._scopes.current = scope
+        try:
+            yield scope
+        finally:
+            self._scopes.current = previous
+
+    def close(self):
+        self.pool.close()
+
     # ------------------------------
     # Initialize tables
     # ------------------------------
-    def initialize_tables(self):
-        try:
-            self.cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sys.tables WHERE name='Users')
-                CREATE TABLE Users (
-                    id INT IDENTITY PRIMARY KEY,
-                    fullname VARCHAR(100),
-                    email VARCHAR(100) UNIQUE,
-                    password VARCHAR(100),
-                    role VARCHAR(20)
-                )
-            """)
-
-            self.cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sys.tables WHERE name='Jobs')
-                CREATE TABLE Jobs (
-                    id INT IDENTITY PRIMARY KEY,
-                    title VARCHAR(200),
-                    description TEXT,
-                    budget INT,
-                    category VARCHAR(50),
-                    client_email VARCHAR(100)
-                )
-            """)
-
-            self.cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sys.tables WHERE name='Applications')
-                CREATE TABLE Applications (
-                    id INT IDENTITY PRIMARY KEY,
-                    job_id INT,
-                    freelancer_email VARCHAR(100),
-                    freelancer_name VARCHAR(100),
-                    skills VARCHAR(200)
-                )
-            """)
-
-            self.conn.commit()
-
-        except Exception as e:
-            self.conn.rollback()
+    def initialize_tables(self, force=False):
+        try:
+            marker = None if force else migrations.read_marker(self.backend, self.marker_dir)
+            if marker and marker.get("version") == migrations.SCHEMA_VERSION:
+                # schema already current: no DDL round trips at startup
+                self.backend.fulltext_enabled = bool(marker.get("fulltext"))
+                return
+            migrations.migrate(self)
+            self.backend.fulltext_enabled = self.backend.create_fulltext(self)
+            migrations.write_marker(self.backend, self.marker_dir,
+                                    fulltext=self.backend.fulltext_enabled)
+        except Exception as e:
             raise Exception(f"Table Initialization Failed: {e}")
 
     # ------------------------------
@@ -66,153 +237,463 @@ class Database:
     # ------------------------------
     def register_user(self, fullname, email, password, role):
         try:
-            self.cursor.execute("""
-                INSERT INTO Users(fullname, email, password, role)
-                VALUES (?, ?, ?, ?)
-            """, (fullname, email, password, role))
-            self.conn.commit()
+            with self._cursor(commit=True) as cur:
+                cur.execute("""
+                    INSERT INTO Users(fullname, email, password, role)
+                    VALUES (?, ?, ?, ?)
+                """, (fullname, email, password, role))
         except Exception as e:
-            self.conn.rollback()
             raise Exception(f"User Registration Failed: {e}")
 
+        self.events.publish(events.USER_REGISTERED, email=email, role=role)
+
     def validate_login(self, email, password, role):
         try:
-            self.cursor.execute("""
-                SELECT * FROM Users
-                WHERE email = ? AND password = ? AND role = ?
-            """, (email, password, role))
-            return self.cursor.fetchone()
+            with self._cursor() as cur:
+                cur.execute("""
+                    SELECT * FROM Users
+                    WHERE email = ? AND password = ? AND role = ?
+                """, (email, password, role))
+                return cur.fetchone()
         except Exception as e:
             raise Exception(f"Login Query Failed: {e}")
 
     def insert_job(self, title, desc, budget, category, client_email):
         try:
-            self.cursor.execute("""
-                INSERT INTO Jobs(title, description, budget, category, client_email)
-                VALUES (?, ?, ?, ?, ?)
-            """, (title, desc, budget, category, client_email))
-            self.conn.commit()
+            with self._cursor(commit=True) as cur:
+                cur.execute(self.backend.insert_returning(
+                    "Jobs", ("title", "description", "budget", "category", "client_email")),
+                    (title, desc, budget, category, client_email))
+                job_id = cur.fetchone()[0]
         except Exception as e:
-            self.conn.rollback()
             raise Exception(f"Insert Job Failed: {e}")
 
+        self.events.publish(events.JOB_INSERTED, job_id=job_id, title=title,
+                            description=desc, budget=budget, category=category,
+                            client_email=client_email)
+        return job_id
+
     def get_jobs(self):
         try:
-            self.cursor.execute("SELECT * FROM Jobs")
-            return self.cursor.fetchall()
+            with self._cursor() as cur:
+                cur.execute("SELECT * FROM Jobs")
+                return cur.fetchall()
         except Exception as e:
             raise Exception(f"Get Jobs Failed: {e}")
 
+    def get_jobs_page(self, after_id=0, page_size=200):
+        # keyset pagination: seeks straight to the primary key, so every
+        # page costs the same regardless of how deep the user has scrolled
+        try:
+            with self._cursor() as cur:
+                limit_sql, limit_params = self.backend.limit_clause(page_size)
+                cur.execute("SELECT * FROM Jobs WHERE id > ? ORDER BY id" + limit_sql,
+                            [after_id or 0] + limit_params)
+                return cur.fetchall()
+        except Exception as e:
+            raise Exception(f"Get Jobs Page Failed: {e}")
+
+    def get_job_summaries_page(self, after_id=0, page_size=200):
+        # like get_jobs_page but without the description TEXT (NULL in its
+        # place), for lists that only show descriptions on demand
+        try:
+            with self._cursor() as cur:
+                limit_sql, limit_params = self.backend.limit_clause(page_size)
+                cur.execute("SELECT id, title, NULL, budget, category, client_email FROM Jobs "
+                            "WHERE id > ? ORDER BY id" + limit_sql,
+                            [after_id or 0] + limit_params)
+                return cur.fetchall()
+        except Exception as e:
+            raise Exception(f"Get Job Summaries Failed: {e}")
+
+    def get_job_descriptions(self, job_ids):
+        """{job_id: description} for the given ids (deleted jobs are left out)."""
+        job_ids = list(job_ids)
+        descriptions = {}
+        try:
+            with self._cursor() as cur:
+                for start in range(0, len(job_ids), self.backend.max_params):
+                    chunk = job_ids[start:start + self.backend.max_params]
+                    placeholders = ", ".join("?" for _ in chunk)
+                    cur.execute(f"SELECT id, description FROM Jobs WHERE id IN ({placeholders})",
+                                chunk)
+                    descriptions.update((r[0], r[1]) for r in cur.fetchall())
+            return descriptions
+        except Exception as e:
+            raise Exception(f"Get Job Descriptions Failed: {e}")
+
+    def search_jobs(self, keyword=None, category=None, limit=None, offset=0, after_id=None,
+                    min_budget=None, max_budget=None, order_by="id", descending=False):
+        # after_id continues an id-ordered listing; other orders page with offset
+        if order_by not in JOB_SORT_COLUMNS:
+            raise Exception(f"Search Jobs Failed: cannot sort by {order_by!r}")
+        keyword = (keyword or "").strip()
+        clauses = []
+        params = []
+
+        if after_id:
+            clauses.append("id > ?")
+            params.append(after_id)
+
+        if keyword:
+            # full-text index where the backend has one, LIKE otherwise
+            clause, clause_params = self.backend.keyword_clause(keyword)
+            clauses.append(clause)
+            params.extend(clause_params)
+
+        if category and category != "All":
+            clauses.append("category = ?")
+            params.append(category)
+
+        # budget range and order are served by IX_Jobs_budget / IX_Jobs_category_budget
+        if min_budget is not None:
+            clauses.append("budget >= ?")
+            params.append(min_budget)
+        if max_budget is not None:
+            clauses.append("budget <= ?")
+            params.append(max_budget)
+
+        sql = "SELECT * FROM Jobs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        direction = " DESC" if descending else ""
+        if order_by == "id":
+            sql += f" ORDER BY id{direction}"
+        else:
+            sql += f" ORDER BY {order_by}{direction}, id{direction}"
+
+        limit_sql, limit_params = self.backend.limit_clause(limit, offset)
+        sql += limit_sql
+        params.extend(limit_params)
+
+        try:
+            with self._cursor() as cur:
+                cur.execute(sql, params)
+                return cur.fetchall()
+        except Exception as e:
+            raise Exception(f"Search Jobs Failed: {e}")
+
+    def get_job_facets(self, keyword=None):
+        """Job counts for keyword (every job without one) per category and per
+        budget bucket, from one grouped query:
+        {"total": count, "categories": {category: count},
+         "budgets": [(low, high, count), ...]}
+        with every bucket of BUDGET_BUCKETS listed and high None for the last.
+        Jobs without a category or budget only count towards the total, as do
+        budgets below the first bucket (negative ones, which post_job and bulk
+        imports reject but older rows may hold), so each bucket matches a
+        min/max budget filter.
+        """
+        keyword = (keyword or "").strip()
+        where, params = "", []
+        if keyword:
+            clause, params = self.backend.keyword_clause(keyword)
+            where = " WHERE " + clause
+        # bucket i holds BUDGET_BUCKETS[i] <= budget < BUDGET_BUCKETS[i + 1]
+        cases = " ".join(f"WHEN budget < {bound} THEN {i}"
+                         for i, bound in enumerate(BUDGET_BUCKETS[1:]))
+        sql = (f"SELECT category, bucket, COUNT(*) FROM "
+               f"(SELECT category, CASE WHEN budget IS NULL OR budget < {BUDGET_BUCKETS[0]} "
+               f"THEN NULL {cases} "
+               f"ELSE {len(BUDGET_BUCKETS) - 1} END AS bucket "
+               f"FROM Jobs{where}) AS j GROUP BY category, bucket")
+        try:
+            with self._cursor() as cur:
+                cur.execute(sql, params)
+                rows = cur.fetchall()
+        except Exception as e:
+            raise Exception(f"Get Job Facets Failed: {e}")
+
+        total = 0
+        categories = {}
+        buckets = [0] * len(BUDGET_BUCKETS)
+        for category, bucket, count in rows:
+            total += count
+            if category is not None:
+                categories[category] = categories.get(category, 0) + count
+            if bucket is not None:
+                buckets[bucket] += count
+        highs = [bound - 1 for bound in BUDGET_BUCKETS[1:]] + [None]
+        return {"total": total, "categories": categories,
+                "budgets": list(zip(BUDGET_BUCKETS, highs, buckets))}
+
+    def get_job_ids(self):
+        try:
+            with self._cursor() as cur:
+                cur.execute("SELECT id FROM Jobs")
+                return [r[0] for r in cur.fetchall()]
+        except Exception as e:
+            raise Exception(f"Get Job Ids Failed: {e}")
+
+    def get_jobs_by_ids(self, job_ids):
+        # rows come back in the order of job_ids (e.g. ranked matches)
+        job_ids = list(job_ids)
+        if not job_ids:
+            return []
+        by_id = {}
+        try:
+            with self._cursor() as cur:
+                for start in range(0, len(job_ids), self.backend.max_params):
+                    chunk = job_ids[start:start + self.backend.max_params]
+                    placeholders = ", ".join("?" for _ in chunk)
+                    cur.execute(f"SELECT * FROM Jobs WHERE id IN ({placeholders})", chunk)
+                    by_id.update((r[0], r) for r in cur.fetchall())
+            return [by_id[j] for j in job_ids if j in by_id]
+        except Exception as e:
+            raise Exception(f"Get Jobs By Ids Failed: {e}")
+
+    def get_jobs_by_client(self, email, with_counts=False):
+        try:
+            with self._cursor() as cur:
+                if with_counts:
+                    # id, title, budget, category, applicants
+                    cur.execute("""
+                        SELECT j.id, j.title, j.budget, j.category, COUNT(a.id) AS applicants
+                        FROM Jobs j
+                        LEFT JOIN Applications a ON a.job_id = j.id
+                        WHERE j.client_email = ?
+                        GROUP BY j.id, j.title, j.budget, j.category
+                        ORDER BY j.id
+                    """, (email,))
+                else:
+                    cur.execute("""
+                        SELECT id, title, budget, category
+                        FROM Jobs
+                        WHERE client_email = ?
+                        ORDER BY id
+                    """, (email,))
+                return cur.fetchall()
+        except Exception as e:
+            raise Exception(f"Get Client Jobs Failed: {e}")
+
     def get_all_users(self):
         try:
-            self.cursor.execute("SELECT id, fullname, email, role FROM Users")
-            return self.cursor.fetchall()
+            with self._cursor() as cur:
+                cur.execute("SELECT id, fullname, email, role FROM Users")
+                return cur.fetchall()
         except Exception as e:
             raise Exception(f"Get Users Failed: {e}")
 
     def get_all_applications(self):
         try:
-            self.cursor.execute("""
-                SELECT job_id, freelancer_email, freelancer_name, skills
-                FROM Applications
-            """)
-            return self.cursor.fetchall()
+            with self._cursor() as cur:
+                cur.execute("""
+                    SELECT job_id, freelancer_email, freelancer_name, skills
+                    FROM Applications
+                """)
+                return cur.fetchall()
         except Exception as e:
             raise Exception(f"Get All Applications Failed: {e}")
 
+    def get_applications_page(self, after_id=0, page_size=1000):
+        # id, job_id, freelancer_email, freelancer_name, skills
+        try:
+            with self._cursor() as cur:
+                limit_sql, limit_params = self.backend.limit_clause(page_size)
+                cur.execute("""
+                    SELECT id, job_id, freelancer_email, freelancer_name, skills
+                    FROM Applications
+                    WHERE id > ?
+                    ORDER BY id
+                """ + limit_sql, [after_id or 0] + limit_params)
+                return cur.fetchall()
+        except Exception as e:
+            raise Exception(f"Get Applications Page Failed: {e}")
+
+    def get_applications_with_titles(self):
+        # one joined query instead of a get_job_title() round trip per row
+        try:
+            with self._cursor() as cur:
+                cur.execute("""
+                    SELECT a.job_id, COALESCE(j.title, '(Deleted Job)') AS job_title,
+                           a.freelancer_email, a.freelancer_name, a.skills
+                    FROM Applications a
+                    LEFT JOIN Jobs j ON j.id = a.job_id
+                    ORDER BY a.id
+                """)
+                return cur.fetchall()
+        except Exception as e:
+            raise Exception(f"Get Applications With Titles Failed: {e}")
+
     def delete_job(self, job_id):
         try:
-            self.cursor.execute("DELETE FROM Applications WHERE job_id=?", (job_id,))
-            self.cursor.execute("DELETE FROM Jobs WHERE id=?", (job_id,))
-            self.conn.commit()
+            with self._cursor(commit=True) as cur:
+                # applications go with it (ON DELETE CASCADE)
+                cur.execute(self.backend.delete_returning("Jobs", "id=?", "client_email"), (job_id,))
+                row = cur.fetchone()
         except Exception as e:
-            self.conn.rollback()
             raise Exception(f"Delete Job Failed: {e}")
 
+        self.events.publish(events.JOB_DELETED, job_id=job_id,
+                            client_email=row[0] if row else None)
+
     def delete_user(self, user_id):
         try:
-            # Check if user exists
-            self.cursor.execute("SELECT email FROM Users WHERE id=?", (user_id,))
-            row = self.cursor.fetchone()
+            with self._cursor(commit=True) as cur:
+                # the user's email and job ids, for the change event
+                cur.execute("""
+                    SELECT u.email, j.id
+                    FROM Users u
+                    LEFT JOIN Jobs j ON j.client_email = u.email
+                    WHERE u.id=?
+                """, (user_id,))
+                rows = cur.fetchall()
 
-            if not row:
-                return False   # user does NOT exist, nothing to delete
+                if not rows:
+                    return False   # user does NOT exist, nothing to delete
 
-            email = row[0]
+                email = rows[0][0]
+                job_ids = [r[1] for r in rows if r[1] is not None]
 
-            # delete applications of user's jobs
-            self.cursor.execute("""
-                DELETE FROM Applications 
-                WHERE job_id IN (SELECT id FROM Jobs WHERE client_email=?)
-            """, (email,))
-
-            # delete their jobs
-            self.cursor.execute("DELETE FROM Jobs WHERE client_email=?", (email,))
-
-            # delete user
-            self.cursor.execute("DELETE FROM Users WHERE id=?", (user_id,))
-            self.conn.commit()
+                # their jobs and those jobs' applications cascade
+                cur.execute("DELETE FROM Users WHERE id=?", (user_id,))
 
+            self.events.publish(events.USER_DELETED, user_id=user_id, email=email,
+                                job_ids=job_ids)
             return True   # success
 
         except Exception as e:
-            self.conn.rollback()
             raise Exception(f"Delete User Failed: {e}")
-        
+
 
     def get_user_by_id(self, user_id):
-        self.cursor.execute("""
-            SELECT id, fullname, email, password, role
-            FROM Users
-            WHERE id=?
-        """, (user_id,))
-        return self.cursor.fetchone()
-    
+        with self._cursor() as cur:
+            cur.execute("""
+                SELECT id, fullname, email, password, role
+                FROM Users
+                WHERE id=?
+            """, (user_id,))
+            return cur.fetchone()
+
 
     def update_user(self, user_id, fullname, email, password, role):
         try:
-            self.cursor.execute("""
-                UPDATE Users
-                SET fullname=?, email=?, password=?, role=?
-                WHERE id=?
-            """, (fullname, email, password, role, user_id))
+            with self._cursor(commit=True) as cur:
+                cur.execute("SELECT email FROM Users WHERE id=?", (user_id,))
+                row = cur.fetchone()
+                cur.execute("""
+                    UPDATE Users
+                    SET fullname=?, email=?, password=?, role=?
+                    WHERE id=?
+                """, (fullname, email, password, role, user_id))
 
-            self.conn.commit()
+            # a changed email carries the client's jobs along (ON UPDATE CASCADE)
+            self.events.publish(events.USER_UPDATED, user_id=user_id, email=email, role=role,
+                                previous_email=row[0] if row else None)
             return True
 
         except Exception as e:
-            self.conn.rollback()
             raise Exception(f"Update User Failed: {e}")
 
 
     def insert_application(self, job_id, email, name, skills):
         try:
-            self.cursor.execute("""
-                INSERT INTO Applications(job_id, freelancer_email, freelancer_name, skills)
-                VALUES (?, ?, ?, ?)
-            """, (job_id, email, name, skills))
-            self.conn.commit()
+            with self._cursor(commit=True) as cur:
+                cur.execute(self.backend.insert_returning(
+                    "Applications", ("job_id", "freelancer_email", "freelancer_name", "skills")),
+                    (job_id, email, name, skills))
+                application_id = cur.fetchone()[0]
 
         except Exception as e:
-            self.conn.rollback()
             raise Exception(f"Apply Job Failed: {e}")
 
+        self.events.publish(events.APPLICATION_INSERTED, application_id=application_id,
+                            job_id=job_id, email=email, name=name, skills=skills)
+        return application_id
+
+    # ------------------------------
+    # Bulk import / export
+    # ------------------------------
+    def bulk_insert(self, table, rows):
+        """Insert rows (tuples in TABLE_COLUMNS order) in one transaction."""
+        columns = TABLE_COLUMNS.get(table)
+        if columns is None:
+            raise Exception(f"Bulk Insert Failed: unknown table '{table}'")
+        rows = list(rows)
+        if not rows:
+            return 0
+        try:
+            with self._cursor(commit=True) as cur:
+                self.backend.prepare_bulk(cur)
+                cur.executemany(
+                    f"INSERT INTO {table}({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})", rows)
+        except Exception as e:
+            raise Exception(f"Bulk Insert Failed: {e}")
+
+        self.events.publish(events.BULK_IMPORTED, table=table, count=len(rows))
+        return len(rows)
+
+    def iter_rows(self, table, fetch_size=1000):
+        """Stream id + TABLE_COLUMNS of a table, fetch_size rows at a time."""
+        columns = TABLE_COLUMNS.get(table)
+        if columns is None:
+            raise Exception(f"Export Failed: unknown table '{table}'")
+        try:
+            with self._cursor() as cur:
+                cur.execute(f"SELECT id, {', '.join(columns)} FROM {table} ORDER BY id")
+                while True:
+                    rows = cur.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield row
+        except Exception as e:
+            raise Exception(f"Export Failed: {e}")
+
+    def insert_applications(self, batch):
+        """Insert (job_id, email, name, skills) tuples in one transaction.
+
+        Rows go out as multi-row INSERTs, as many per statement as the
+        backend's parameter limit allows, so applying to 50 jobs is one
+        round trip and one commit. Returns the new ids in batch order.
+        """
+        batch = [(int(job_id), email, name, skills) for job_id, email, name, skills in batch]
+        if not batch:
+            return []
+        columns = TABLE_COLUMNS["Applications"]
+        per_statement = max(1, (self.backend.max_params - 1) // len(columns))
+        ids = []
+        try:
+            with self._cursor(commit=True) as cur:
+                for start in range(0, len(batch), per_statement):
+                    chunk = batch[start:start + per_statement]
+                    cur.execute(self.backend.insert_ordered_returning(
+                        "Applications", columns, rows=len(chunk)),
+                        [v for a in chunk for v in a])
+                    # ids are assigned in row order but may come back in
+                    # any order: sorted, they follow the chunk
+                    chunk_ids = sorted(row[0] for row in cur.fetchall())
+                    if len(chunk_ids) != len(chunk):
+                        raise Exception(f"expected {len(chunk)} ids, got {len(chunk_ids)}")
+                    ids.extend(chunk_ids)
+        except Exception as e:
+            raise Exception(f"Apply Jobs Failed: {e}")
+
+        for application_id, app in zip(ids, batch):
+            job_id, email, name, skills = app
+            self.events.publish(events.APPLICATION_INSERTED, application_id=application_id,
+                                job_id=job_id, email=email, name=name, skills=skills)
+        return ids
+
     def get_job_title(self, job_id):
         try:
-            self.cursor.execute("SELECT title FROM Jobs WHERE id=?", (job_id,))
-            row = self.cursor.fetchone()
-            return row[0] if row else None
+            with self._cursor() as cur:
+                cur.execute("SELECT title FROM Jobs WHERE id=?", (job_id,))
+                row = cur.fetchone()
+                return row[0] if row else None
         except Exception as e:
             raise Exception(f"Get Job Title Failed: {e}")
 
     def get_applications(self, job_id):
         try:
-            self.cursor.execute("""
-                SELECT freelancer_email, freelancer_name, skills
-                FROM Applications
-                WHERE job_id = ?
-            """, (job_id,))
-            return self.cursor.fetchall()
+            with self._cursor() as cur:
+                cur.execute("""
+                    SELECT freelancer_email, freelancer_name, skills
+                    FROM Applications
+                    WHERE job_id = ?
+                """, (job_id,))
+                return cur.fetchall()
         except Exception as e:
             raise Exception(f"Get Applications Failed: {e}")
 
@@ -0,0 +1,53 @@
+import itertools
+import threading
+import traceback
+from collections import namedtuple
+
+# change event kinds published by Database write methods
+USER_REGISTERED = "user_registered"
+USER_UPDATED = "user_updated"
+JOB_INSERTED = "job_inserted"
+JOB_DELETED = "job_deleted"
+USER_DELETED = "user_deleted"
+APPLICATION_INSERTED = "application_inserted"
+BULK_IMPORTED = "bulk_imported"        # many rows at once; data has table, count
+
+ChangeEvent = namedtuple("ChangeEvent", "seq kind data")
+
+
+class EventBus:
+    """In-process publish/subscribe for data change events.
+
+    Handlers run synchronously on the publishing thread, after the write
+    has been committed, so they should only queue work (see indexer.Indexer).
+    A failing handler is reported but never breaks the write that fired it.
+    """
+
+    def __init__(self):
+        self._handlers = []
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+
+    def subscribe(self, handler, kinds=None):
+        entry = (handler, frozenset(kinds) if kinds else None)
+        with self._lock:
+            self._handlers.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._handlers:
+                    self._handlers.remove(entry)
+        return unsubscribe
+
+    def publish(self, kind, **data):
+        with self._lock:
+            event = ChangeEvent(next(self._seq), kind, data)
+            handlers = list(self._handlers)
+        for handler, kinds in handlers:
+            if kinds is not None and kind not in kinds:
+                continue
+            try:
+                handler(event)
+            except Exception:
+                traceback.print_exc()
+        return event
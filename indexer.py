@@ -0,0 +1,179 @@
+import hashlib
+import os
+import pickle
+import queue
+import threading
+import time
+import traceback
+
+import events
+from matching import MatchingEngine
+
+SNAPSHOT_VERSION = 3   # 2: prefix search index, 3: its trigram index
+SNAPSHOT_DIR = os.path.join(os.path.expanduser("~"), ".fjms")
+
+
+def default_snapshot_path(backend, snapshot_dir=SNAPSHOT_DIR):
+    # one snapshot per database, like migrations.marker_path
+    digest = hashlib.sha1(backend.location.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(snapshot_dir, f"matching-{backend.name}-{digest}.pickle")
+
+
+def database_location(db):
+    backend = getattr(db, "backend", None)
+    return getattr(backend, "location", None)
+
+
+def save_snapshot(engine, path, location=None):
+    # write to a temp file and rename, so a crash never leaves a torn snapshot
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with engine.lock:
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": SNAPSHOT_VERSION, "location": location, "engine": engine}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def load_snapshot(path, location=None):
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+        return None
+    if data.get("location") != location:
+        return None     # built from another database
+    return data["engine"]
+
+
+def matches_database(engine, db):
+    """Whether engine was built from db as it is now.
+
+    A database recreated at the same location hands out the same ids to
+    other jobs, and catch_up only looks past the highest indexed id, so
+    the newest indexed job must still be the job that was indexed.
+    """
+    if not engine.jobs.doc_terms:
+        return not engine.last_job_id
+    probe = max(engine.jobs.doc_terms)
+    rows = db.get_jobs_by_ids([probe])
+    return bool(rows) and (set(engine.job_tokens(rows[0][1], rows[0][2]))
+                           == set(engine.jobs.doc_terms[probe]))
+
+
+class Indexer:
+    """Keeps a MatchingEngine current from Database change events.
+
+    Events are queued by the publishing thread and applied on a background
+    thread, so writes never wait on index maintenance. After enough
+    removals (or every `compact_interval` seconds with pending removals)
+    the index is compacted and a snapshot is written, which lets the next
+    start load the snapshot and only catch up on what changed since.
+    """
+
+    def __init__(self, db, engine=None, snapshot_path=None, snapshot_dir=SNAPSHOT_DIR,
+                 compact_after=5000, compact_interval=300):
+        self.db = db
+        self.engine = engine
+        self.location = database_location(db)
+        if snapshot_path is None and snapshot_dir and self.location is not None:
+            snapshot_path = default_snapshot_path(db.backend, snapshot_dir)
+        self.snapshot_path = snapshot_path
+        self.compact_after = compact_after
+        self.compact_interval = compact_interval
+        self.queue = queue.Queue()
+        self._unsubscribe = None
+        self._thread = None
+        self._last_compact = time.monotonic()
+        self._dirty = False
+
+    def start(self):
+        # subscribe before building so no change made during the build is
+        # lost; replaying one that the build already saw is harmless
+        self._unsubscribe = self.db.events.subscribe(self.queue.put)
+        if self.engine is None:
+            try:
+                self.engine = self.load_or_build()
+            except Exception:
+                # nothing will drain the queue: stop collecting events
+                self._unsubscribe()
+                self._unsubscribe = None
+                raise
+        self._thread = threading.Thread(target=self._run, name="fjms-indexer", daemon=True)
+        self._thread.start()
+        return self.engine
+
+    def load_or_build(self):
+        engine = load_snapshot(self.snapshot_path, self.location) if self.snapshot_path else None
+        if engine is not None and not matches_database(engine, self.db):
+            engine = None
+        if engine is None:
+            engine = MatchingEngine()
+        engine.catch_up(self.db)
+        self._dirty = True
+        return engine
+
+    def stop(self, save=True):
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+        if save and self.snapshot_path and self.engine is not None and self._dirty:
+            save_snapshot(self.engine, self.snapshot_path, self.location)
+            self._dirty = False
+
+    def flush(self):
+        """Block until every queued event has been applied."""
+        self.queue.join()
+
+    def apply(self, event):
+        engine = self.engine
+        data = event.data
+        if event.kind == events.JOB_INSERTED:
+            engine.add_job(data["job_id"], data["title"], data["description"])
+        elif event.kind == events.JOB_DELETED:
+            engine.remove_job(data["job_id"])
+        elif event.kind == events.USER_DELETED:
+            for job_id in data.get("job_ids", ()):
+                engine.remove_job(job_id)
+        elif event.kind == events.APPLICATION_INSERTED:
+            engine.add_application(data["email"], data["skills"], data.get("application_id"))
+        elif event.kind == events.BULK_IMPORTED:
+            if data["table"] == "Users":
+                return
+            engine.catch_up(self.db)     # new rows are all past the indexed ids
+        else:
+            return
+        self._dirty = True
+
+    def maybe_compact(self):
+        removed = self.engine.jobs.removed + self.engine.freelancers.removed
+        overdue = time.monotonic() - self._last_compact >= self.compact_interval
+        if removed >= self.compact_after or (overdue and removed):
+            self.engine.compact()
+            self._last_compact = time.monotonic()
+            if self.snapshot_path:
+                save_snapshot(self.engine, self.snapshot_path, self.location)
+                self._dirty = False
+
+    def _run(self):
+        while True:
+            try:
+                event = self.queue.get(timeout=self.compact_interval)
+            except queue.Empty:
+                self.maybe_compact()
+                continue
+            try:
+                if event is None:
+                    return
+                self.apply(event)
+                self.maybe_compact()
+            except Exception:
+                traceback.print_exc()   # a bad event must not kill the indexer thread
+            finally:
+                self.queue.task_done()
@@ -0,0 +1,440 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Database method running on this thread / task, and the UI action being traced
+current_method = contextvars.ContextVar("fjms_db_method", default=None)
+current_trace = contextvars.ContextVar("fjms_trace", default=None)
+
+# Database methods left unwrapped: not queries
+UNINSTRUMENTED = {"close", "cancel_scope", "initialize_tables"}
+
+# method duration histogram buckets, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+SLOW_QUERY_MS = 200
+
+
+def value_size(value):
+    """Approximate wire size of one fetched column value, in bytes."""
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (int, float)):
+        return 8
+    return len(str(value))
+
+
+def row_size(row):
+    return sum(value_size(v) for v in row)
+
+
+# ------------------------------
+# Metrics registry
+# ------------------------------
+class MethodStats:
+    __slots__ = ("calls", "errors", "seconds", "rows", "buckets",
+                 "statements", "statement_seconds", "fetched_rows", "fetched_bytes")
+
+    def __init__(self):
+        self.calls = self.errors = self.rows = 0
+        self.statements = self.fetched_rows = self.fetched_bytes = 0
+        self.seconds = self.statement_seconds = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name != "buckets"}
+
+
+class Metrics:
+    """Thread-safe per-method counters, exportable in Prometheus text format.
+
+    Two levels are recorded: Database method calls (duration, errors, rows
+    returned) and the statements those calls executed (count, time spent
+    executing and fetching, rows and bytes fetched). Statements issued
+    outside any Database method, e.g. by migrations, count under "raw".
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._methods = {}
+        self._gauges = {}        # name -> (value, help text)
+        self.slow_queries = 0
+
+    def set_gauge(self, name, value, help_text=""):
+        """Record a one-off measurement (e.g. startup time) under name."""
+        with self._lock:
+            self._gauges[name] = (value, help_text)
+
+    def _stats(self, method):
+        stats = self._methods.get(method)
+        if stats is None:
+            stats = self._methods[method] = MethodStats()
+        return stats
+
+    def observe_call(self, method, seconds, rows=0, error=False):
+        with self._lock:
+            stats = self._stats(method)
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.rows += rows
+            if error:
+                stats.errors += 1
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+                    break
+
+    def observe_statement(self, method, seconds, rows, nbytes, slow=False):
+        with self._lock:
+            stats = self._stats(method or "raw")
+            stats.statements += 1
+            stats.statement_seconds += seconds
+            stats.fetched_rows += rows
+            stats.fetched_bytes += nbytes
+            if slow:
+                self.slow_queries += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {method: stats.as_dict() for method, stats in self._methods.items()}
+
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
+            self._gauges.clear()
+            self.slow_queries = 0
+
+    def to_prometheus(self, prefix="fjms_db"):
+        with self._lock:
+            methods = sorted(self._methods.items())
+            gauges = sorted(self._gauges.items())
+            slow = self.slow_queries
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.extend(samples)
+
+        def per_method(name, attr):
+            return [f'{prefix}_{name}{{method="{m}"}} {getattr(s, attr)}' for m, s in methods]
+
+        family("calls_total", "counter", "Database method calls.", per_method("calls_total", "calls"))
+        family("errors_total", "counter", "Database method calls that raised.",
+               per_method("errors_total", "errors"))
+        family("rows_returned_total", "counter", "Rows returned by Database methods.",
+               per_method("rows_returned_total", "rows"))
+
+        samples = []
+        for m, s in methods:
+            if not s.calls:
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS, s.buckets):
+                cumulative += count
+                samples.append(f'{prefix}_call_duration_seconds_bucket{{method="{m}",le="{bound}"}} {cumulative}')
+            samples.append(f'{prefix}_call_duration_seconds_bucket{{method="{m}",le="+Inf"}} {s.calls}')
+            samples.append(f'{prefix}_call_duration_seconds_sum{{method="{m}"}} {s.seconds:.6f}')
+            samples.append(f'{prefix}_call_duration_seconds_count{{method="{m}"}} {s.calls}')
+        family("call_duration_seconds", "histogram", "Database method duration.", samples)
+
+        family("statements_total", "counter", "SQL statements executed.",
+               per_method("statements_total", "statements"))
+        family("statement_seconds_total", "counter", "Time spent executing and fetching.",
+               [f'{prefix}_statement_seconds_total{{method="{m}"}} {s.statement_seconds:.6f}'
+                for m, s in methods])
+        family("fetched_rows_total", "counter", "Rows fetched from the server.",
+               per_method("fetched_rows_total", "fetched_rows"))
+        family("fetched_bytes_total", "counter", "Approximate bytes fetched from the server.",
+               per_method("fetched_bytes_total", "fetched_bytes"))
+        family("slow_queries_total", "counter", "Statements slower than the slow-query threshold.",
+               [f"{prefix}_slow_queries_total {slow}"])
+        for name, (value, help_text) in gauges:
+            family(name, "gauge", help_text or name, [f"{prefix}_{name} {value}"])
+        return "\n".join(lines) + "\n"
+
+
+# ------------------------------
+# Slow-query log
+# ------------------------------
+class SlowQueryLog:
+    """Keeps the most recent statements slower than threshold_ms and, if
+    path is given, appends each one to it as a JSON line."""
+
+    def __init__(self, threshold_ms=SLOW_QUERY_MS, path=None, keep=100):
+        self.threshold_ms = threshold_ms
+        self.path = path
+        self.entries = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def is_slow(self, seconds):
+        return self.threshold_ms is not None and seconds * 1000 >= self.threshold_ms
+
+    def record(self, method, sql, seconds, rows, nbytes):
+        entry = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "method": method or "raw",
+                 "ms": round(seconds * 1000, 3), "rows": rows, "bytes": nbytes,
+                 "sql": " ".join(sql.split())}
+        trace = current_trace.get()
+        if trace is not None:
+            entry["action"] = trace.action
+        return self._append(entry)
+
+    def record_action(self, trace):
+        """on_trace hook: log a UI action that took longer than threshold_ms.
+
+        The entry names the action, its query count and slowest query;
+        faster actions are ignored (returns None).
+        """
+        if trace.duration_ms is None or not self.is_slow(trace.duration_ms / 1000):
+            return None
+        entry = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "action": trace.action,
+                 "ms": trace.duration_ms, "queries": len(trace.queries)}
+        slowest = max(trace.queries, key=lambda q: q[2], default=None)
+        if slowest is not None:
+            entry["slowest"] = {"method": slowest[0], "ms": slowest[2]}
+        if trace.error:
+            entry["error"] = trace.error
+        return self._append(entry)
+
+    def _append(self, entry):
+        with self._lock:
+            self.entries.append(entry)
+            if self.path:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(entry) + "\n")
+                except OSError:
+                    pass    # the in-memory log still has it
+        return entry
+
+
+# ------------------------------
+# Tracing
+# ------------------------------
+class Trace:
+    """The statements one UI action (e.g. "login") triggered."""
+
+    def __init__(self, action):
+        self.action = action
+        self.started = time.perf_counter()
+        self.duration_ms = None
+        self.error = None
+        self.queries = []    # (method, sql, ms, rows)
+
+    def add(self, method, sql, seconds, rows):
+        self.queries.append((method or "raw", " ".join(sql.split()), round(seconds * 1000, 3), rows))
+
+    def finish(self, error=None):
+        self.duration_ms = round((time.perf_counter() - self.started) * 1000, 3)
+        self.error = error
+
+
+class InstrumentedCursor:
+    """Cursor proxy that times each statement from execute until the next
+    execute (or close), so lazily-stepped fetches are counted too."""
+
+    def __init__(self, cursor, instrumentation):
+        object.__setattr__(self, "_cursor", cursor)
+        object.__setattr__(self, "_instrumentation", instrumentation)
+        object.__setattr__(self, "_statement", None)   # [sql, seconds, rows, bytes]
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        # e.g. fast_executemany on pyodbc cursors
+        setattr(self._cursor, name, value)
+
+    def _timed(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self._statement[1] += time.perf_counter() - start
+
+    def execute(self, sql, *params):
+        self.finish()
+        object.__setattr__(self, "_statement", [sql, 0.0, 0, 0])
+        self._timed(self._cursor.execute, sql, *params)
+        return self
+
+    def executemany(self, sql, rows):
+        self.finish()
+        object.__setattr__(self, "_statement", [sql, 0.0, 0, 0])
+        self._timed(self._cursor.executemany, sql, rows)
+        return self
+
+    def _count(self, rows):
+        self._statement[2] += len(rows)
+        self._statement[3] += sum(row_size(r) for r in rows)
+        return rows
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None and self._statement is not None:
+            self._count([row])
+        return row
+
+    def fetchall(self):
+        return self._count(self._timed(self._cursor.fetchall))
+
+    def fetchmany(self, size):
+        return self._count(self._timed(self._cursor.fetchmany, size))
+
+    def finish(self):
+        if self._statement is not None:
+            sql, seconds, rows, nbytes = self._statement
+            object.__setattr__(self, "_statement", None)
+            self._instrumentation.statement_done(sql, seconds, rows, nbytes)
+
+
+# ------------------------------
+# Wiring
+# ------------------------------
+class Instrumentation:
+    """Metrics, slow-query log and trace hooks attached to one Database.
+
+    Use instrument(db) to attach. on_trace callbacks receive each finished
+    Trace; Database statements run inside trace(action) are added to it.
+    """
+
+    def __init__(self, metrics=None, slow_log=None, on_trace=None):
+        self.metrics = metrics or Metrics()
+        self.slow_log = slow_log or SlowQueryLog()
+        self.on_trace = list(on_trace or [])
+
+    def wrap_cursor(self, cursor):
+        return InstrumentedCursor(cursor, self)
+
+    def statement_done(self, sql, seconds, rows, nbytes):
+        method = current_method.get()
+        slow = self.slow_log.is_slow(seconds)
+        self.metrics.observe_statement(method, seconds, rows, nbytes, slow)
+        if slow:
+            self.slow_log.record(method, sql, seconds, rows, nbytes)
+        trace = current_trace.get()
+        if trace is not None:
+            trace.add(method, sql, seconds, rows)
+
+    @contextmanager
+    def trace(self, action):
+        trace = Trace(action)
+        token = current_trace.set(trace)
+        try:
+            yield trace
+        except BaseException as e:
+            trace.finish(error=str(e) or type(e).__name__)
+            raise
+        else:
+            trace.finish()
+        finally:
+            current_trace.reset(token)
+            for hook in self.on_trace:
+                try:
+                    hook(trace)
+                except Exception:
+                    pass    # a broken hook must not fail the action
+
+    def traced(self, action, fn):
+        """fn wrapped to run inside trace(action) (for worker threads)."""
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            with self.trace(action):
+                return fn(*args, **kwargs)
+        return run
+
+    def wrap_method(self, name, method):
+        metrics = self.metrics
+
+        if inspect.isgeneratorfunction(method):
+            @functools.wraps(method)
+            def stream(*args, **kwargs):
+                # the method is only "running" while the generator steps
+                rows, error = 0, False
+                seconds = 0.0
+                rows_iter = method(*args, **kwargs)
+                try:
+                    while True:
+                        token = current_method.set(name)
+                        start = time.perf_counter()
+                        try:
+                            row = next(rows_iter)
+                        except StopIteration:
+                            break
+                        finally:
+                            seconds += time.perf_counter() - start
+                            current_method.reset(token)
+                        rows += 1
+                        yield row
+                except BaseException as e:
+                    error = not isinstance(e, GeneratorExit)
+                    raise
+                finally:
+                    token = current_method.set(name)
+                    try:
+                        rows_iter.close()
+                    finally:
+                        current_method.reset(token)
+                    metrics.observe_call(name, seconds, rows, error)
+            return stream
+
+        @functools.wraps(method)
+        def call(*args, **kwargs):
+            token = current_method.set(name)
+            start = time.perf_counter()
+            error = False
+            result = None
+            try:
+                result = method(*args, **kwargs)
+                return result
+            except BaseException:
+                error = True
+                raise
+            finally:
+                metrics.observe_call(name, time.perf_counter() - start,
+                                     len(result) if isinstance(result, list) else 0, error)
+                current_method.reset(token)
+        return call
+
+
+def instrument(db, instrumentation=None):
+    """Time every Database method and statement of db; returns db.
+
+    Methods are wrapped on the instance, so wrappers such as
+    CachedDatabase built on top of db are measured too (cache hits never
+    reach db and so are not counted as calls).
+    """
+    instrumentation = instrumentation or Instrumentation()
+    for name, method in inspect.getmembers(type(db), inspect.isfunction):
+        if name.startswith("_") or name in UNINSTRUMENTED:
+            continue
+        setattr(db, name, instrumentation.wrap_method(name, getattr(db, name)))
+    db.instrumentation = instrumentation
+    return db
+
+
+def from_config(db, env=None):
+    """Instrument db if FJMS_METRICS or FJMS_SLOW_QUERY_MS is set.
+
+    FJMS_SLOW_QUERY_MS sets the slow-query threshold (default 200) and
+    FJMS_SLOW_QUERY_LOG a JSON Lines file to append slow queries to.
+    """
+    env = os.environ if env is None else env
+    if not env.get("FJMS_METRICS") and not env.get("FJMS_SLOW_QUERY_MS"):
+        return db
+    try:
+        threshold = float(env.get("FJMS_SLOW_QUERY_MS") or SLOW_QUERY_MS)
+    except ValueError:
+        raise Exception(f"Invalid FJMS_SLOW_QUERY_MS: {env.get('FJMS_SLOW_QUERY_MS')!r}")
+    return instrument(db, Instrumentation(
+        slow_log=SlowQueryLog(threshold, env.get("FJMS_SLOW_QUERY_LOG") or None)))
@@ -0,0 +1,206 @@
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+FREELANCER_COLUMNS = ("id", "title", "description", "budget", "category")
+ADMIN_COLUMNS = ("id", "title", "budget", "category", "client_email")
+
+DESCRIPTION_CHARS = 200     # description text kept per job (what a cell can show)
+DESCRIPTION_CACHE = 2000    # descriptions kept in memory, least recently shown dropped
+LOADING = "…"          # shown until a description arrives
+NO_BUDGET = -2 ** 63   # a NULL budget; the smallest value, so it sorts first as in SQL
+
+
+class JobStore:
+    """Columnar in-memory store of jobs for the browse tables.
+
+    Ids and budgets live in typed arrays (8 bytes a job each); categories
+    and client emails are stored once each and referenced by small
+    integer codes, so 100 000 jobs from 20 clients hold 20 email strings.
+    Only titles are kept per job as Python objects. Descriptions are not
+    kept at all: the few on screen are cached (bounded, most recently
+    shown first) and the missing ones are requested through
+    load_descriptions(job_ids) when rows come into view.
+
+    Rows are Jobs-shaped tuples (id, title, description, budget, category,
+    client_email); a description in them, if any, just warms the cache.
+    values(index) returns the tuple of `columns` for a VirtualTreeview.
+    """
+
+    def __init__(self, columns=FREELANCER_COLUMNS, load_descriptions=None):
+        self.columns = columns
+        self.load_descriptions = load_descriptions
+        self.ids = array("q")
+        self.budgets = array("q")
+        self.category_codes = array("H")
+        self.client_codes = array("I")
+        self.titles = []
+        self.categories = []          # code -> category
+        self.clients = []             # code -> client email
+        self._category_code = {}
+        self._client_code = {}
+        self._orders = {}             # column -> positions sorted by it, built on demand
+        self.descriptions = OrderedDict()   # job id -> description (LRU)
+        self._requested = set()             # ids whose description is on its way
+        self._lock = threading.Lock()       # descriptions arrive on worker threads
+
+    def __len__(self):
+        return len(self.ids)
+
+    def clear(self):
+        # codes and their strings stay: the next load mostly reuses them
+        self.ids = array("q")
+        self.budgets = array("q")
+        self.category_codes = array("H")
+        self.client_codes = array("I")
+        self.titles = []
+        self._orders = {}
+
+    @staticmethod
+    def _code(value, codes, values):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(sys.intern(value) if isinstance(value, str) else value)
+        return code
+
+    def extend(self, rows):
+        self._orders = {}
+        for job_id, title, description, budget, category, client_email in rows:
+            self.ids.append(job_id)
+            self.budgets.append(NO_BUDGET if budget is None else budget)
+            self.category_codes.append(self._code(category, self._category_code, self.categories))
+            self.client_codes.append(self._code(client_email, self._client_code, self.clients))
+            self.titles.append(title)
+            if description is not None and "description" in self.columns:
+                self.add_descriptions({job_id: description})
+
+    # ---- descriptions
+    def add_descriptions(self, descriptions):
+        with self._lock:
+            for job_id, text in descriptions.items():
+                text = text or ""
+                if len(text) > DESCRIPTION_CHARS:
+                    text = text[:DESCRIPTION_CHARS - 1] + "…"
+                self.descriptions[job_id] = text
+                self.descriptions.move_to_end(job_id)
+                self._requested.discard(job_id)
+            while len(self.descriptions) > DESCRIPTION_CACHE:
+                self.descriptions.popitem(last=False)
+
+    def description(self, job_id):
+        with self._lock:
+            text = self.descriptions.get(job_id)
+            if text is not None:
+                self.descriptions.move_to_end(job_id)
+            return text
+
+    def prefetch(self, start, stop):
+        """Request the descriptions of rows start..stop not yet in memory."""
+        self.prefetch_positions(range(start, min(stop, len(self.ids))))
+
+    def prefetch_positions(self, positions):
+        if "description" not in self.columns or self.load_descriptions is None:
+            return
+        with self._lock:
+            missing = [job_id for job_id in (self.ids[i] for i in positions)
+                       if job_id not in self.descriptions and job_id not in self._requested]
+            self._requested.update(missing)
+        if missing:
+            self.load_descriptions(missing)
+
+    def forget_requests(self, job_ids):
+        # a failed load: allow asking again next time the rows are shown
+        with self._lock:
+            self._requested.difference_update(job_ids)
+
+    # ---- rows
+    def value(self, index, column):
+        if column == "id":
+            return self.ids[index]
+        if column == "title":
+            return self.titles[index]
+        if column == "description":
+            text = self.description(self.ids[index])
+            return LOADING if text is None else text
+        if column == "budget":
+            budget = self.budgets[index]
+            return None if budget == NO_BUDGET else budget
+        if column == "category":
+            return self.categories[self.category_codes[index]]
+        if column == "client_email":
+            return self.clients[self.client_codes[index]]
+        raise KeyError(column)
+
+    def values(self, index):
+        return tuple(self.value(index, column) for column in self.columns)
+
+    def order(self, column):
+        """Row positions sorted by column, ties by id (as search_jobs orders).
+
+        Sorted once and kept until the rows change, so sorting again or
+        filtering a budget range of the budget order needs no new sort.
+        """
+        order = self._orders.get(column)
+        if order is None:
+            ids = self.ids
+            if column == "id":
+                key = ids.__getitem__
+            elif column == "budget":
+                budgets = self.budgets
+                key = lambda i: (budgets[i], ids[i])
+            elif column == "category":
+                # NULL categories first, as SQL sorts them
+                categories, codes = self.categories, self.category_codes
+                key = lambda i: (categories[codes[i]] is not None, categories[codes[i]] or "",
+                                 ids[i])
+            else:
+                raise KeyError(column)
+            order = self._orders[column] = array("I", sorted(range(len(ids)), key=key))
+            if column == "budget":
+                # the budgets in that order, for bisecting a range
+                self._orders["budget values"] = array("q", (self.budgets[i] for i in order))
+        return order
+
+    def select(self, category=None, min_budget=None, max_budget=None, order_by=None,
+               descending=False):
+        """JobStoreView of the rows in category (None or "All" for every row)
+        and the budget range, in load order or sorted by order_by."""
+        positions = self.order(order_by) if order_by else range(len(self))
+        if min_budget is not None or max_budget is not None:
+            # like SQL's budget >= ? / budget <= ?, a range leaves out NULL budgets
+            low = NO_BUDGET + 1 if min_budget is None else min_budget
+            high = -NO_BUDGET - 1 if max_budget is None else max_budget
+            if order_by == "budget":
+                # a contiguous slice of the budget order
+                values = self._orders["budget values"]
+                positions = positions[bisect_left(values, low):bisect_right(values, high)]
+            else:
+                budgets = self.budgets
+                positions = [i for i in positions if low <= budgets[i] <= high]
+        if category not in (None, "", "All"):
+            code = self._category_code.get(category)
+            codes = self.category_codes
+            positions = [i for i in positions if codes[i] == code]
+        if descending:
+            positions = positions[::-1]
+        return JobStoreView(self, array("I", positions))
+
+
+class JobStoreView:
+    """A filtered window onto a JobStore: row positions only, no copies."""
+
+    def __init__(self, store, positions):
+        self.store = store
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def values(self, index):
+        return self.store.values(self.positions[index])
+
+    def prefetch(self, start, stop):
+        self.store.prefetch_positions(self.positions[start:stop])
@@ -1,25 +1,325 @@
+import contextlib
+import sys
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
-from database import Database
+from cache import cached
+from database import CancelScope, Database
+import instrumentation
+from indexer import Indexer
+from job_store import ADMIN_COLUMNS, FREELANCER_COLUMNS, JobStore
+from matching import IncrementalSearch, MatchingEngine
+from services import (Services, ServiceError, Session, validate_application,
+                      validate_budget_range, validate_job, validate_login, validate_user)
+from worker import TaskRunner
 
 BG_COLOR = "#F8F7FC"
 PRIMARY = "#6D28D9"
 ACCENT = "#E9D8FD"
 TEXT = "#1F1B2E"
 
+PAGE_SIZE = 200   # rows fetched per page by the lazily loaded job tables
+RECOMMEND_COUNT = 50   # jobs shown in the "Recommended for you" view
+REPORT_MATCHES = 3     # best applicants listed per job in the admin match report
+STARTUP_TARGET_MS = 500   # budget for launch -> usable login screen
+SEARCH_DEBOUNCE_MS = 150  # typing pause before search-as-you-type runs
+SORTABLE_HEADINGS = {"ID": "id", "Budget": "budget", "Category": "category"}
+ANY_BUDGET = "Any budget"
+
 def notify(msg):
     messagebox.showinfo("Notification", msg)
 
-class AppError(Exception):
-    """Custom exception for application errors."""
-    pass
+# UI checks and service-layer validation report through the same error type
+AppError = ServiceError
 
 # ---- Base page/class (Frame) ----
 class AppPage(ttk.Frame):
     def __init__(self, master, app, **kwargs):
         super().__init__(master, **kwargs)
         self.app = app        # reference to App instance (controller)
-        self.db = app.db      # convenience alias
+
+    @property
+    def db(self):
+        return self.app.db    # convenience alias; None until connected
+
+
+# ---- Virtualized Treeview ----
+DISPLAY_CHARS = 200     # Treeview cells are one line: longer text is cut for display
+INTERN_CHARS = 64       # shorter strings (categories, emails) are shared between rows
+WHEEL_ROWS = 3          # rows scrolled per mouse-wheel notch
+
+
+class RowStore:
+    """Compact backing store for a VirtualTreeview: one tuple of display
+    values per row. Long text is cut to what a cell can show and short
+    repeated strings are interned, so a million rows cost a list of small
+    tuples instead of a million Treeview items."""
+
+    def __init__(self):
+        self.rows = []
+
+    def __len__(self):
+        return len(self.rows)
+
+    def clear(self):
+        self.rows = []
+
+    def extend(self, rows):
+        self.rows.extend(tuple(self.compact(v) for v in values) for values in rows)
+
+    def values(self, index):
+        return self.rows[index]
+
+    @staticmethod
+    def compact(value):
+        if isinstance(value, str):
+            if len(value) > DISPLAY_CHARS:
+                return value[:DISPLAY_CHARS - 1] + "\u2026"
+            if len(value) <= INTERN_CHARS:
+                return sys.intern(value)
+        return value
+
+
+class VirtualTreeview:
+    """Shows any number of rows in a Treeview while only the visible window
+    exists as real items.
+
+    Rows live in store (anything with len() and values(index), RowStore by
+    default). Scrolling does not move the Treeview: it moves the window
+    and rewrites the same few items with the rows now in view, so
+    filling, clearing and scrolling cost O(visible rows) widget calls
+    whatever the list length. Selection is kept by row index, so it
+    survives items being recycled. on_scroll(first, last) gets the
+    visible fraction of the list, like a yscrollcommand.
+    """
+
+    def __init__(self, tree, scrollbar=None, store=None, on_scroll=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.store = store if store is not None else RowStore()
+        self.on_scroll = on_scroll
+        self.offset = 0          # store index of the top visible row
+        self.items = []          # recycled Treeview item ids, top to bottom
+        self.selected = set()    # selected store indices
+
+        if scrollbar is not None:
+            scrollbar.configure(command=self.yview)
+        tree.bind("<Configure>", lambda e: self.refresh(), add="+")
+        tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+        tree.bind("<MouseWheel>", self._on_wheel, add="+")
+        tree.bind("<Button-4>", lambda e: self.scroll(-WHEEL_ROWS) or "break", add="+")
+        tree.bind("<Button-5>", lambda e: self.scroll(WHEEL_ROWS) or "break", add="+")
+        tree.bind("<Up>", lambda e: self._step(-1), add="+")
+        tree.bind("<Down>", lambda e: self._step(1), add="+")
+        tree.bind("<Prior>", lambda e: self.scroll(-self.visible_rows()) or "break", add="+")
+        tree.bind("<Next>", lambda e: self.scroll(self.visible_rows()) or "break", add="+")
+        tree.bind("<Home>", lambda e: self.scroll_to(0) or "break", add="+")
+        tree.bind("<End>", lambda e: self.scroll_to(len(self.store)) or "break", add="+")
+
+    def __len__(self):
+        return len(self.store)
+
+    # ---- contents
+    def show(self, store):
+        """Display another store (e.g. a filtered view of the same rows)."""
+        self.store = store
+        self.offset = 0
+        self.selected.clear()
+        self.refresh()
+
+    def clear(self):
+        self.store.clear()
+        self.offset = 0
+        self.selected.clear()
+        self.refresh()
+
+    def extend(self, rows):
+        self.store.extend(rows)
+        self.refresh()
+
+    def selected_values(self):
+        self._on_select()    # <<TreeviewSelect>> may not have been processed yet
+        return [self.store.values(i) for i in sorted(self.selected) if i < len(self.store)]
+
+    # ---- window
+    def visible_rows(self):
+        rows = int(self.tree.cget("height"))
+        if self.items and self.tree.winfo_ismapped():
+            box = self.tree.bbox(self.items[0])
+            if box:
+                header, row_height = box[1], max(1, box[3])
+                rows = max(1, (self.tree.winfo_height() - header) // row_height)
+        return rows
+
+    def refresh(self):
+        if not self.tree.winfo_exists():
+            return
+        total = len(self.store)
+        visible = self.visible_rows()
+        self.offset = max(0, min(self.offset, total - visible))
+        count = min(visible, total - self.offset)
+        prefetch = getattr(self.store, "prefetch", None)
+        if prefetch is not None:
+            prefetch(self.offset, self.offset + count)   # e.g. lazily loaded descriptions
+
+        while len(self.items) > count:
+            self.tree.delete(self.items.pop())
+        for pos in range(count):
+            values = self.store.values(self.offset + pos)
+            if pos < len(self.items):
+                self.tree.item(self.items[pos], values=values)
+            else:
+                self.items.append(self.tree.insert("", "end", values=values))
+
+        wanted = [iid for pos, iid in enumerate(self.items) if self.offset + pos in self.selected]
+        if set(wanted) != set(self.tree.selection()):
+            self.tree.selection_set(wanted)
+
+        first, last = (self.offset / total, (self.offset + count) / total) if total else (0.0, 1.0)
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        if self.on_scroll:
+            self.on_scroll(first, last)
+
+    def scroll_to(self, offset):
+        self._on_select()    # record the selection before its items are reused
+        self.offset = max(0, offset)
+        self.refresh()
+
+    def scroll(self, rows):
+        self.scroll_to(self.offset + rows)
+
+    def yview(self, *args):
+        # scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"|"pages")
+        if args and args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.store)))
+        elif args and args[0] == "scroll":
+            step = self.visible_rows() if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
+
+    # ---- events
+    def _on_select(self, event=None):
+        # the Treeview only knows the visible rows; the rest keep their state
+        shown = range(self.offset, self.offset + len(self.items))
+        self.selected.difference_update(shown)
+        positions = {iid: pos for pos, iid in enumerate(self.items)}
+        self.selected.update(self.offset + positions[iid]
+                             for iid in self.tree.selection() if iid in positions)
+
+    def _on_wheel(self, event):
+        notches = -int(event.delta / 120) or (-1 if event.delta > 0 else 1)
+        self.scroll(notches * WHEEL_ROWS)
+        return "break"
+
+    def _step(self, rows):
+        # arrow keys past the window's edge scroll instead of stopping
+        if not self.items:
+            return None
+        edge = self.items[0] if rows < 0 else self.items[-1]
+        if self.tree.focus() != edge:
+            return None
+        before = self.offset
+        self.scroll(rows)
+        if self.offset == before:
+            return "break"
+        self.selected = {self.offset + self.items.index(edge)}
+        self.refresh()
+        self.tree.focus(edge)
+        return "break"
+
+
+# ---- Lazily loaded Treeview ----
+class PagedTreeview:
+    """Fills a VirtualTreeview one page at a time, fetching the next page
+    when the user scrolls near the end of the loaded rows.
+
+    fetch_page(after_id, page_size) must return rows ordered by id with the
+    id in column 0; to_values(row) maps a row to what store keeps (a
+    RowStore by default, which keeps the Treeview values tuple; None
+    hands rows to the store as they are). Pages are fetched on the
+    runner's worker threads; loading a new source supersedes any page
+    still in flight for the old one.
+    """
+
+    def __init__(self, tree, to_values, runner, scrollbar=None, page_size=PAGE_SIZE,
+                 threshold=0.9, on_error=None, store=None):
+        self.tree = tree
+        self.to_values = to_values or (lambda row: row)
+        self.runner = runner
+        self.scrollbar = scrollbar
+        self.page_size = page_size
+        self.threshold = threshold
+        self.on_error = on_error
+        self.fetch_page = None
+        self.last_id = 0
+        self.exhausted = True
+        self.complete = False     # every row of the source loaded, none failed
+        self.loading = False
+        self.scheduled = False
+        self.reset = False
+        self.error_message = None
+
+        self.store = store if store is not None else RowStore()
+        self.view = VirtualTreeview(tree, scrollbar, self.store, on_scroll=self._on_scroll)
+
+    def load(self, fetch_page, error_message="DB error loading rows"):
+        """Replace the table contents with the first page of a new source.
+
+        The old rows stay visible until the first new page arrives.
+        """
+        self.fetch_page = fetch_page
+        self.error_message = error_message
+        self.last_id = 0
+        self.exhausted = False
+        self.complete = False
+        self.loading = False
+        self.reset = True
+        self.load_next()
+
+    def load_next(self):
+        if self.exhausted or self.loading or self.fetch_page is None:
+            return
+        self.loading = True
+        fetch_page, after_id, size = self.fetch_page, self.last_id, self.page_size
+        self.runner.submit(lambda: fetch_page(after_id, size),
+                           self._append, self._failed, key=self)
+
+    def selected_values(self):
+        return self.view.selected_values()
+
+    def _append(self, rows):
+        self.loading = False
+        if not self.tree.winfo_exists():
+            return
+        if rows:
+            self.last_id = rows[-1][0]
+        if len(rows) < self.page_size:
+            self.exhausted = True
+            self.complete = True
+        if self.reset:
+            # only the visible items are touched, however many rows there were
+            self.reset = False
+            self.view.store = self.store
+            self.view.clear()
+        self.view.extend(self.to_values(r) for r in rows)
+
+    def _failed(self, ex):
+        self.loading = False
+        self.exhausted = True
+        if self.on_error:
+            message = self.error_message if self.reset else "DB error loading more rows"
+            self.on_error(f"{message}: {ex}")
+
+    def _on_scroll(self, first, last):
+        if not self.exhausted and not self.scheduled and float(last) >= self.threshold:
+            # defer so the fetch does not run inside Tk's scroll callback
+            self.scheduled = True
+            self.tree.after_idle(self._load_next_safely)
+
+    def _load_next_safely(self):
+        self.scheduled = False
+        self.load_next()
 
 
 # ---- Login Page ----
@@ -61,39 +361,36 @@ class LoginPage(AppPage):
             email = self.login_email_entry.get().strip()
             pwd = self.login_password_entry.get().strip()
 
-            if not email or not pwd or not role:
-                raise AppError("All login fields are required.")
-
-            if role == "Admin":
-                # admin hardcoded
-                if email == "admin@gmail.com" and pwd == "admin123":
-                    notify("Admin Logged In")
-                    self.app.current_user_email = email
-                    self.app.current_role = role
-                    self.app.open_role_dashboard("Admin")
-                    self.app.admin_page.load_view()   # refresh admin view
-                else:
-                    raise AppError("Incorrect admin credentials.")
-            else:
-                try:
-                    row = self.db.validate_login(email, pwd, role)
-                except Exception as dbex:
-                    raise AppError(f"DB error during login: {dbex}")
-
-                if row:
-                    notify(f"Logged in as {role}")
-                    self.app.current_user_email = email
-                    self.app.current_role = role
-                    self.app.open_role_dashboard(role)
-                    self.app.client_page.refresh_job_tables()
-                    self.app.freelancer_page.refresh_jobs()
-                else:
-                    raise AppError("No such user. Please register first.")
+            validate_login(email, pwd, role)
+            self.app.run_async(
+                lambda: self.app.services.login(email, pwd, role),
+                self.finish_login,
+                self.login_failed,
+                key="login",
+            )
         except AppError as e:
             self.app.handle_error(str(e))
         except Exception as ex:
             self.app.handle_error(f"Unexpected error: {ex}")
 
+    def login_failed(self, ex):
+        if isinstance(ex, ServiceError):
+            self.app.handle_error(str(ex))   # wrong credentials / no such user
+        else:
+            self.app.handle_error(f"DB error during login: {ex}")
+
+    def finish_login(self, session):
+        self.app.current_user_email = session.email
+        self.app.current_role = session.role
+        if session.role == "Admin":
+            notify("Admin Logged In")
+            if self.app.open_role_dashboard("Admin"):
+                self.app.admin_page.load_view()   # refresh admin view
+            return
+        notify(f"Logged in as {session.role}")
+        self.app.refresh_job_views()   # dashboards opened before, for the new user
+        self.app.open_role_dashboard(session.role)
+
 # ---- Register Page ----
 class RegisterPage(AppPage):
     def __init__(self, master, app):
@@ -136,26 +433,13 @@ class RegisterPage(AppPage):
         password = self.reg_password_entry.get().strip()
         role = self.reg_role_var.get().strip()
 
-
-        if not fullname or not email or not password or not role:
-                self.app.handle_error("All fields are required!")
-                return
-        
-        if "@" not in email or "." not in email:
-            messagebox.showerror("Error", "Invalid email format")
-            return
-
-        if len(password) < 6:
-            messagebox.showerror("Error", "Password must be at least 6 characters")
-            return
-
-        if role not in ("Client", "Freelancer"):
-            messagebox.showerror("Error", "Please select a role")
+        try:
+            validate_user(fullname, email, password, role)
+        except ServiceError as e:
+            messagebox.showerror("Error", str(e))
             return
 
-        # Database insert
-        try:
-            self.db.register_user(fullname, email, password, role)
+        def registered(_):
             messagebox.showinfo("Success", "Registration successful!")
 
             self.reg_name_entry.delete(0, tk.END)
@@ -163,8 +447,13 @@ class RegisterPage(AppPage):
             self.reg_password_entry.delete(0, tk.END)
             self.reg_role_var.set("")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Registration failed: {e}")
+        # Database insert
+        self.app.run_async(
+            lambda: self.app.services.register(fullname, email, password, role),
+            registered,
+            lambda e: messagebox.showerror("Error", f"Registration failed: {e}"),
+            action="register",
+        )
 
 # ---- Client Dashboard ----
 class ClientDashboard(AppPage):
@@ -209,9 +498,9 @@ class ClientDashboard(AppPage):
         jobs_frame.pack(fill="both", expand=True, pady=10)
 
         self.client_job_table = ttk.Treeview(
-            jobs_frame, columns=("ID", "Title", "Budget", "Category"), show="headings"
+            jobs_frame, columns=("ID", "Title", "Budget", "Category", "Applicants"), show="headings"
         )
-        for col in ("ID", "Title", "Budget", "Category"):
+        for col in ("ID", "Title", "Budget", "Category", "Applicants"):
             self.client_job_table.heading(col, text=col)
         self.client_job_table.pack(fill="both", expand=True)
 
@@ -226,43 +515,49 @@ class ClientDashboard(AppPage):
 
     def add_job(self):
         try:
-            if self.app.current_role != "Client" or not self.app.current_user_email:
+            session = self.app.session
+            if session.role != "Client" or not session.email:
                 raise AppError("You must be logged in as a Client to post jobs.")
 
             title = self.client_title_entry.get().strip()
             desc = self.client_desc_entry.get("1.0", "end").strip()
             budget = self.client_budget_entry.get().strip()
-
-            if not title or not desc or not budget:
-                raise AppError("All fields must be filled to post a job.")
-            if not budget.isdigit():
-                raise AppError("Budget must be a numeric value.")
-
+            validate_job(title, desc, budget)
             category = self.client_category_var.get()
-            try:
-                self.db.insert_job(title, desc, int(budget), category, self.app.current_user_email)
-            except Exception as ex:
-                raise AppError(f"DB error inserting job: {ex}")
 
-            self.refresh_job_tables()
-            notify("Job posted successfully!")
+            def posted(_):
+                self.refresh_job_tables()
+                notify("Job posted successfully!")
+
+            self.app.run_async(
+                lambda: self.app.services.post_job(session, title, desc, budget, category),
+                posted,
+                lambda ex: self.app.handle_error(f"DB error inserting job: {ex}"),
+                action="post_job",
+            )
         except AppError as e:
             self.app.handle_error(str(e))
         except Exception as ex:
             self.app.handle_error(f"Unexpected error: {ex}")
 
     def refresh_job_tables(self):
-        # refresh client and freelancer views in App
-        for r in self.client_job_table.get_children():
-            self.client_job_table.delete(r)
-        try:
-            rows = self.db.get_jobs()
-            for r in rows:
-                jid = r[0]; title = r[1]; desc = r[2]; budget = r[3]; category = r[4]; client_email = r[5]
-                if self.app.current_role == "Client" and self.app.current_user_email == client_email:
-                    self.client_job_table.insert("", "end", values=(jid, title, budget, category))
-        except Exception as ex:
-            self.app.handle_error(f"DB error refreshing job tables: {ex}")
+        if self.app.current_role != "Client" or not self.app.current_user_email:
+            self.app.runner.cancel("client_jobs")
+            self.client_job_table.delete(*self.client_job_table.get_children())
+            return
+        email = self.app.current_user_email
+        # only this client's jobs, with applicant counts from one grouped query
+        self.app.run_async(
+            lambda: self.db.get_jobs_by_client(email, with_counts=True),
+            self.fill_job_table,
+            lambda ex: self.app.handle_error(f"DB error refreshing job tables: {ex}"),
+            key="client_jobs",
+        )
+
+    def fill_job_table(self, rows):
+        self.client_job_table.delete(*self.client_job_table.get_children())
+        for jid, title, budget, category, applicants in rows:
+            self.client_job_table.insert("", "end", values=(jid, title, budget, category, applicants))
 
     def client_delete_job(self):
         try:
@@ -270,21 +565,18 @@ class ClientDashboard(AppPage):
             if not sel:
                 raise AppError("Select a job first.")
             jid = int(self.client_job_table.item(sel[0], "values")[0])
-            try:
-                self.db.delete_job(jid)
-            except Exception as ex:
-                raise AppError(f"DB error deleting job: {ex}")
-
-            # remove Applications (DB.delete_job)
-            try:
-                self.db.cursor.execute("DELETE FROM Applications WHERE job_id=?", (jid,))
-                self.db.conn.commit()
-            except Exception:
-                pass
-
-            self.refresh_job_tables()
-            self.app.freelancer_page.refresh_jobs()
-            notify("Job deleted successfully!")
+
+            def deleted(_):
+                self.app.refresh_job_views()
+                notify("Job deleted successfully!")
+
+            session = self.app.session
+            self.app.run_async(
+                lambda: self.app.services.delete_job(session, jid),
+                deleted,
+                lambda ex: self.app.handle_error(f"DB error deleting job: {ex}"),
+                action="delete_job",
+            )
         except AppError as e:
             self.app.handle_error(str(e))
         except Exception as ex:
@@ -298,8 +590,20 @@ class ClientDashboard(AppPage):
 
             jid = int(self.client_job_table.item(sel[0], "values")[0])
 
-            apps = self.db.get_applications(jid)
+            session = self.app.session
+            self.app.run_async(
+                lambda: self.app.services.applicants(session, jid),
+                lambda apps: self.show_applicants(jid, apps),
+                lambda ex: self.app.handle_error(f"DB error reading applicants: {ex}"),
+                action="view_applicants",
+            )
+        except AppError as e:
+            self.app.handle_error(str(e))
+        except Exception as ex:
+            self.app.handle_error(f"Unexpected error: {ex}")
 
+    def show_applicants(self, jid, apps):
+        try:
             win = tk.Toplevel(self)
             win.title(f"Applicants for Job ID {jid}")
             win.geometry("600x400")
@@ -332,8 +636,6 @@ class ClientDashboard(AppPage):
             for email, name, skills in apps:
                 tree.insert("", "end", values=(name, email, skills))
 
-        except AppError as e:
-            self.app.handle_error(str(e))
         except Exception as ex:
             self.app.handle_error(f"Unexpected error: {ex}")
 
@@ -342,6 +644,16 @@ class ClientDashboard(AppPage):
 class FreelancerDashboard(AppPage):
     def __init__(self, master, app):
         super().__init__(master, app)
+        self._debounce = None         # pending after() id of a live search
+        self._last_search = None      # (keyword, category) last searched
+        self._search_scope = None     # CancelScope of the running search
+        self._live_search = None      # IncrementalSearch over the job index
+        self._index_requested = False
+        self._showing_all = False     # the store holds every job (refresh_jobs)
+        self._sort = None             # (column, descending) picked from a heading
+        self._facet_keyword = None    # keyword the combobox counts are for
+        self._category_labels = {}    # combobox label -> category
+        self._budget_labels = {}      # combobox label -> (min, max)
         self.build()
 
     def build(self):
@@ -358,32 +670,66 @@ class FreelancerDashboard(AppPage):
         tk.Label(search_row, text="Search:", bg=BG_COLOR).pack(side="left")
         self.search_entry = tk.Entry(search_row, width=30)
         self.search_entry.pack(side="left", padx=5)
+        self.search_entry.bind("<KeyRelease>", self.on_search_typed)
 
         tk.Button(search_row, text="Go", bg=PRIMARY,fg="white",
                   command=self.search_jobs).pack(side="left")
 
+        # categories and budget ranges come from the jobs themselves, with
+        # their counts for the current keyword (see show_facets)
         tk.Label(search_row, text="Category:", bg=BG_COLOR).pack(side="left", padx=12)
         self.filter_var = tk.StringVar()
-        ttk.Combobox(
-            search_row, width=15, state="readonly",
+        self.category_box = ttk.Combobox(
+            search_row, width=18, state="readonly",
             textvariable=self.filter_var,
-            values=["All", "Technical", "Writing", "Design", "Business", "Other"]
-        ).pack(side="left")
+            values=["All"]
+        )
+        self.category_box.pack(side="left")
+        self.category_box.bind("<<ComboboxSelected>>", lambda e: self.search_jobs())
         self.filter_var.set("All")
 
+        tk.Label(search_row, text="Budget:", bg=BG_COLOR).pack(side="left", padx=(12, 0))
+        self.min_budget_entry = tk.Entry(search_row, width=7)
+        self.min_budget_entry.pack(side="left", padx=3)
+        tk.Label(search_row, text="to", bg=BG_COLOR).pack(side="left")
+        self.max_budget_entry = tk.Entry(search_row, width=7)
+        self.max_budget_entry.pack(side="left", padx=3)
+        for entry in (self.min_budget_entry, self.max_budget_entry):
+            entry.bind("<Return>", lambda e: self.search_jobs())
+        self.budget_var = tk.StringVar(value=ANY_BUDGET)
+        self.budget_box = ttk.Combobox(search_row, width=16, state="readonly",
+                                       textvariable=self.budget_var, values=[ANY_BUDGET])
+        self.budget_box.pack(side="left", padx=3)
+        self.budget_box.bind("<<ComboboxSelected>>", lambda e: self.pick_budget_range())
+
         tk.Button(search_row, text="Apply", bg=PRIMARY, fg="white",
                   command=self.search_jobs ).pack(side="left", padx=6)
 
+        # skill-based recommendations
+        rec_row = tk.Frame(outer, bg=BG_COLOR)
+        rec_row.pack(fill="x", pady=(6, 0))
+
+        tk.Label(rec_row, text="Your skills:", bg=BG_COLOR).pack(side="left")
+        self.skills_entry = tk.Entry(rec_row, width=40)
+        self.skills_entry.pack(side="left", padx=5)
+
+        tk.Button(rec_row, text="Recommended for you", bg=PRIMARY, fg="white",
+                  command=self.show_recommended).pack(side="left")
+
         job_frame = tk.LabelFrame(outer, text="Available Jobs", bg=BG_COLOR)
         job_frame.pack(fill="both", expand=True)
 
         self.freelancer_job_table = ttk.Treeview(
             job_frame,
             columns=("ID", "Title", "Description", "Budget", "Category"),
-            show="headings"
+            show="headings",
+            selectmode="extended"     # ctrl/shift-click to apply to several jobs
         )
         for col in ("ID", "Title", "Description", "Budget", "Category"):
             self.freelancer_job_table.heading(col, text=col)
+        for col in SORTABLE_HEADINGS:
+            # click to sort, click again to reverse
+            self.freelancer_job_table.heading(col, command=lambda c=col: self.sort_jobs(c))
 
         self.freelancer_job_table.column("ID", width=40, anchor="center")
         self.freelancer_job_table.column("Title", width=160)
@@ -391,8 +737,21 @@ class FreelancerDashboard(AppPage):
         self.freelancer_job_table.column("Budget", width=70, anchor="center")
         self.freelancer_job_table.column("Category", width=100)
 
+        job_scroll = ttk.Scrollbar(job_frame, orient="vertical")
+        job_scroll.pack(side="right", fill="y")
         self.freelancer_job_table.pack(fill="both", expand=True)
 
+        # jobs are kept column-wise; descriptions are fetched for the rows on screen
+        self.job_store = JobStore(FREELANCER_COLUMNS, load_descriptions=self.load_descriptions)
+        self.freelancer_pager = PagedTreeview(
+            self.freelancer_job_table,
+            None,
+            self.app.runner,
+            scrollbar=job_scroll,
+            on_error=self.app.handle_error,
+            store=self.job_store,
+        )
+
         tk.Button(outer, text="Apply for Selected Job", bg=PRIMARY, fg="white",
                   command=self.apply_selected_job).pack(pady=10)
 
@@ -402,46 +761,224 @@ class FreelancerDashboard(AppPage):
         self.refresh_jobs()
 
     def refresh_jobs(self):
-        for r in self.freelancer_job_table.get_children():
-            self.freelancer_job_table.delete(r)
-        try:
-            rows = self.db.get_jobs()
-            for r in rows:
-                jid = r[0]; title = r[1]; desc = r[2]; budget = r[3]; category = r[4]; client_email = r[5]
-                self.freelancer_job_table.insert("", "end", values=(jid, title, desc, budget, category))
-        except Exception as ex:
-            self.app.handle_error(f"DB error refreshing freelancer table: {ex}")
+        self._last_search = ("", "All")
+        self._showing_all = True
+        self.filter_var.set("All")
+        self.min_budget_entry.delete(0, "end")
+        self.max_budget_entry.delete(0, "end")
+        self.set_sort(None)
+        self.load_facets("", force=True)     # jobs may have been posted or deleted
+        self.freelancer_pager.load(self.db.get_job_summaries_page,
+                                   "DB error refreshing freelancer table")
+
+    def load_descriptions(self, job_ids):
+        def loaded(descriptions):
+            # deleted jobs come back without one: show them blank, not loading
+            self.job_store.add_descriptions({j: descriptions.get(j, "") for j in job_ids})
+            self.freelancer_pager.view.refresh()
+
+        self.app.runner.submit(lambda: self.db.get_job_descriptions(job_ids), loaded,
+                               lambda ex: self.job_store.forget_requests(job_ids))
+
+    def load_facets(self, keyword, force=False):
+        # one grouped query (cached until a job changes) per keyword
+        if keyword == self._facet_keyword and not force:
+            return
+        self._facet_keyword = keyword
+        self.app.runner.submit(lambda: self.db.get_job_facets(keyword), self.show_facets,
+                               lambda ex: None, key="job_facets")
+
+    def show_facets(self, facets):
+        if not self.category_box.winfo_exists():
+            return
+        current = self.selected_category()
+        categories = facets["categories"]
+        labels = {f"All ({facets['total']})": "All"}
+        for category, count in sorted(categories.items(), key=lambda c: (-c[1], str(c[0]))):
+            labels[f"{category} ({count})"] = category
+        if current not in labels.values():
+            labels[f"{current} (0)"] = current      # keep the selection on the list
+        self._category_labels = labels
+        self.category_box["values"] = list(labels)
+        self.filter_var.set(next(label for label, c in labels.items() if c == current))
+
+        budgets = {ANY_BUDGET: (None, None)}
+        for low, high, count in facets["budgets"]:
+            text = f"{low}+" if high is None else f"{low}-{high}"
+            budgets[f"{text} ({count})"] = (low, high)
+        self._budget_labels = budgets
+        self.budget_box["values"] = list(budgets)
+        self.show_budget_range()
+
+    def selected_category(self):
+        value = self.filter_var.get()
+        return self._category_labels.get(value, value)
+
+    def pick_budget_range(self):
+        low, high = self._budget_labels.get(self.budget_var.get(), (None, None))
+        for entry, value in ((self.min_budget_entry, low), (self.max_budget_entry, high)):
+            entry.delete(0, "end")
+            if value is not None:
+                entry.insert(0, str(value))
+        self.search_jobs()
+
+    def show_budget_range(self):
+        # the bucket matching the typed range, blank for a range of one's own
+        typed = (self.min_budget_entry.get().strip(), self.max_budget_entry.get().strip())
+        for label, bounds in self._budget_labels.items():
+            if typed == tuple("" if b is None else str(b) for b in bounds):
+                self.budget_var.set(label)
+                return
+        self.budget_var.set("")
+
+    def sort_jobs(self, heading):
+        column = SORTABLE_HEADINGS[heading]
+        descending = self._sort == (column, False)
+        self.set_sort((column, descending))
+        self.search_jobs()
+
+    def set_sort(self, sort):
+        self._sort = sort
+        for heading, column in SORTABLE_HEADINGS.items():
+            arrow = ""
+            if sort is not None and sort[0] == column:
+                arrow = " ▼" if sort[1] else " ▲"
+            self.freelancer_job_table.heading(heading, text=heading + arrow)
+
+    def on_search_typed(self, event=None):
+        # search once typing pauses, not on every keystroke
+        if self._debounce is not None:
+            self.after_cancel(self._debounce)
+        self._debounce = self.after(SEARCH_DEBOUNCE_MS, self.search_if_changed)
+
+    def search_if_changed(self):
+        self._debounce = None
+        if (self.search_entry.get().strip(), self.selected_category()) != self._last_search:
+            self.search_jobs()
 
     def search_jobs(self):
-        keyword = self.search_entry.get().lower()
-        cat_filter = self.filter_var.get()
-        for r in self.freelancer_job_table.get_children():
-            self.freelancer_job_table.delete(r)
+        keyword = self.search_entry.get().strip()
+        cat_filter = self.selected_category()
         try:
-            rows = self.db.get_jobs()
-            for r in rows:
-                jid = r[0]; title = r[1]; desc = r[2]; budget = r[3]; category = r[4]; client_email = r[5]
-                if keyword and keyword not in title.lower() and keyword not in desc.lower():
-                    continue
-                if cat_filter != "All" and category != cat_filter:
-                    continue
-                self.freelancer_job_table.insert("", "end", values=(jid, title, desc, budget, category))
-        except Exception as ex:
-            self.app.handle_error(f"DB error searching jobs: {ex}")
+            min_budget, max_budget = validate_budget_range(self.min_budget_entry.get(),
+                                                           self.max_budget_entry.get())
+        except ServiceError as e:
+            self.app.handle_error(str(e))
+            return
+        order_by, descending = self._sort or (None, False)
+        self._last_search = (keyword, cat_filter)
+        self.show_budget_range()
+        self.load_facets(keyword)
+
+        # a newer search supersedes the old one: its page is dropped by the
+        # pager and its statement, if still running, cancelled on the server
+        if self._search_scope is not None:
+            self._search_scope.cancel()
+        scope = self._search_scope = CancelScope()
+
+        pager = self.freelancer_pager
+        if not keyword and self._showing_all and pager.complete:
+            # every job is already in memory: filter and sort the store
+            # (through its cached sort orders), no query
+            pager.view.show(self.job_store.select(cat_filter, min_budget, max_budget,
+                                                  order_by, descending))
+            return
+        self._showing_all = False
+
+        engine = self.app.matcher
+        plain = order_by is None and min_budget is None and max_budget is None
+        if keyword and engine is not None and plain:
+            fetch = self.indexed_search(engine, keyword, cat_filter, scope)
+        else:
+            # filtering and sorting happen in SQL, only matching rows come back;
+            # id order continues after the last id, other orders by offset
+            loaded = [0]
+
+            def fetch(after_id, size):
+                offset = loaded[0] if after_id else 0
+                with self.query_scope(scope):
+                    rows = self.db.search_jobs(
+                        keyword, cat_filter, limit=size,
+                        offset=offset if order_by else 0,
+                        after_id=None if order_by else after_id,
+                        min_budget=min_budget, max_budget=max_budget,
+                        order_by=order_by or "id", descending=descending)
+                loaded[0] = offset + len(rows)
+                return rows
+        self.freelancer_pager.load(fetch, "DB error searching jobs")
+
+        if keyword and engine is None and not self._index_requested:
+            # build the keyword index in the background for the next searches
+            self._index_requested = True
+            self.app.run_async(self.app.get_matcher, on_error=lambda ex: None,
+                               key="search_index", action="build_search_index")
+
+    def indexed_search(self, engine, keyword, cat_filter, scope):
+        # matching ids come from the in-memory prefix index (narrowed from
+        # the previous matches while the keyword keeps growing); only the
+        # rows of the page being shown are read from the database
+        if self._live_search is None or self._live_search.engine is not engine:
+            self._live_search = IncrementalSearch(engine)
+        live = self._live_search
+        matches = []
+        positions = {}    # job id -> position in matches, to resume after a page
+
+        def fetch(after_id, size):
+            if not matches:
+                # jobs posted by other processes publish no event here:
+                # index whatever is newer than the index first
+                with self.query_scope(scope):
+                    engine.catch_up(self.db, prune=False)
+                ids = live.search(keyword)
+                if not ids:
+                    # nothing starts with what was typed: maybe a typo, so
+                    # show the closest matches instead, best first
+                    ids = [job_id for job_id, _ in engine.fuzzy_search_jobs(keyword)]
+                matches.append(ids)
+                positions.update((job_id, i) for i, job_id in enumerate(ids))
+            ids = matches[0]
+            start = positions[after_id] + 1 if after_id in positions else 0
+            rows = []
+            while start < len(ids) and len(rows) < size:
+                chunk = ids[start:start + size]
+                start += size
+                with self.query_scope(scope):
+                    rows.extend(r for r in self.db.get_jobs_by_ids(chunk)
+                                if cat_filter in (None, "", "All") or r[4] == cat_filter)
+            return rows[:size]
+        return fetch
+
+    def query_scope(self, scope):
+        cancel_scope = getattr(self.db, "cancel_scope", None)
+        return cancel_scope(scope) if cancel_scope else contextlib.nullcontext()
+
+    def show_recommended(self):
+        skills = self.skills_entry.get().strip()
+        session = self.app.session
+
+        def fetch(after_id, size):
+            if after_id:
+                return []     # one ranked page, no keyset continuation
+            return self.app.services.recommend_jobs(skills, RECOMMEND_COUNT, session)
+
+        self._showing_all = False
+        self.freelancer_pager.load(fetch, "Could not load recommendations")
 
     def apply_selected_job(self):
         try:
-            sel = self.freelancer_job_table.selection()
+            # selected rows may have scrolled out of the visible window
+            sel = self.freelancer_pager.selected_values()
             if not sel:
                 raise AppError("Select a job first.")
-            jid = int(self.freelancer_job_table.item(sel[0], "values")[0])
+            job_ids = [int(values[0]) for values in sel]
+            heading = "Apply for Job" if len(job_ids) == 1 else f"Apply for {len(job_ids)} Jobs"
 
             popup = tk.Toplevel(self)
-            popup.title("Apply for Job")
+            popup.title(heading)
             popup.geometry("350x250")
             popup.resizable(False, False)
 
-            tk.Label(popup, text="Apply for Job", font=("Arial", 14, "bold")).pack(pady=10)
+            tk.Label(popup, text=heading, font=("Arial", 14, "bold")).pack(pady=10)
 
             tk.Label(popup, text="Your Name:").pack()
             name_entry = tk.Entry(popup, width=30); name_entry.pack(pady=5)
@@ -451,20 +988,12 @@ class FreelancerDashboard(AppPage):
             def submit_application():
                 name = name_entry.get().strip()
                 skills = skills_entry.get().strip()
-                if not name:
-                    messagebox.showerror("Error", "Name is required."); return
-                if not skills:
-                    messagebox.showerror("Error", "Skills are required."); return
-
-                freelancer_email = self.app.current_user_email
                 try:
-                    self.db.insert_application(jid, freelancer_email, name, skills)
-                except Exception as ex:
-                    messagebox.showerror("DB Error", f"Error inserting application:\n{ex}")
-                    return
+                    validate_application(name, skills)
+                except ServiceError as e:
+                    messagebox.showerror("Error", str(e)); return
 
-                notify("Application submitted!")
-                popup.destroy()
+                self.submit_applications(job_ids, name, skills, on_done=popup.destroy)
 
             tk.Button(popup, text="Submit", bg=PRIMARY, fg="white",
                       width=15, command=submit_application).pack(pady=15)
@@ -473,6 +1002,25 @@ class FreelancerDashboard(AppPage):
         except Exception as ex:
             self.app.handle_error(f"Unexpected error: {ex}")
 
+    def submit_applications(self, job_ids, name, skills, on_done=None):
+        # every selected job in one transaction: all applications or none
+        session = self.app.session
+
+        def submitted(_):
+            if len(job_ids) == 1:
+                notify("Application submitted!")
+            else:
+                notify(f"{len(job_ids)} applications submitted!")
+            if on_done:
+                on_done()
+
+        self.app.run_async(
+            lambda: self.app.services.apply(session, job_ids, name, skills),
+            submitted,
+            lambda ex: messagebox.showerror("DB Error", f"Error inserting application:\n{ex}"),
+            action="apply",
+        )
+
 # ---- Admin Dashboard ----
 class AdminDashboard(AppPage):
     def __init__(self, master, app):
@@ -498,6 +1046,9 @@ class AdminDashboard(AppPage):
         tk.Button(menu, text="View Applications", width=20,
                   command=self.show_applications).pack(pady=5)
 
+        tk.Button(menu, text="Match Report", width=20,
+                  command=self.show_match_report).pack(pady=5)
+
         self.admin_content = tk.Frame(outer, bg=BG_COLOR)
         self.admin_content.pack(side="right", fill="both", expand=True)
 
@@ -525,13 +1076,14 @@ class AdminDashboard(AppPage):
             self.admin_user_table.heading(col, text=col)
         self.admin_user_table.pack(fill="both", expand=True)
 
-        try:
-            rows = self.db.get_all_users()
-            for row in rows:
-                clean_row = (row[0], str(row[1]).strip(), str(row[2]).strip(), str(row[3]).strip())
-                self.admin_user_table.insert("", "end", values=clean_row)
-        except Exception as ex:
-            self.app.handle_error(f"DB error reading users: {ex}")
+        session = self.app.session
+        self.app.run_async(
+            lambda: self.app.services.list_users(session),
+            lambda rows: self.fill_users(self.admin_user_table, rows),
+            lambda ex: self.app.handle_error(f"DB error reading users: {ex}"),
+            key="admin_view",
+            action="admin_users",
+        )
 
         btn_frame = tk.Frame(self.admin_content)
         btn_frame.pack(pady=10)
@@ -540,6 +1092,13 @@ class AdminDashboard(AppPage):
         tk.Button(btn_frame, text="Edit Selected User", bg=PRIMARY, fg="white",
                   command=self.admin_edit_user).pack(side="left", padx=6)
 
+    def fill_users(self, table, rows):
+        if not table.winfo_exists():
+            return
+        for row in rows:
+            clean_row = (row[0], str(row[1]).strip(), str(row[2]).strip(), str(row[3]).strip())
+            table.insert("", "end", values=clean_row)
+
     def admin_delete_user(self):
         try:
             sel = self.admin_user_table.selection()
@@ -547,28 +1106,17 @@ class AdminDashboard(AppPage):
                 raise AppError("Select a user first.")
             user_id = int(self.admin_user_table.item(sel[0], "values")[0])
 
-            try:
-                deleted = None
-                # Prefer DB method
-                if hasattr(self.db, "delete_user"): # hasattr returns whether the object has an attribute of the given name
-                    # Some DB.delete_user implementations return boolean; others don't.
-                    deleted = self.db.delete_user(user_id)
-                else:
-                    # fallback: run SQL
-                    self.db.cursor.execute("DELETE FROM Users WHERE id=?", (user_id,))
-                    self.db.conn.commit()
-                    deleted = True
-
-                # If DB.delete_user returned None treat as success (commit happened)
-                if deleted is False:
-                    raise AppError("User could not be deleted (not found).")
+            def deleted(_):
+                # refresh user list immediately
+                self.show_users()
+                notify("User deleted successfully!")
 
-            except Exception as ex:
-                raise AppError(f"DB error deleting user: {ex}")
-
-            # refresh user list immediately
-            self.show_users()
-            notify("User deleted successfully!")
+            session = self.app.session
+            self.app.run_async(
+                lambda: self.app.services.delete_user(session, user_id), deleted,
+                lambda ex: self.app.handle_error(f"DB error deleting user: {ex}"),
+                action="admin_delete_user",
+            )
         except AppError as e:
             self.app.handle_error(str(e))
         except Exception as ex:
@@ -585,20 +1133,20 @@ class AdminDashboard(AppPage):
             user_id = int(user_id)
 
             # get full user record
-            user = None
-            if hasattr(self.db, "get_user_by_id"):
-                user = self.db.get_user_by_id(user_id)
-            else:
-                # fallback: select from DB directly
-                try:
-                    self.db.cursor.execute("SELECT id, fullname, email, password, role FROM Users WHERE id=?", (user_id,))
-                    user = self.db.cursor.fetchone()
-                except Exception as ex:
-                    raise AppError(f"DB error reading user: {ex}")
-
-            if not user:
-                raise AppError("User not found in database!")
+            session = self.app.session
+            self.app.run_async(
+                lambda: self.app.services.get_user(session, user_id),
+                lambda user: self.open_edit_window(user_id, fullname, email, role, user),
+                lambda ex: self.app.handle_error(f"DB error reading user: {ex}"),
+                action="admin_edit_user",
+            )
+        except AppError as e:
+            self.app.handle_error(str(e))
+        except Exception as ex:
+            self.app.handle_error(f"Unexpected error: {ex}")
 
+    def open_edit_window(self, user_id, fullname, email, role, user):
+        try:
             current_password = user[3]  # index 3 is password in expected tuple
 
             # Edit window
@@ -632,40 +1180,29 @@ class AdminDashboard(AppPage):
                 # -----------------------
                 # Validation (same as register)
                 # -----------------------
-
-                if not new_name or not new_email or not new_pass or not role:
-                    messagebox.showerror("Error", "All fields are required!")
-                    return
-
-                if "@" not in new_email or "." not in new_email:
-                    messagebox.showerror("Error", "Invalid email format")
-                    return
-
-                if len(new_pass) < 6:
-                    messagebox.showerror("Error", "Password must be at least 6 characters")
-                    return
-
-                if new_role not in ("Client", "Freelancer"):
-                    messagebox.showerror("Error", "Invalid role selected")
+                try:
+                    validate_user(new_name, new_email, new_pass, new_role)
+                except ServiceError as e:
+                    messagebox.showerror("Error", str(e))
                     return
 
                 # -----------------------
                 # Update DB
                 # -----------------------
-                try:
-                    self.db.update_user(user_id, new_name, new_email, new_pass, new_role)
+                session = self.app.session
 
+                def updated(_):
                     messagebox.showinfo("Success", "User updated successfully!")
                     win.destroy()
                     self.show_users()
 
-                except Exception as ex:
-                    self.app.handle_error(f"Update failed: {ex}")
-
-                except AppError as e:
-                        self.app.handle_error(str(e))
-                            # except Exception as ex:
-                            #     self.app.handle_error(f"Unexpected error: {ex}")
+                self.app.run_async(
+                    lambda: self.app.services.update_user(session, user_id, new_name, new_email,
+                                                          new_pass, new_role),
+                    updated,
+                    lambda ex: self.app.handle_error(f"Update failed: {ex}"),
+                    action="admin_update_user",
+                )
 
             tk.Button(win, text="Save", bg="green", fg="white", command=update_now).pack(pady=10)
             tk.Button(win, text="Cancel", bg="gray", fg="white", command=win.destroy).pack()
@@ -686,31 +1223,43 @@ class AdminDashboard(AppPage):
         for c in ("ID", "Title", "Budget", "Category", "ClientEmail"):
 
             self.admin_job_table.heading(c, text=c)
+        job_scroll = ttk.Scrollbar(frame, orient="vertical")
+        job_scroll.pack(side="right", fill="y")
         self.admin_job_table.pack(fill="both", expand=True)
 
-        try:
-            rows = self.db.get_jobs()
-            for r in rows:
-                jid = r[0]; title = r[1]; desc = r[2]; budget = r[3]; category = r[4]; client_email = r[5]
-                self.admin_job_table.insert("", "end", values=(jid, title, budget, category, client_email))
-        except Exception as ex:
-            self.app.handle_error(f"DB error fetching jobs: {ex}")
+        self.admin_job_pager = PagedTreeview(
+            self.admin_job_table,
+            None,
+            self.app.runner,
+            scrollbar=job_scroll,
+            on_error=self.app.handle_error,
+            store=JobStore(ADMIN_COLUMNS),
+        )
+        self.app.runner.cancel("admin_view")
+        session = self.app.session
+        self.admin_job_pager.load(
+            lambda after_id, size: self.app.services.all_jobs_page(session, after_id, size),
+            "DB error fetching jobs")
 
         tk.Button(self.admin_content, text="Delete Selected Job", bg="red", fg="white", command=self.admin_delete_job).pack(pady=10)
 
     def admin_delete_job(self):
         try:
-            row = self.admin_job_table.selection()[0]
-            job_id = int(self.admin_job_table.item(row, "values")[0])
-            try:
-                self.db.delete_job(job_id)
-            except Exception as ex:
-                raise AppError(f"DB error deleting job: {ex}")
-            # refresh
-            self.show_jobs()
-            self.app.client_page.refresh_job_tables()
-            self.app.freelancer_page.refresh_jobs()
-            notify("Deleted successfully")
+            job_id = int(self.admin_job_pager.selected_values()[0][0])
+
+            def deleted(_):
+                # refresh
+                self.show_jobs()
+                self.app.refresh_job_views()
+                notify("Deleted successfully")
+
+            session = self.app.session
+            self.app.run_async(
+                lambda: self.app.services.delete_job(session, job_id),
+                deleted,
+                lambda ex: self.app.handle_error(f"DB error deleting job: {ex}"),
+                action="delete_job",
+            )
         except IndexError:
             self.app.handle_error("Select a job first")
         except AppError as e:
@@ -738,58 +1287,217 @@ class AdminDashboard(AppPage):
         self.admin_app_table.column("Skills", width=220)
         self.admin_app_table.pack(fill="both", expand=True)
 
-        try:
-            rows = self.db.get_all_applications()
-            if not rows:
-                messagebox.showinfo("Info", "No applications yet.")
-                return
+        session = self.app.session
+        self.app.run_async(
+            lambda: self.app.services.all_applications(session),
+            lambda rows: self.fill_applications(self.admin_app_table, rows),
+            lambda ex: self.app.handle_error(f"DB error fetching applications: {ex}"),
+            key="admin_view",
+            action="admin_applications",
+        )
 
-            for job_id, email, name, skills in rows:
-                job_title = self.db.get_job_title(job_id) or "(Deleted Job)"
-                self.admin_app_table.insert("", "end", values=(job_id, job_title, email, name, skills))
-        except Exception as ex:
-            self.app.handle_error(f"DB error fetching applications: {ex}")
+    def fill_applications(self, table, rows):
+        if not table.winfo_exists():
+            return
+        if not rows:
+            messagebox.showinfo("Info", "No applications yet.")
+            return
+
+        for job_id, job_title, email, name, skills in rows:
+            table.insert("", "end", values=(job_id, job_title, email, name, skills))
+
+    # Match report: every job against every applicant
+    def show_match_report(self):
+        self.clear()
+        tk.Label(self.admin_content, text="Match Report", font=("Arial", 20, "bold"), bg=BG_COLOR, fg=PRIMARY).pack(pady=10)
+
+        frame = tk.Frame(self.admin_content); frame.pack(fill="both", expand=True)
+        self.admin_match_table = ttk.Treeview(frame, columns=("JobID", "JobTitle", "Rank", "Freelancer", "Score"), show="headings")
+        for col, text, width in (("JobID", "Job ID", 60), ("JobTitle", "Job Title", 220),
+                                 ("Rank", "Rank", 50), ("Freelancer", "Freelancer Email", 220),
+                                 ("Score", "Score", 80)):
+            self.admin_match_table.heading(col, text=text)
+            self.admin_match_table.column(col, width=width)
+        self.admin_match_table.pack(fill="both", expand=True)
+
+        session = self.app.session
+        self.app.run_async(
+            lambda: self.app.services.match_report(session, REPORT_MATCHES),
+            lambda result: self.fill_match_report(self.admin_match_table, *result),
+            lambda ex: self.app.handle_error(f"Match report failed: {ex}"),
+            key="admin_view",
+            action="admin_match_report",
+        )
+
+    def fill_match_report(self, table, titles, report):
+        if not table.winfo_exists():
+            return
+        for job_id, matches in report.items():
+            for rank, (email, score) in enumerate(matches, start=1):
+                table.insert("", "end", values=(job_id, titles.get(job_id, ""), rank, email, f"{score:.3f}"))
+
+# role -> (dashboard class, tab title)
+ROLE_PAGES = {
+    "Client": (ClientDashboard, "Client Dashboard"),
+    "Freelancer": (FreelancerDashboard, "Freelancer Dashboard"),
+    "Admin": (AdminDashboard, "Admin Panel"),
+}
 
 # ---- Main App (controller) ----
 class App(tk.Tk):
-    def __init__(self):
+    def __init__(self, executor=None):
+        started = time.perf_counter()
         super().__init__()
         self.title("Freelancer Job Matching System")
         self.geometry("1000x680")
         self.configure(bg=BG_COLOR)
 
-        # Database init with error handling
-        try:
-            self.db = Database()
-        except Exception as ex:
-            messagebox.showerror("DB Error", f"Failed to connect to DB: {ex}")
-            raise
+        # DB work runs on background threads; results come back via after()
+        self.runner = TaskRunner(self, executor=executor, on_busy=self.set_busy,
+                                 on_error=lambda ex: self.handle_error(f"Unexpected error: {ex}"))
+
+        self.db = None              # set once the background connect succeeds
+        self.services = None
+        self.db_error = None
+        self._pending = []          # run_async calls made while connecting
 
         self.current_user_email = None
         self.current_role = None
 
+        # skill matching index, built on first use and then kept current
+        # by the indexer from the database's change events
+        self.matcher = None
+        self.indexer = None
+        self._matcher_lock = threading.Lock()
+
+        self.status_var = tk.StringVar(value="")
+        tk.Label(self, textvariable=self.status_var, bg=BG_COLOR, fg=PRIMARY,
+                 anchor="w").pack(side="bottom", fill="x", padx=8)
+
         self.tabControl = ttk.Notebook(self)
         self.tabControl.pack(expand=True, fill="both")
 
-        # instantiate pages
+        # only login & register exist at startup; role dashboards are built
+        # the first time they are opened (see open_role_dashboard)
+        self._pages = {}
         self.login_page = LoginPage(self.tabControl, self)
         self.register_page = RegisterPage(self.tabControl, self)
-        self.client_page = ClientDashboard(self.tabControl, self)
-        self.freelancer_page = FreelancerDashboard(self.tabControl, self)
-        self.admin_page = AdminDashboard(self.tabControl, self)
-
-        # add login & register initially
         self.tabControl.add(self.login_page, text="Login")
         self.tabControl.add(self.register_page, text="Register")
-        # other pages will be added on demand
-
         self.tabControl.select(self.login_page)
 
+        # exported as a metric once an instrumented connection is up
+        self.time_to_login_ms = (time.perf_counter() - started) * 1000
+
+        # connect in the background; the login screen is usable meanwhile
+        self.connect()
+
+    def connect(self):
+        self.status_var.set("Connecting to database...")
+        # hot reads are served from a cache that DB writes invalidate
+        # FJMS_METRICS / FJMS_SLOW_QUERY_MS turn on query instrumentation
+        self.runner.submit(lambda: cached(instrumentation.from_config(Database())),
+                           self.connected, self.connect_failed)
+
+    def connected(self, db):
+        self.db = db
+        self.services = Services(db, self.get_matcher)
+        instruments = getattr(db, "instrumentation", None)
+        if instruments is not None:
+            instruments.metrics.set_gauge("app_time_to_login_seconds",
+                                          round(self.time_to_login_ms / 1000, 6),
+                                          f"Time to show the login screen "
+                                          f"(target {STARTUP_TARGET_MS / 1000} s).")
+            instruments.on_trace.append(instruments.slow_log.record_action)
+        self.status_var.set("")
+        pending, self._pending = self._pending, []
+        for fn, on_success, on_error, key, action in pending:
+            self.submit(fn, on_success, on_error, key, action)
+
+    def connect_failed(self, ex):
+        self.db_error = ex
+        self.status_var.set("Not connected to the database")
+        messagebox.showerror("DB Error", f"Failed to connect to DB: {ex}")
+        pending, self._pending = self._pending, []
+        for fn, on_success, on_error, key, action in pending:
+            (on_error or self.handle_error)(ex)
+
+    @property
+    def session(self):
+        return Session(self.current_user_email, self.current_role)
 
     # central error handler
     def handle_error(self, message):
         messagebox.showerror("Error", message)
 
+    # background work
+    def run_async(self, fn, on_success=None, on_error=None, key=None, action=None):
+        """Run fn on a worker thread. action names the UI action for query
+        tracing (defaults to key)."""
+        if self.db is None:
+            if self.db_error is not None:
+                (on_error or self.handle_error)(Exception(f"Not connected to the database: {self.db_error}"))
+                return None
+            # still connecting: run as soon as the connection is up
+            self._pending.append((fn, on_success, on_error, key, action))
+            return None
+        return self.submit(fn, on_success, on_error, key, action)
+
+    def submit(self, fn, on_success, on_error, key, action):
+        instruments = getattr(self.db, "instrumentation", None)
+        if instruments is not None:
+            fn = instruments.traced(action or key or getattr(fn, "__name__", "task"), fn)
+        return self.runner.submit(fn, on_success, on_error, key=key)
+
+    def get_matcher(self):
+        # called from worker threads; the first caller builds the index
+        with self._matcher_lock:
+            if self.matcher is None:
+                if hasattr(self.db, "events"):
+                    self.indexer = Indexer(self.db)
+                    self.matcher = self.indexer.start()
+                else:
+                    self.matcher = MatchingEngine.from_database(self.db)
+            return self.matcher
+
+    def set_busy(self, busy):
+        self.status_var.set("Loading..." if busy else "")
+        self.configure(cursor="watch" if busy else "")
+
+    def destroy(self):
+        self.runner.shutdown()
+        if self.indexer is not None:
+            self.indexer.stop()
+        if self.db is not None:
+            self.db.close()
+        super().destroy()
+
+    # role dashboards, built on first use
+    @property
+    def client_page(self):
+        return self._page(ClientDashboard)
+
+    @property
+    def freelancer_page(self):
+        return self._page(FreelancerDashboard)
+
+    @property
+    def admin_page(self):
+        return self._page(AdminDashboard)
+
+    def _page(self, cls):
+        page = self._pages.get(cls)
+        if page is None:
+            page = self._pages[cls] = cls(self.tabControl, self)
+        return page
+
+    def refresh_job_views(self):
+        # dashboards not built yet load fresh data when first opened
+        if ClientDashboard in self._pages:
+            self._pages[ClientDashboard].refresh_job_tables()
+        if FreelancerDashboard in self._pages:
+            self._pages[FreelancerDashboard].refresh_jobs()
+
     def add_tab_if_missing(self, frame, title):
         if str(frame) not in self.tabControl.tabs():
             self.tabControl.add(frame, text=title)
@@ -799,15 +1507,16 @@ class App(tk.Tk):
             self.tabControl.forget(frame)
 
     def open_role_dashboard(self, role):
-        if role == "Client":
-            self.add_tab_if_missing(self.client_page, "Client Dashboard")
-            self.tabControl.select(self.client_page)
-        elif role == "Freelancer":
-            self.add_tab_if_missing(self.freelancer_page, "Freelancer Dashboard")
-            self.tabControl.select(self.freelancer_page)
-        elif role == "Admin":
-            self.add_tab_if_missing(self.admin_page, "Admin Panel")
-            self.tabControl.select(self.admin_page)
+        """Show the dashboard for role; returns False if it was just built
+        (and so already holds fresh data), True if it existed before."""
+        if role not in ROLE_PAGES:
+            return False
+        cls, title = ROLE_PAGES[role]
+        existed = cls in self._pages
+        page = self._page(cls)
+        self.add_tab_if_missing(page, title)
+        self.tabControl.select(page)
+        return existed
 
 if __name__ == "__main__":
     App().mainloop()
@@ -0,0 +1,505 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have i in is it its of on or our
+the their this to was we will with you your need needed looking want
+""".split())
+
+# single letters that are real skills
+SHORT_TERMS = frozenset({"c", "r"})
+
+TITLE_BOOST = 2          # title terms count this many times in a job document
+EXHAUSTIVE_LIMIT = 5000  # below this many postings just score everything
+FUZZY_THRESHOLD = 0.4    # least trigram similarity (Dice) for a typo to match a word
+
+
+def words(text):
+    # every word, stopwords included: search must find what the user typed
+    return [w for w in (tok.rstrip(".") for tok in TOKEN_RE.findall((text or "").lower())) if w]
+
+
+def tokenize(text):
+    tokens = []
+    for tok in TOKEN_RE.findall((text or "").lower()):
+        tok = tok.rstrip(".")
+        if tok in STOPWORDS:
+            continue
+        if len(tok) > 1 or tok in SHORT_TERMS:
+            tokens.append(tok)
+    return tokens
+
+
+# ------------------------------
+# Inverted index with BM25 scoring
+# ------------------------------
+class BM25Index:
+    """Inverted index (term -> {doc_id: term frequency}) scored with BM25.
+
+    Top-k queries use a threshold-algorithm walk over per-term postings
+    sorted by impact, so a query stops as soon as no unseen document can
+    enter the top k instead of scoring every posting of common terms.
+    Impact lists are built lazily and dropped when a term's postings change.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}      # term -> {doc_id: tf}
+        self.doc_terms = {}     # doc_id -> tuple of distinct terms
+        self.doc_len = {}       # doc_id -> token count
+        self.total_len = 0
+        self.removed = 0        # removals since the last compact()
+        self._impacts = {}      # term -> (sorted [(impact, doc_id)], {doc_id: impact})
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_impacts"] = {}  # derived data, rebuilt lazily
+        return state
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.doc_len
+
+    def add(self, doc_id, tokens):
+        if doc_id in self.doc_len:
+            self.remove(doc_id)
+        counts = Counter(tokens)
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+            self._impacts.pop(term, None)
+        self.doc_terms[doc_id] = tuple(counts)
+        self.doc_len[doc_id] = len(tokens)
+        self.total_len += len(tokens)
+
+    def remove(self, doc_id):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            plist = self.postings.get(term)
+            if plist is not None:
+                plist.pop(doc_id, None)
+                if not plist:
+                    del self.postings[term]
+            self._impacts.pop(term, None)
+        self.total_len -= self.doc_len.pop(doc_id)
+        self.removed += 1
+        return True
+
+    def compact(self):
+        # dicts never shrink after deletes; copying them releases the
+        # slack left behind by removed documents
+        self.postings = {term: dict(plist) for term, plist in self.postings.items()}
+        self.doc_terms = dict(self.doc_terms)
+        self.doc_len = dict(self.doc_len)
+        self._impacts = {}
+        self.removed = 0
+
+    def idf(self, term):
+        n = len(self.postings.get(term, ()))
+        N = len(self.doc_len)
+        return math.log(1 + (N - n + 0.5) / (n + 0.5))
+
+    def _term_impacts(self, term):
+        cached = self._impacts.get(term)
+        if cached is None:
+            idf = self.idf(term)
+            avgdl = (self.total_len / len(self.doc_len)) if self.doc_len else 1.0
+            k1, b = self.k1, self.b
+            by_doc = {}
+            for doc_id, tf in self.postings[term].items():
+                norm = k1 * (1 - b + b * self.doc_len[doc_id] / avgdl)
+                by_doc[doc_id] = idf * tf * (k1 + 1) / (tf + norm)
+            ordered = sorted(((w, d) for d, w in by_doc.items()), reverse=True)
+            cached = (ordered, by_doc)
+            self._impacts[term] = cached
+        return cached
+
+    def top_k(self, tokens, k=10, exclude=()):
+        terms = [t for t in set(tokens) if t in self.postings]
+        if not terms or k <= 0:
+            return []
+        impacts = [self._term_impacts(t) for t in terms]
+
+        if sum(len(ordered) for ordered, _ in impacts) <= EXHAUSTIVE_LIMIT:
+            scores = {}
+            for _, by_doc in impacts:
+                for doc_id, w in by_doc.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + w
+            for doc_id in exclude:
+                scores.pop(doc_id, None)
+            return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+        heap = []               # min-heap of (score, doc_id), size <= k
+        seen = set(exclude)
+        depth = 0
+        while True:
+            threshold = 0.0
+            exhausted = True
+            for ordered, _ in impacts:
+                if depth >= len(ordered):
+                    continue
+                exhausted = False
+                w, doc_id = ordered[depth]
+                threshold += w
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                score = sum(by_doc.get(doc_id, 0.0) for _, by_doc in impacts)
+                if len(heap) < k:
+                    heapq.heappush(heap, (score, doc_id))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (score, doc_id))
+            if exhausted:
+                break
+            # no document below this depth can score more than threshold
+            if len(heap) == k and heap[0][0] >= threshold:
+                break
+            depth += 1
+
+        return [(doc_id, score) for score, doc_id in sorted(heap, reverse=True)]
+
+
+# ------------------------------
+# Trigram index for typo-tolerant search
+# ------------------------------
+def trigrams(word):
+    # padded like PostgreSQL's pg_trgm, so word starts weigh more than ends
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Trigram -> words index over a vocabulary, for fuzzy word lookup.
+
+    similar(word) finds the vocabulary words whose trigram sets overlap
+    the word's by at least threshold (Dice coefficient), so "pyhton"
+    still finds "python". Only words sharing a trigram are ever looked
+    at, which keeps lookups well under a millisecond for typical keyword
+    lengths.
+    """
+
+    def __init__(self):
+        self.postings = {}   # trigram -> set of words
+        self.sizes = {}      # word -> number of trigrams
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def add(self, word):
+        if word in self.sizes:
+            return
+        grams = trigrams(word)
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(word)
+        self.sizes[word] = len(grams)
+
+    def remove(self, word):
+        if self.sizes.pop(word, None) is None:
+            return
+        for gram in trigrams(word):
+            words_ = self.postings.get(gram)
+            if words_ is not None:
+                words_.discard(word)
+                if not words_:
+                    del self.postings[gram]
+
+    def similar(self, word, threshold=FUZZY_THRESHOLD):
+        """[(word, similarity)] at or above threshold, most similar first."""
+        grams = trigrams(word)
+        n = len(grams)
+        # a match needs at least `need` shared trigrams (its own trigram
+        # count is at least n * t / (2 - t)), so it must appear in one of
+        # the n - need + 1 rarest trigrams: only those are scanned for
+        # candidates, the rest are intersected with the candidates
+        need = max(1, math.ceil(threshold * (n + n * threshold / (2 - threshold)) / 2))
+        ordered = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+        candidates = set().union(*ordered[:n - need + 1]) if need <= n else set()
+        shared = Counter()
+        for words_ in ordered:
+            shared.update(words_ & candidates)
+        found = [(other, 2 * common / (n + self.sizes[other]))
+                 for other, common in shared.items()]
+        return sorted(((w, s) for w, s in found if s >= threshold), key=lambda item: -item[1])
+
+
+# ------------------------------
+# Prefix index for search-as-you-type
+# ------------------------------
+class PrefixIndex:
+    """Word-prefix index: which documents have a word starting with q.
+
+    The vocabulary is kept sorted, so the words sharing a prefix are one
+    bisect range and a partial word ("pyt") costs no more than a whole
+    one. A query matches the documents that have, for every query word,
+    some word starting with it -- the same rule the database full-text
+    search uses. generation changes on every add or remove.
+
+    The vocabulary is also kept in a TrigramIndex, which fuzzy_search uses
+    to rank documents whose words are close to misspelt query words.
+    """
+
+    def __init__(self):
+        self.postings = {}      # word -> set of doc ids
+        self.doc_words = {}     # doc id -> tuple of distinct words
+        self.vocabulary = []    # sorted words
+        self.trigrams = TrigramIndex()
+        self.generation = 0
+
+    def __len__(self):
+        return len(self.doc_words)
+
+    def add(self, doc_id, doc_words):
+        if doc_id in self.doc_words:
+            self.remove(doc_id)
+        distinct = tuple(set(doc_words))
+        for word in distinct:
+            plist = self.postings.get(word)
+            if plist is None:
+                plist = self.postings[word] = set()
+                bisect.insort(self.vocabulary, word)
+                self.trigrams.add(word)
+            plist.add(doc_id)
+        self.doc_words[doc_id] = distinct
+        self.generation += 1
+
+    def remove(self, doc_id):
+        distinct = self.doc_words.pop(doc_id, None)
+        if distinct is None:
+            return False
+        for word in distinct:
+            plist = self.postings[word]
+            plist.discard(doc_id)
+            if not plist:
+                del self.postings[word]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, word)]
+                self.trigrams.remove(word)
+        self.generation += 1
+        return True
+
+    def words_with_prefix(self, prefix):
+        lo = bisect.bisect_left(self.vocabulary, prefix)
+        hi = bisect.bisect_left(self.vocabulary, prefix + "\uffff", lo)
+        return self.vocabulary[lo:hi]
+
+    def _docs_with_prefix(self, prefix):
+        docs = set()
+        for word in self.words_with_prefix(prefix):
+            docs |= self.postings[word]
+        return docs
+
+    def search(self, query, within=None):
+        """Sorted ids of the documents matching every word of query.
+
+        within restricts the answer to those candidate ids (e.g. the
+        matches of a shorter query) and checks them directly instead of
+        walking the vocabulary.
+        """
+        prefixes = words(query)
+        if within is not None:
+            return [d for d in within
+                    if all(any(w.startswith(p) for w in self.doc_words.get(d, ()))
+                           for p in prefixes)]
+        if not prefixes:
+            return sorted(self.doc_words)
+        matches = sorted((self._docs_with_prefix(p) for p in set(prefixes)), key=len)
+        return sorted(set.intersection(*matches))
+
+    def fuzzy_search(self, query, threshold=FUZZY_THRESHOLD):
+        """[(doc id, score)] best first, tolerating typos.
+
+        Every query word must match some word of the document, either as
+        a prefix (similarity 1) or through trigram similarity of at least
+        threshold; the score is the mean best similarity per query word.
+        """
+        prefixes = set(words(query))
+        if not prefixes:
+            return []
+        scores = None
+        for prefix in prefixes:
+            best = {}
+            for word, similarity in self.trigrams.similar(prefix, threshold):
+                for doc_id in self.postings[word]:
+                    if best.get(doc_id, 0.0) < similarity:
+                        best[doc_id] = similarity
+            for doc_id in self._docs_with_prefix(prefix):
+                best[doc_id] = 1.0
+            if scores is None:
+                scores = best
+            else:
+                scores = {d: s + best[d] for d, s in scores.items() if d in best}
+            if not scores:
+                return []
+        n = len(prefixes)
+        return sorted(((d, s / n) for d, s in scores.items()), key=lambda item: (-item[1], item[0]))
+
+
+class IncrementalSearch:
+    """Search-as-you-type over a MatchingEngine's prefix index.
+
+    When the new query extends the previous one ("pyt" -> "pyth") and no
+    job was indexed or removed since, the previous matches are narrowed
+    down instead of searching the whole index again. Safe to call from
+    several worker threads.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.lock = threading.Lock()
+        self.last = None      # (lowered query, index generation, ids)
+
+    def search(self, query):
+        query = (query or "").strip().lower()
+        with self.lock:
+            last = self.last
+        within = None
+        if last is not None and query.startswith(last[0]) \
+                and last[1] == self.engine.search_generation:
+            within = last[2]
+        ids, generation = self.engine.search_jobs(query, within)
+        with self.lock:
+            self.last = (query, generation, ids)
+        return ids
+
+
+# ------------------------------
+# Matching engine
+# ------------------------------
+class MatchingEngine:
+    """Matches freelancer skills against job postings and vice versa.
+
+    Jobs are indexed on title (boosted) and description; freelancers are
+    indexed on the skills from every application they have submitted.
+    """
+
+    def __init__(self):
+        self.jobs = BM25Index()
+        self.search_index = PrefixIndex()   # keyword search-as-you-type
+        self.freelancers = BM25Index()
+        self.freelancer_skills = {}   # email -> list of skills strings
+        self.last_job_id = 0          # highest ids seen, for catch_up()
+        self.last_application_id = 0
+        self.lock = threading.RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    @classmethod
+    def from_database(cls, db, page_size=1000):
+        engine = cls()
+        engine.catch_up(db, page_size)
+        return engine
+
+    def catch_up(self, db, page_size=1000, prune=True):
+        """Bring the index up to date with the database.
+
+        New jobs and applications are streamed page by page past the
+        highest ids already indexed; with prune, jobs deleted in the
+        meantime are dropped (which reads every job id). Used for the
+        initial build and after loading a snapshot; without prune it is
+        two index seeks, cheap enough to run before each search to pick up
+        jobs other processes have posted.
+        """
+        if prune and self.last_job_id:
+            live = set(db.get_job_ids())
+            for job_id in [j for j in self.jobs.doc_len if j not in live]:
+                self.remove_job(job_id)
+
+        while True:
+            rows = db.get_jobs_page(self.last_job_id, page_size)
+            for r in rows:
+                self.add_job(r[0], r[1], r[2])
+            if len(rows) < page_size:
+                break
+
+        while True:
+            rows = db.get_applications_page(self.last_application_id, page_size)
+            for app_id, job_id, email, name, skills in rows:
+                self.add_application(email, skills, app_id)
+            if len(rows) < page_size:
+                break
+
+    @staticmethod
+    def job_tokens(title, description):
+        return tokenize(title) * TITLE_BOOST + tokenize(description)
+
+    def add_job(self, job_id, title, description):
+        with self.lock:
+            self.jobs.add(job_id, self.job_tokens(title, description))
+            self.search_index.add(job_id, words(title) + words(description))
+            self.last_job_id = max(self.last_job_id, job_id)
+
+    def remove_job(self, job_id):
+        with self.lock:
+            self.search_index.remove(job_id)
+            return self.jobs.remove(job_id)
+
+    def add_application(self, email, skills, application_id=None):
+        with self.lock:
+            if application_id:
+                self.last_application_id = max(self.last_application_id, application_id)
+            entries = self.freelancer_skills.setdefault(email, [])
+            if skills and skills not in entries:
+                entries.append(skills)
+            self.freelancers.add(email, tokenize(" ".join(entries)))
+
+    def remove_freelancer(self, email):
+        with self.lock:
+            self.freelancer_skills.pop(email, None)
+            return self.freelancers.remove(email)
+
+    def compact(self):
+        with self.lock:
+            self.jobs.compact()
+            self.freelancers.compact()
+            index = self.search_index
+            index.postings = {word: set(docs) for word, docs in index.postings.items()}
+            index.doc_words = dict(index.doc_words)
+            index.trigrams.postings = {gram: set(w) for gram, w in index.trigrams.postings.items()}
+            index.trigrams.sizes = dict(index.trigrams.sizes)
+
+    def skills_for(self, email):
+        with self.lock:
+            return ", ".join(self.freelancer_skills.get(email, []))
+
+    @property
+    def search_generation(self):
+        return self.search_index.generation
+
+    def search_jobs(self, query, within=None):
+        """(sorted matching job ids, index generation) for a keyword query."""
+        with self.lock:
+            return self.search_index.search(query, within), self.search_index.generation
+
+    def fuzzy_search_jobs(self, query, threshold=FUZZY_THRESHOLD):
+        """[(job id, score)] for a keyword query that may contain typos."""
+        with self.lock:
+            return self.search_index.fuzzy_search(query, threshold)
+
+    def recommend_jobs(self, skills, k=10):
+        """Top-k (job_id, score) for a free-text skills string."""
+        with self.lock:
+            return self.jobs.top_k(tokenize(skills), k)
+
+    def recommend_freelancers(self, job_id, k=10):
+        """Top-k (freelancer_email, score) for an indexed job."""
+        with self.lock:
+            terms = self.jobs.doc_terms.get(job_id)
+            if not terms:
+                return []
+            return self.freelancers.top_k(terms, k)
@@ -0,0 +1,269 @@
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+# One schema change. steps maps a backend name to the statements that
+# apply it; every migration runs in a single transaction together with
+# the SchemaVersion row recording it, so it is applied fully or not at all.
+Migration = namedtuple("Migration", "version description steps")
+
+VERSION_TABLE = {
+    "sqlserver": """
+        IF NOT EXISTS (SELECT * FROM sys.tables WHERE name='SchemaVersion')
+        CREATE TABLE SchemaVersion (
+            version INT PRIMARY KEY,
+            description VARCHAR(200),
+            applied_at DATETIME DEFAULT GETDATE()
+        )
+    """,
+    "sqlite": """
+        CREATE TABLE IF NOT EXISTS SchemaVersion (
+            version INTEGER PRIMARY KEY,
+            description VARCHAR(200),
+            applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+}
+
+
+def _sqlserver_index(name, table, definition):
+    return f"""
+        IF NOT EXISTS (SELECT * FROM sys.indexes
+                       WHERE name='{name}' AND object_id=OBJECT_ID('{table}'))
+        CREATE INDEX {name} ON {table}{definition}
+    """
+
+
+def _sqlserver_foreign_key(name, table, definition):
+    # WITH NOCHECK keeps rows that predate the constraint (e.g. applications
+    # of jobs deleted long ago); new rows and cascades are still enforced
+    return f"""
+        IF NOT EXISTS (SELECT * FROM sys.foreign_keys WHERE name='{name}')
+        ALTER TABLE {table} WITH NOCHECK ADD CONSTRAINT {name} {definition}
+    """
+
+
+def _sqlite_rebuild(table, create_sql, columns):
+    # SQLite cannot add a constraint to an existing table: build the new
+    # shape, copy the rows (ids included), carry over the AUTOINCREMENT
+    # counter and swap the tables
+    new = f"{table}_new"
+    cols = ", ".join(columns)
+    return [
+        create_sql.format(table=new),
+        f"INSERT INTO {new}({cols}) SELECT {cols} FROM {table}",
+        f"DELETE FROM sqlite_sequence WHERE name='{new}'",
+        f"INSERT INTO sqlite_sequence(name, seq) SELECT '{new}', seq FROM sqlite_sequence WHERE name='{table}'",
+        f"DROP TABLE {table}",
+        f"ALTER TABLE {new} RENAME TO {table}",
+    ]
+
+
+MIGRATIONS = [
+    Migration(1, "base tables", {
+        "sqlserver": [
+            """
+            IF NOT EXISTS (SELECT * FROM sys.tables WHERE name='Users')
+            CREATE TABLE Users (
+                id INT IDENTITY PRIMARY KEY,
+                fullname VARCHAR(100),
+                email VARCHAR(100) UNIQUE,
+                password VARCHAR(100),
+                role VARCHAR(20)
+            )
+            """,
+            """
+            IF NOT EXISTS (SELECT * FROM sys.tables WHERE name='Jobs')
+            CREATE TABLE Jobs (
+                id INT IDENTITY PRIMARY KEY,
+                title VARCHAR(200),
+                description TEXT,
+                budget INT,
+                category VARCHAR(50),
+                client_email VARCHAR(100)
+            )
+            """,
+            """
+            IF NOT EXISTS (SELECT * FROM sys.tables WHERE name='Applications')
+            CREATE TABLE Applications (
+                id INT IDENTITY PRIMARY KEY,
+                job_id INT,
+                freelancer_email VARCHAR(100),
+                freelancer_name VARCHAR(100),
+                skills VARCHAR(200)
+            )
+            """,
+            # search support: category filter index
+            _sqlserver_index("IX_Jobs_category", "Jobs", "(category)"),
+            # client dashboard: jobs owned by one client
+            _sqlserver_index("IX_Jobs_client_email", "Jobs",
+                             "(client_email) INCLUDE (title, budget, category)"),
+        ],
+        "sqlite": [
+            """
+            CREATE TABLE IF NOT EXISTS Users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                fullname VARCHAR(100),
+                email VARCHAR(100) UNIQUE,
+                password VARCHAR(100),
+                role VARCHAR(20)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS Jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title VARCHAR(200),
+                description TEXT,
+                budget INT,
+                category VARCHAR(50),
+                client_email VARCHAR(100)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS Applications (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id INT,
+                freelancer_email VARCHAR(100),
+                freelancer_name VARCHAR(100),
+                skills VARCHAR(200)
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS IX_Jobs_category ON Jobs(category)",
+            "CREATE INDEX IF NOT EXISTS IX_Jobs_client_email ON Jobs(client_email)",
+        ],
+    }),
+
+    Migration(2, "application lookup indexes", {
+        "sqlserver": [
+            _sqlserver_index("IX_Applications_job_id", "Applications", "(job_id)"),
+            _sqlserver_index("IX_Applications_freelancer_email", "Applications",
+                             "(freelancer_email)"),
+        ],
+        "sqlite": [
+            "CREATE INDEX IF NOT EXISTS IX_Applications_job_id ON Applications(job_id)",
+            "CREATE INDEX IF NOT EXISTS IX_Applications_freelancer_email "
+            "ON Applications(freelancer_email)",
+        ],
+    }),
+
+    # deleting a user removes their jobs, deleting a job its applications;
+    # renaming a client's email carries their jobs along
+    Migration(3, "cascading foreign keys", {
+        "sqlserver": [
+            _sqlserver_foreign_key(
+                "FK_Jobs_Users", "Jobs",
+                "FOREIGN KEY (client_email) REFERENCES Users(email) "
+                "ON DELETE CASCADE ON UPDATE CASCADE"),
+            _sqlserver_foreign_key(
+                "FK_Applications_Jobs", "Applications",
+                "FOREIGN KEY (job_id) REFERENCES Jobs(id) ON DELETE CASCADE"),
+        ],
+        "sqlite": _sqlite_rebuild("Jobs", """
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title VARCHAR(200),
+                description TEXT,
+                budget INT,
+                category VARCHAR(50),
+                client_email VARCHAR(100)
+                    REFERENCES Users(email) ON DELETE CASCADE ON UPDATE CASCADE
+            )
+        """, ("id", "title", "description", "budget", "category", "client_email")) + [
+            "CREATE INDEX IX_Jobs_category ON Jobs(category)",
+            "CREATE INDEX IX_Jobs_client_email ON Jobs(client_email)",
+        ] + _sqlite_rebuild("Applications", """
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id INT REFERENCES Jobs(id) ON DELETE CASCADE,
+                freelancer_email VARCHAR(100),
+                freelancer_name VARCHAR(100),
+                skills VARCHAR(200)
+            )
+        """, ("id", "job_id", "freelancer_email", "freelancer_name", "skills")) + [
+            "CREATE INDEX IX_Applications_job_id ON Applications(job_id)",
+            "CREATE INDEX IX_Applications_freelancer_email ON Applications(freelancer_email)",
+        ],
+    }),
+
+    # budget range filters and sorting by budget, with or without a category
+    Migration(4, "budget indexes", {
+        "sqlserver": [
+            _sqlserver_index("IX_Jobs_budget", "Jobs",
+                             "(budget) INCLUDE (title, category, client_email)"),
+            _sqlserver_index("IX_Jobs_category_budget", "Jobs", "(category, budget)"),
+        ],
+        "sqlite": [
+            "CREATE INDEX IF NOT EXISTS IX_Jobs_budget ON Jobs(budget)",
+            "CREATE INDEX IF NOT EXISTS IX_Jobs_category_budget ON Jobs(category, budget)",
+        ],
+    }),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+# a marker per database records the schema version this machine last
+# brought it to, so later starts skip the schema round trips entirely
+MARKER_DIR = os.path.join(os.path.expanduser("~"), ".fjms")
+
+
+def marker_path(backend, marker_dir=MARKER_DIR):
+    digest = hashlib.sha1(backend.location.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(marker_dir, f"schema-{backend.name}-{digest}.json")
+
+
+def read_marker(backend, marker_dir=MARKER_DIR):
+    if marker_dir is None:
+        return None
+    if backend.name == "sqlite" and not os.path.exists(backend.location):
+        return None     # database file deleted since: start from scratch
+    try:
+        with open(marker_path(backend, marker_dir), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_marker(backend, marker_dir=MARKER_DIR, **data):
+    if marker_dir is None:
+        return
+    try:
+        os.makedirs(marker_dir, exist_ok=True)
+        with open(marker_path(backend, marker_dir), "w", encoding="utf-8") as f:
+            json.dump(dict(data, version=SCHEMA_VERSION), f)
+    except OSError:
+        pass     # no marker just means checking again next start
+
+
+def current_version(db):
+    with db._cursor(commit=True) as cur:
+        cur.execute(VERSION_TABLE[db.backend.name])
+        cur.execute("SELECT MAX(version) FROM SchemaVersion")
+        row = cur.fetchone()
+        return row[0] or 0
+
+
+def migrate(db, migrations=MIGRATIONS):
+    """Apply every migration newer than the recorded version, in order.
+
+    Safe to call on every start: applied versions are skipped, and two
+    processes racing on the same version cannot both record it (the
+    version is the primary key), so the loser rolls back. Returns the
+    versions applied by this call.
+    """
+    applied = []
+    version = current_version(db)
+    for migration in migrations:
+        if migration.version <= version:
+            continue
+        try:
+            with db.pool.connection() as conn:
+                with db.backend.migration(conn) as cur:
+                    for sql in migration.steps[db.backend.name]:
+                        cur.execute(sql)
+                    cur.execute("INSERT INTO SchemaVersion(version, description) VALUES (?, ?)",
+                                (migration.version, migration.description))
+        except Exception as e:
+            raise Exception(f"Migration {migration.version} ({migration.description}) Failed: {e}")
+        applied.append(migration.version)
+    return applied
@@ -0,0 +1,253 @@
+from collections import namedtuple
+
+from batch_matching import BatchMatcher
+from database import JOB_SORT_COLUMNS
+
+ROLES = ("Client", "Freelancer")
+CATEGORIES = ("Technical", "Writing", "Design", "Business", "Other")
+
+# the admin account is not stored in Users
+ADMIN_EMAIL = "admin@gmail.com"
+ADMIN_PASSWORD = "admin123"
+
+PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+# who is making a request: the email and role they logged in with
+Session = namedtuple("Session", "email role")
+
+
+class ServiceError(Exception):
+    """Invalid input or a broken business rule; the message is user-facing."""
+
+
+class AuthError(ServiceError):
+    """Not logged in, or logged in with the wrong role."""
+
+
+class NotFound(ServiceError):
+    pass
+
+
+# ------------------------------
+# Validation (no database access)
+# ------------------------------
+def validate_user(fullname, email, password, role):
+    if not fullname or not email or not password or not role:
+        raise ServiceError("All fields are required!")
+    if "@" not in email or "." not in email:
+        raise ServiceError("Invalid email format")
+    if len(password) < 6:
+        raise ServiceError("Password must be at least 6 characters")
+    if role not in ROLES:
+        raise ServiceError("Please select a role")
+
+
+def validate_login(email, password, role):
+    if not email or not password or not role:
+        raise ServiceError("All login fields are required.")
+
+
+def validate_job(title, description, budget):
+    if not title or not description or not str(budget).strip():
+        raise ServiceError("All fields must be filled to post a job.")
+    if not str(budget).strip().isdigit():
+        raise ServiceError("Budget must be a numeric value.")
+    return int(budget)
+
+
+def validate_budget_range(min_budget, max_budget):
+    """(min, max) as ints, None where left blank."""
+    bounds = []
+    for value in (min_budget, max_budget):
+        value = str(value if value is not None else "").strip()
+        if value and not value.isdigit():
+            raise ServiceError("Budget must be a numeric value.")
+        bounds.append(int(value) if value else None)
+    if None not in bounds and bounds[0] > bounds[1]:
+        raise ServiceError("Minimum budget cannot be above the maximum.")
+    return tuple(bounds)
+
+
+def parse_sort(sort):
+    # "budget" sorts ascending, "-budget" descending; blank keeps id order
+    sort = str(sort or "id").strip()
+    column = sort.lstrip("-")
+    if column not in JOB_SORT_COLUMNS:
+        raise ServiceError(f"Jobs can be sorted by: {', '.join(JOB_SORT_COLUMNS)}")
+    return column, sort.startswith("-")
+
+
+def validate_application(name, skills):
+    if not name:
+        raise ServiceError("Name is required.")
+    if not skills:
+        raise ServiceError("Skills are required.")
+
+
+def require_role(session, *roles, action=None):
+    # action completes "You must be logged in as a Client to ..."
+    if session is None or not session.email or session.role not in roles:
+        who = " or ".join(f"an {r}" if r[0] in "AEIOU" else f"a {r}" for r in roles)
+        raise AuthError(f"You must be logged in as {who}"
+                        + (f" to {action}." if action else "."))
+
+
+def page_size(limit, default=PAGE_SIZE):
+    if limit is None:
+        return default
+    limit = int(limit)
+    if limit < 1:
+        raise ServiceError("limit must be positive")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+# ------------------------------
+# Services
+# ------------------------------
+class Services:
+    """The FJMS operations, independent of any user interface.
+
+    Both the Tkinter app and the HTTP API (api.py) go through this class,
+    so validation, role checks and ownership rules live in one place.
+    get_matcher, if given, returns the MatchingEngine used for
+    recommendations (built lazily by the caller).
+    """
+
+    def __init__(self, db, get_matcher=None):
+        self.db = db
+        self.get_matcher = get_matcher
+
+    # ---- accounts
+    def register(self, fullname, email, password, role):
+        fullname, email, password, role = (str(v or "").strip()
+                                           for v in (fullname, email, password, role))
+        validate_user(fullname, email, password, role)
+        self.db.register_user(fullname, email, password, role)
+        return Session(email, role)
+
+    def login(self, email, password, role):
+        email, password, role = (str(v or "").strip() for v in (email, password, role))
+        validate_login(email, password, role)
+        if role == "Admin":
+            if email == ADMIN_EMAIL and password == ADMIN_PASSWORD:
+                return Session(email, role)
+            raise AuthError("Incorrect admin credentials.")
+        if not self.db.validate_login(email, password, role):
+            raise AuthError("No such user. Please register first.")
+        return Session(email, role)
+
+    # ---- jobs
+    def browse_jobs(self, after_id=0, limit=None):
+        return self.db.get_jobs_page(after_id or 0, page_size(limit))
+
+    def search_jobs(self, keyword=None, category=None, after_id=None, limit=None,
+                    min_budget=None, max_budget=None, sort=None, offset=0):
+        min_budget, max_budget = validate_budget_range(min_budget, max_budget)
+        order_by, descending = parse_sort(sort)
+        if order_by != "id" or descending:
+            after_id = None     # sorted results page by offset
+        return self.db.search_jobs(keyword, category, limit=page_size(limit), offset=offset,
+                                   after_id=after_id, min_budget=min_budget,
+                                   max_budget=max_budget, order_by=order_by,
+                                   descending=descending)
+
+    def job_facets(self, keyword=None):
+        return self.db.get_job_facets(keyword)
+
+    def recommend_jobs(self, skills=None, k=50, session=None):
+        if self.get_matcher is None:
+            raise ServiceError("Recommendations are not available.")
+        engine = self.get_matcher()
+        # fall back to the skills from the freelancer's past applications
+        query = str(skills or "").strip()
+        if not query and session is not None:
+            query = engine.skills_for(session.email)
+        if not query:
+            raise ServiceError("Enter your skills (or apply to a job) to get recommendations.")
+        k = int(k)
+        if k < 1:
+            raise ServiceError("k must be positive")
+        ranked = engine.recommend_jobs(query, min(k, MAX_PAGE_SIZE))
+        return self.db.get_jobs_by_ids([job_id for job_id, _ in ranked])
+
+    def post_job(self, session, title, description, budget, category):
+        require_role(session, "Client", action="post jobs")
+        title = str(title or "").strip()
+        description = str(description or "").strip()
+        budget = validate_job(title, description, budget)
+        if category not in CATEGORIES:
+            raise ServiceError("Please select a category")
+        return self.db.insert_job(title, description, budget, category, session.email)
+
+    def client_jobs(self, session):
+        require_role(session, "Client", action="see your jobs")
+        return self.db.get_jobs_by_client(session.email, with_counts=True)
+
+    def _owned_job(self, session, job_id):
+        rows = self.db.get_jobs_by_ids([int(job_id)])
+        if not rows:
+            raise NotFound("Job not found.")
+        if session.role != "Admin" and rows[0][5] != session.email:
+            raise AuthError("You can only manage your own jobs.")
+        return rows[0]
+
+    def delete_job(self, session, job_id):
+        require_role(session, "Client", "Admin", action="delete jobs")
+        self._owned_job(session, job_id)
+        self.db.delete_job(int(job_id))
+
+    def applicants(self, session, job_id):
+        require_role(session, "Client", "Admin", action="see applicants")
+        self._owned_job(session, job_id)
+        return self.db.get_applications(int(job_id))
+
+    # ---- applications
+    def apply(self, session, job_ids, name, skills):
+        require_role(session, "Freelancer")
+        name = str(name or "").strip()
+        skills = str(skills or "").strip()
+        validate_application(name, skills)
+        job_ids = [int(j) for j in job_ids]
+        if not job_ids:
+            raise ServiceError("Select a job first.")
+        return self.db.insert_applications([(j, session.email, name, skills) for j in job_ids])
+
+    # ---- admin
+    def list_users(self, session):
+        require_role(session, "Admin")
+        return self.db.get_all_users()
+
+    def all_applications(self, session):
+        require_role(session, "Admin")
+        return self.db.get_applications_with_titles()
+
+    def all_jobs_page(self, session, after_id=0, limit=None):
+        require_role(session, "Admin")
+        return self.db.get_job_summaries_page(after_id or 0, page_size(limit))
+
+    def match_report(self, session, k):
+        """({job_id: title}, {job_id: [(email, score), ...]}): the k best
+        applicants for every job."""
+        require_role(session, "Admin")
+        matcher = BatchMatcher.from_database(self.db, k=k)
+        return dict(zip(matcher.job_ids, matcher.job_titles)), matcher.run()
+
+    def get_user(self, session, user_id):
+        require_role(session, "Admin")
+        user = self.db.get_user_by_id(int(user_id))
+        if not user:
+            raise NotFound("User not found in database!")
+        return user
+
+    def delete_user(self, session, user_id):
+        require_role(session, "Admin")
+        if not self.db.delete_user(int(user_id)):
+            raise NotFound("User could not be deleted (not found).")
+
+    def update_user(self, session, user_id, fullname, email, password, role):
+        require_role(session, "Admin")
+        fullname, email, password, role = (str(v or "").strip()
+                                           for v in (fullname, email, password, role))
+        validate_user(fullname, email, password, role)
+        return self.db.update_user(int(user_id), fullname, email, password, role)
@@ -1,8 +1,33 @@
+import json
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 import tkinter as tk
 
 import main
+import batch_matching
+import benchmark
+from backends import SqlServerBackend, SqliteBackend, backend_from_config
+from batch_matching import BatchMatcher
+import bulk
+from api import Api
+from async_database import AsyncDatabase
+from cache import CachedDatabase
+from database import BUDGET_BUCKETS, ConnectionPool, Database
+import migrations
+from events import EventBus, JOB_DELETED, JOB_INSERTED, USER_REGISTERED
+from indexer import Indexer
+import instrumentation
+import job_store
+from job_store import ADMIN_COLUMNS, FREELANCER_COLUMNS, JobStore
+from matching import IncrementalSearch, MatchingEngine
+from services import (ADMIN_EMAIL, CATEGORIES, AuthError, NotFound, ServiceError, Services,
+                      Session)
+from worker import InlineExecutor, TaskRunner
 
 class MockDB:
     def __init__(self):
@@ -35,6 +60,65 @@ class MockDB:
     def get_jobs(self):
         return list(self.jobs)
 
+    def get_jobs_page(self, after_id=0, page_size=200):
+        return [j for j in self.jobs if j[0] > (after_id or 0)][:page_size]
+
+    def get_job_summaries_page(self, after_id=0, page_size=200):
+        return [(j[0], j[1], None) + tuple(j[3:]) for j in self.get_jobs_page(after_id, page_size)]
+
+    def get_job_descriptions(self, job_ids):
+        wanted = set(job_ids)
+        return {j[0]: j[2] for j in self.jobs if j[0] in wanted}
+
+    def get_job_facets(self, keyword=None):
+        rows = self.search_jobs(keyword)
+        categories = {}
+        for j in rows:
+            categories[j[4]] = categories.get(j[4], 0) + 1
+        highs = [b - 1 for b in BUDGET_BUCKETS[1:]] + [None]
+        return {"total": len(rows), "categories": categories,
+                "budgets": [(low, high, sum(1 for j in rows if j[3] >= low
+                                            and (high is None or j[3] <= high)))
+                            for low, high in zip(BUDGET_BUCKETS, highs)]}
+
+    def get_jobs_by_ids(self, job_ids):
+        by_id = {j[0]: j for j in self.jobs}
+        return [by_id[j] for j in job_ids if j in by_id]
+
+    def get_applications_page(self, after_id=0, page_size=1000):
+        return [a for a in self.applications if a[0] > (after_id or 0)][:page_size]
+
+    def get_all_applications(self):
+        return [(a[1], a[2], a[3], a[4]) for a in self.applications]
+
+    def get_jobs_by_client(self, email, with_counts=False):
+        rows = []
+        for j in self.jobs:
+            if j[5] != email:
+                continue
+            if with_counts:
+                count = sum(1 for a in self.applications if a[1] == j[0])
+                rows.append((j[0], j[1], j[3], j[4], count))
+            else:
+                rows.append((j[0], j[1], j[3], j[4]))
+        return rows
+
+    def search_jobs(self, keyword=None, category=None, limit=None, offset=0, after_id=None,
+                    min_budget=None, max_budget=None, order_by="id", descending=False):
+        keyword = (keyword or "").lower()
+        rows = [
+            j for j in self.jobs
+            if j[0] > (after_id or 0)
+            and (not keyword or keyword in j[1].lower() or keyword in j[2].lower())
+            and (not category or category == "All" or j[4] == category)
+            and (min_budget is None or j[3] >= min_budget)
+            and (max_budget is None or j[3] <= max_budget)
+        ]
+        column = {"id": 0, "budget": 3, "category": 4}[order_by]
+        rows.sort(key=lambda j: (j[column], j[0]), reverse=descending)
+        end = None if limit is None else offset + limit
+        return rows[offset:end]
+
     def delete_job(self, job_id):
         before = len(self.jobs)
         self.jobs = [j for j in self.jobs if j[0] != job_id]
@@ -45,6 +129,9 @@ class MockDB:
         self.applications.append(app)
         return app
 
+    def insert_applications(self, batch):
+        return [self.insert_application(*a)[0] for a in batch]
+
     def get_applications(self, job_id):
         return [
             (a[3], a[4])   # name, skills
@@ -52,6 +139,16 @@ class MockDB:
             if a[1] == job_id
         ]
     
+    def get_applications_with_titles(self):
+        titles = {j[0]: j[1] for j in self.jobs}
+        return [
+            (a[1], titles.get(a[1], "(Deleted Job)"), a[2], a[3], a[4])
+            for a in self.applications
+        ]
+
+    def get_user_by_id(self, user_id):
+        return next((u for u in self.users if u[0] == user_id), None)
+
     def delete_user(self, user_id):
         before = len(self.users)
         self.users = [u for u in self.users if u[0] != user_id]
@@ -67,6 +164,9 @@ class MockDB:
                 return True
         return False
 
+    def close(self):
+        self.closed = True
+
 
 class AppUnitTests(unittest.TestCase):
     def setUp(self):
@@ -83,14 +183,20 @@ class AppUnitTests(unittest.TestCase):
         self.patcher_err = patch('main.messagebox.showerror', autospec=True)
         self.mock_msgerr = self.patcher_err.start()
 
-        # Create the app instance (Tk window will be created but we'll hide it)
-        self.app = main.App()
+        # Create the app instance (Tk window will be created but we'll hide it);
+        # the inline executor runs DB work synchronously so asserts see results
+        self.app = main.App(executor=InlineExecutor())
         try:
             # hide the main window so tests run headless
             self.app.withdraw()
         except Exception:
             pass
 
+    def login_admin(self):
+        # the admin actions go through Services, which check the role
+        self.app.current_role = "Admin"
+        self.app.current_user_email = ADMIN_EMAIL
+
     def tearDown(self):
         # destroy app and stop patchers
         try:
@@ -197,6 +303,137 @@ class AppUnitTests(unittest.TestCase):
         rows = fpage.freelancer_job_table.get_children()
         self.assertEqual(len(rows), 1)  # Only 1 job should match
 
+    def test_search_jobs_filters_by_category(self):
+        self.mock_db_inst.insert_job("Python Dev", "coding in python", 200, "Technical", "c@c.com")
+        self.mock_db_inst.insert_job("Python Blog", "write about python", 80, "Writing", "c@c.com")
+
+        fpage = self.app.freelancer_page
+        fpage.search_entry.delete(0, tk.END)
+        fpage.search_entry.insert(0, "python")
+        fpage.filter_var.set("Writing")
+
+        fpage.search_jobs()
+
+        rows = fpage.freelancer_job_table.get_children()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(fpage.freelancer_job_table.item(rows[0], "values")[1], "Python Blog")
+
+    def test_budget_filter_and_sortable_columns(self):
+        for budget in (200, 80, 500):
+            self.mock_db_inst.insert_job("Python Dev", "coding", budget, "Technical", "c@c.com")
+
+        fpage = self.app.freelancer_page
+        fpage.min_budget_entry.insert(0, "100")
+        fpage.sort_jobs("Budget")
+        fpage.sort_jobs("Budget")      # second click reverses
+
+        table = fpage.freelancer_job_table
+        budgets = [str(table.item(i, "values")[3]) for i in table.get_children()]
+        self.assertEqual(budgets, ["500", "200"])
+        self.assertTrue(table.heading("Budget", "text").endswith("▼"))
+
+        # with a keyword the database filters and sorts
+        fpage.search_entry.insert(0, "python")
+        fpage.sort_jobs("ID")
+        self.assertEqual([int(table.item(i, "values")[0]) for i in table.get_children()], [1, 3])
+
+    def test_filters_show_counts_from_the_jobs(self):
+        self.mock_db_inst.insert_job("Python Dev", "coding", 200, "Technical", "c@c.com")
+        self.mock_db_inst.insert_job("Python Blog", "writing", 80, "Writing", "c@c.com")
+        self.mock_db_inst.insert_job("Logo", "design", 900, "Design", "c@c.com")
+
+        fpage = self.app.freelancer_page
+        self.assertEqual(list(fpage.category_box["values"])[:2], ["All (3)", "Design (1)"])
+        self.assertIn("100-499 (1)", fpage.budget_box["values"])
+
+        fpage.search_entry.insert(0, "python")
+        fpage.search_jobs()
+        self.assertEqual(list(fpage.category_box["values"]),
+                         ["All (2)", "Technical (1)", "Writing (1)"])
+
+        fpage.filter_var.set("Writing (1)")
+        fpage.budget_var.set("0-99 (1)")
+        fpage.pick_budget_range()
+        table = fpage.freelancer_job_table
+        self.assertEqual([table.item(i, "values")[1] for i in table.get_children()], ["Python Blog"])
+        self.assertEqual(fpage.max_budget_entry.get(), "99")
+
+    def test_job_table_keeps_only_visible_rows(self):
+        for i in range(50):
+            self.mock_db_inst.insert_job(f"Job {i}", "d" * 1000, 10, "Other", "c@c.com")
+
+        fpage = self.app.freelancer_page
+        fpage.refresh_jobs()
+        table, view = fpage.freelancer_job_table, fpage.freelancer_pager.view
+        visible = len(table.get_children())
+        self.assertEqual(len(view), 50)
+        self.assertLess(visible, 50)
+        self.assertLess(len(table.item(table.get_children()[0], "values")[2]), 1000)
+
+        # rows are recycled on scroll and the selection follows its row
+        table.selection_set(table.get_children()[0])
+        view.scroll_to(50)
+        self.assertEqual(len(table.get_children()), visible)
+        self.assertEqual(table.item(table.get_children()[-1], "values")[1], "Job 49")
+        self.assertEqual(table.selection(), ())
+        self.assertEqual([v[1] for v in fpage.freelancer_pager.selected_values()], ["Job 0"])
+
+    def test_live_search_narrows_with_keyword_index(self):
+        self.mock_db_inst.insert_job("Python Dev", "coding in python", 200, "Technical", "c@c.com")
+        self.mock_db_inst.insert_job("Python Blog", "write about python", 80, "Writing", "c@c.com")
+        self.mock_db_inst.insert_job("Logo", "brand work", 50, "Design", "c@c.com")
+
+        fpage = self.app.freelancer_page
+        fpage.search_entry.insert(0, "py")
+        fpage.search_jobs()                     # SQL search; builds the index meanwhile
+        self.assertIsNotNone(self.app.matcher)
+
+        fpage.search_entry.insert(tk.END, "th")
+        fpage.filter_var.set("Writing")
+        fpage.search_if_changed()
+
+        table = fpage.freelancer_job_table
+        self.assertEqual([table.item(i, "values")[1] for i in table.get_children()], ["Python Blog"])
+        self.assertEqual(fpage._live_search.last[2], [1, 2])
+
+        # a typo finds nothing by prefix, so the closest matches are shown
+        fpage.search_entry.delete(0, tk.END)
+        fpage.search_entry.insert(0, "pyhton")
+        fpage.filter_var.set("All")
+        fpage.search_if_changed()
+        self.assertEqual([table.item(i, "values")[1] for i in table.get_children()],
+                         ["Python Dev", "Python Blog"])
+
+    def test_live_search_finds_jobs_posted_elsewhere(self):
+        self.mock_db_inst.insert_job("Python Dev", "coding in python", 200, "Technical", "c@c.com")
+        fpage = self.app.freelancer_page
+        fpage.search_entry.insert(0, "py")
+        fpage.search_jobs()                     # builds the index
+        self.assertIsNotNone(self.app.matcher)
+
+        # another desktop posts a job: no event reaches this process
+        self.mock_db_inst.insert_job("Python Blog", "write about python", 80, "Writing", "x@x.com")
+        fpage.search_entry.insert(tk.END, "th")
+        fpage.search_if_changed()
+
+        table = fpage.freelancer_job_table
+        self.assertEqual([table.item(i, "values")[1] for i in table.get_children()],
+                         ["Python Dev", "Python Blog"])
+
+    def test_recommended_jobs_ranked_by_skills(self):
+        self.mock_db_inst.insert_job("Logo design", "brand identity work", 100, "Design", "c@c.com")
+        self.mock_db_inst.insert_job("Django developer", "python django rest api", 300, "Technical", "c@c.com")
+        self.mock_db_inst.insert_job("Blog writer", "weekly articles", 50, "Writing", "c@c.com")
+
+        fpage = self.app.freelancer_page
+        fpage.skills_entry.insert(0, "python, django")
+        fpage.show_recommended()
+
+        rows = [fpage.freelancer_job_table.item(iid, "values")
+                for iid in fpage.freelancer_job_table.get_children()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][1], "Django developer")
+
     def test_add_job_requires_client(self):
         cp = self.app.client_page
         # not logged in as client
@@ -261,10 +498,41 @@ class AppUnitTests(unittest.TestCase):
         self.assertEqual(app_record[2], "freelancer@example.com")
         self.assertEqual(app_record[3], "Freelancer Joe")
 
+    def test_login_screen_ready_without_building_dashboards(self):
+        self.assertLess(self.app.time_to_login_ms, main.STARTUP_TARGET_MS)
+        self.assertEqual(self.app._pages, {})
+        self.assertIs(self.app.db, self.mock_db_inst)
+
+    def test_closing_the_window_closes_the_database(self):
+        self.app.destroy()
+        self.assertTrue(self.mock_db_inst.closed)
+
+    @patch("main.notify")
+    def test_apply_to_several_selected_jobs_in_one_batch(self, mock_notify):
+        fpage = self.app.freelancer_page
+        iids = []
+        for title in ("Logo", "Banner", "Flyer"):
+            job = self.mock_db_inst.insert_job(title, "d", 50, "Design", "cli@example.com")
+            iids.append(fpage.freelancer_job_table.insert("", "end", values=job[:5]))
+        fpage.freelancer_job_table.selection_set(iids[0], iids[2])
+        self.app.current_user_email = "freelancer@example.com"
+        self.app.current_role = "Freelancer"
+
+        with patch.object(self.mock_db_inst, "insert_applications",
+                          wraps=self.mock_db_inst.insert_applications) as batch_insert:
+            job_ids = [int(fpage.freelancer_job_table.item(i, "values")[0])
+                       for i in fpage.freelancer_job_table.selection()]
+            fpage.submit_applications(job_ids, "Joe", "Photoshop")
+
+        batch_insert.assert_called_once()
+        self.assertEqual([a[1] for a in self.mock_db_inst.applications], [1, 3])
+        mock_notify.assert_called_once_with("2 applications submitted!")
+
     def test_admin_delete_job_removes_job(self):
         # insert job
         job = self.mock_db_inst.insert_job("TestDel", "desc", 50, "Other", "a@a.com")
         jid = job[0]
+        self.login_admin()
         # refresh admin job table so it shows the job
         self.app.admin_page.show_jobs()
         # find row and select it
@@ -325,6 +593,7 @@ class AppUnitTests(unittest.TestCase):
     def test_admin_delete_user(self):
         # Add users (register via mock DB)
         u = self.mock_db_inst.register_user("A", "a@a.com", "p", "Client")
+        self.login_admin()
         # refresh admin view
         self.app.admin_page.show_users()
 
@@ -339,6 +608,18 @@ class AppUnitTests(unittest.TestCase):
         # DB should not contain this user
         self.assertFalse(any(user[0] == u[0] for user in self.mock_db_inst.users))
 
+    def test_admin_show_applications_uses_joined_titles(self):
+        job = self.mock_db_inst.insert_job("Logo", "Make a logo", 100, "Design", "c@c.com")
+        self.mock_db_inst.insert_application(job[0], "f@f.com", "Fay", "Illustrator")
+        self.mock_db_inst.insert_application(99, "g@g.com", "Gus", "Figma")
+        self.login_admin()
+
+        self.app.admin_page.show_applications()
+
+        table = self.app.admin_page.admin_app_table
+        titles = [table.item(iid, "values")[1] for iid in table.get_children()]
+        self.assertEqual(titles, ["Logo", "(Deleted Job)"])
+
     def test_apply_without_selecting_job(self):
         fpage = self.app.freelancer_page
         # ensure no selection
@@ -367,10 +648,26 @@ class AppUnitTests(unittest.TestCase):
         # Treeview should now be empty
         self.assertEqual(len(self.app.client_page.client_job_table.get_children()), 0)
 
+    def test_client_table_shows_only_own_jobs_with_counts(self):
+        mine = self.mock_db_inst.insert_job("Mine", "d", 10, "Other", "me@c.com")
+        self.mock_db_inst.insert_job("Theirs", "d", 10, "Other", "them@c.com")
+        self.mock_db_inst.insert_application(mine[0], "f@f.com", "F", "S")
+        self.app.current_role = "Client"
+        self.app.current_user_email = "me@c.com"
+
+        self.app.client_page.refresh_job_tables()
+
+        table = self.app.client_page.client_job_table
+        rows = [table.item(iid, "values") for iid in table.get_children()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][1], "Mine")
+        self.assertEqual(int(rows[0][4]), 1)
+
     def test_admin_edit_user_updates_db(self):
         # Add a user via mock DB
         user = self.mock_db_inst.register_user("Old Name", "old@mail.com", "pw", "Client")
         uid = user[0]
+        self.login_admin()
 
         # Refresh admin view
         self.app.admin_page.show_users()
@@ -410,5 +707,978 @@ class AppUnitTests(unittest.TestCase):
                 self.assertEqual(updated_user[4], "Client")
 
 
+class MatchingEngineTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = MatchingEngine()
+        self.engine.add_job(1, "Python developer", "build a django backend")
+        self.engine.add_job(2, "Logo designer", "illustrator and photoshop")
+        self.engine.add_job(3, "Data analyst", "python pandas reporting")
+
+    def test_recommend_jobs_ranks_best_match_first(self):
+        ranked = self.engine.recommend_jobs("python, django", k=2)
+        self.assertEqual([job_id for job_id, _ in ranked], [1, 3])
+
+    def test_removed_job_is_not_recommended(self):
+        self.engine.remove_job(1)
+        ranked = self.engine.recommend_jobs("django", k=5)
+        self.assertEqual(ranked, [])
+
+    def test_recommend_freelancers_for_job(self):
+        self.engine.add_application("ann@x.com", "Photoshop, Illustrator")
+        self.engine.add_application("bob@x.com", "Python, Django")
+        ranked = self.engine.recommend_freelancers(2, k=1)
+        self.assertEqual(ranked[0][0], "ann@x.com")
+
+    def test_prefix_search_matches_partial_words(self):
+        self.assertEqual(self.engine.search_jobs("pyt")[0], [1, 3])
+        self.assertEqual(self.engine.search_jobs("python pan")[0], [3])
+        self.assertEqual(self.engine.search_jobs("and")[0], [2])     # stopwords are searchable
+        self.engine.remove_job(3)
+        self.assertEqual(self.engine.search_jobs("python")[0], [1])
+
+    def test_incremental_search_narrows_previous_matches(self):
+        live = IncrementalSearch(self.engine)
+        self.assertEqual(live.search("p"), [1, 2, 3])
+        with patch.object(self.engine.search_index, "_docs_with_prefix") as full_scan:
+            self.assertEqual(live.search("pyth"), [1, 3])
+            self.assertEqual(live.search("python dj"), [1])
+        full_scan.assert_not_called()
+
+        # a newly indexed job is not missed by narrowing
+        self.engine.add_job(4, "Python tutor", "teach")
+        self.assertEqual(live.search("python t"), [4])
+
+    def test_fuzzy_search_tolerates_typos(self):
+        self.engine.add_job(4, "Web development", "react frontend")
+        self.assertEqual([j for j, _ in self.engine.fuzzy_search_jobs("pyhton")], [1, 3])
+        self.assertEqual([j for j, _ in self.engine.fuzzy_search_jobs("web-dev")], [4])
+        ranked = self.engine.fuzzy_search_jobs("pyhton djnago")
+        self.assertEqual([j for j, _ in ranked], [1])
+        self.assertLess(ranked[0][1], 1.0)
+        self.assertEqual(self.engine.fuzzy_search_jobs("pyhton", threshold=0.9), [])
+
+        # incremental, and kept in snapshots
+        self.engine.remove_job(1)
+        self.engine.remove_job(3)
+        self.assertNotIn("python", self.engine.search_index.trigrams.sizes)
+        restored = pickle.loads(pickle.dumps(self.engine))
+        self.assertEqual([j for j, _ in restored.fuzzy_search_jobs("devlopment")], [4])
+
+
+class JobStoreTests(unittest.TestCase):
+    def test_repeated_strings_are_stored_once(self):
+        store = JobStore(ADMIN_COLUMNS)
+        store.extend((i, f"Job {i}", None, 10 * i, CATEGORIES[i % 3], f"c{i % 3}@c.com")
+                     for i in range(1, 10001))
+
+        self.assertEqual(len(store), 10000)
+        self.assertEqual((len(store.clients), len(store.categories)), (3, 3))
+        self.assertEqual(store.values(4), (5, "Job 5", 50, CATEGORIES[2], "c2@c.com"))
+        self.assertEqual(len(store.select(CATEGORIES[1])), 3334)
+        self.assertEqual(len(store.select("Unknown")), 0)
+
+    def test_sorted_selections_reuse_one_sort(self):
+        store = JobStore(ADMIN_COLUMNS)
+        store.extend([(1, "A", None, 300, "IT", "c@c.com"), (2, "B", None, 50, "Design", "c@c.com"),
+                      (3, "C", None, 120, "IT", "c@c.com"), (4, "D", None, 120, "Design", "c@c.com")])
+
+        view = store.select(min_budget=100, order_by="budget", descending=True)
+        self.assertEqual([view.values(i)[0] for i in range(len(view))], [1, 4, 3])
+        order = store.order("budget")
+        view = store.select("IT", max_budget=200, order_by="budget")
+        self.assertIs(store.order("budget"), order)
+        self.assertEqual([view.values(i)[0] for i in range(len(view))], [3])
+        view = store.select(order_by="category")
+        self.assertEqual([view.values(i)[0] for i in range(len(view))], [2, 4, 1, 3])
+
+        store.extend([(5, "E", None, 10, "IT", "c@c.com")])
+        self.assertEqual(store.select(order_by="budget").values(0)[0], 5)
+
+    def test_missing_category_and_budget_sort_and_filter_like_sql(self):
+        store = JobStore(ADMIN_COLUMNS)
+        store.extend([(1, "A", None, 300, "IT", "c@c.com"), (2, "B", None, None, None, "c@c.com"),
+                      (3, "C", None, 0, "Design", "c@c.com")])
+
+        view = store.select(order_by="category")
+        self.assertEqual([view.values(i)[0] for i in range(len(view))], [2, 3, 1])
+        view = store.select(order_by="budget")
+        self.assertEqual([view.values(i)[:3] for i in range(len(view))],
+                         [(2, "B", None), (3, "C", 0), (1, "A", 300)])
+        for order_by in (None, "budget"):
+            view = store.select(max_budget=100, order_by=order_by)
+            self.assertEqual([view.values(i)[0] for i in range(len(view))], [3])
+
+    def test_descriptions_load_once_per_row_and_stay_bounded(self):
+        requested = []
+        store = JobStore(FREELANCER_COLUMNS, load_descriptions=requested.append)
+        store.extend((i, f"Job {i}", None, 10, "IT", "c@c.com") for i in range(1, 5001))
+
+        store.prefetch(0, 3)
+        store.prefetch(1, 4)
+        self.assertEqual(requested, [[1, 2, 3], [4]])
+        self.assertEqual(store.values(0)[2], job_store.LOADING)
+
+        store.add_descriptions({i: "x" * 1000 for i in range(1, 5001)})
+        self.assertEqual(len(store.descriptions), job_store.DESCRIPTION_CACHE)
+        self.assertEqual(len(store.values(4999)[2]), job_store.DESCRIPTION_CHARS)
+        store.prefetch(0, 1)                # evicted, so asked for again
+        self.assertEqual(requested[-1], [1])
+
+    def test_view_prefetches_its_own_rows(self):
+        requested = []
+        store = JobStore(FREELANCER_COLUMNS, load_descriptions=requested.extend)
+        store.extend([(1, "A", "first", 10, "IT", "c@c.com"), (2, "B", None, 20, "Design", "c@c.com"),
+                      (3, "C", None, 30, "IT", "c@c.com")])
+
+        view = store.select("IT")
+        view.prefetch(0, len(view))
+
+        self.assertEqual(requested, [3])
+        self.assertEqual([view.values(i)[:3] for i in range(len(view))],
+                         [(1, "A", "first"), (3, "C", job_store.LOADING)])
+
+
+class IndexerTests(unittest.TestCase):
+    class EventDB(MockDB):
+        def __init__(self):
+            super().__init__()
+            self.events = EventBus()
+
+        def insert_job(self, title, desc, budget, category, client_email):
+            job = super().insert_job(title, desc, budget, category, client_email)
+            self.events.publish(JOB_INSERTED, job_id=job[0], title=title, description=desc,
+                                budget=budget, category=category, client_email=client_email)
+            return job
+
+        def delete_job(self, job_id):
+            super().delete_job(job_id)
+            self.events.publish(JOB_DELETED, job_id=job_id)
+
+        def get_job_ids(self):
+            return [j[0] for j in self.jobs]
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.snapshot = os.path.join(self.tmpdir.name, "index.pickle")
+        self.db = self.EventDB()
+        self.db.insert_job("Python developer", "django backend", 100, "Technical", "c@c.com")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_events_update_index_incrementally(self):
+        indexer = Indexer(self.db, snapshot_path=self.snapshot)
+        engine = indexer.start()
+
+        job = self.db.insert_job("Logo designer", "photoshop", 50, "Design", "c@c.com")
+        self.db.delete_job(1)
+        indexer.flush()
+
+        self.assertEqual(engine.recommend_jobs("django"), [])
+        self.assertEqual(engine.recommend_jobs("photoshop")[0][0], job[0])
+        indexer.stop()
+
+    def test_snapshot_restart_catches_up(self):
+        indexer = Indexer(self.db, snapshot_path=self.snapshot)
+        indexer.start()
+        indexer.stop()
+        self.assertTrue(os.path.exists(self.snapshot))
+
+        # changes made while no indexer was running
+        self.db.jobs = []
+        self.db.jobs.append((2, "Copywriter", "seo articles", 20, "Writing", "c@c.com"))
+
+        engine = Indexer(self.db, snapshot_path=self.snapshot).start()
+        self.assertEqual(engine.recommend_jobs("django"), [])
+        self.assertEqual(engine.recommend_jobs("seo")[0][0], 2)
+
+    def test_failed_build_unsubscribes(self):
+        indexer = Indexer(self.db, snapshot_path=self.snapshot)
+        with patch.object(self.db, "get_jobs_page", side_effect=Exception("server gone")):
+            with self.assertRaises(Exception):
+                indexer.start()
+        self.assertIsNone(indexer._unsubscribe)
+
+        self.db.insert_job("Logo designer", "photoshop", 50, "Design", "c@c.com")
+        self.assertTrue(indexer.queue.empty())
+
+    def test_catch_up_without_prune_reads_only_new_rows(self):
+        engine = Indexer(self.db, snapshot_path=self.snapshot).load_or_build()
+        MockDB.insert_job(self.db, "Copywriter", "seo articles", 20, "Writing", "c@c.com")  # no event
+
+        with patch.object(self.db, "get_job_ids") as id_scan:
+            engine.catch_up(self.db, prune=False)
+        id_scan.assert_not_called()
+        self.assertEqual(engine.search_jobs("seo")[0], [2])
+
+    def test_snapshot_is_not_reused_for_another_database(self):
+        def sqlite_db(name, title):
+            with patch("builtins.print"):
+                db = Database(SqliteBackend(os.path.join(self.tmpdir.name, name)),
+                              marker_dir=None)
+            db.register_user("C", "c@c.com", "secret", "Client")
+            db.insert_job(title, "d", 10, "IT", "c@c.com")
+            return db
+
+        first = sqlite_db("a.db", "Python developer")
+        indexer = Indexer(first, snapshot_dir=self.tmpdir.name)
+        indexer.start()
+        indexer.stop()
+        first.close()
+
+        other = sqlite_db("b.db", "Logo designer")
+        indexer = Indexer(other, snapshot_dir=self.tmpdir.name)
+        engine = indexer.start()
+        indexer.stop(save=False)
+        other.close()
+        self.assertEqual([j for j, _ in engine.recommend_jobs("logo")], [1])
+        self.assertEqual(engine.recommend_jobs("python"), [])
+
+        # the same file recreated: same location, different jobs
+        os.remove(os.path.join(self.tmpdir.name, "a.db"))
+        again = sqlite_db("a.db", "Copywriter")
+        indexer = Indexer(again, snapshot_dir=self.tmpdir.name)
+        engine = indexer.start()
+        indexer.stop(save=False)
+        again.close()
+        self.assertEqual(engine.recommend_jobs("python"), [])
+        self.assertEqual([j for j, _ in engine.recommend_jobs("copywriter")], [1])
+
+
+@unittest.skipIf(batch_matching.np is None, "numpy not installed")
+class BatchMatcherTests(unittest.TestCase):
+    def test_blocked_run_matches_single_block(self):
+        def build(budget_mb):
+            m = BatchMatcher(k=2, memory_budget_mb=budget_mb, workers=2)
+            m.add_job(1, "Python developer", "django rest api")
+            m.add_job(2, "Logo designer", "illustrator branding")
+            m.add_job(3, "Data analyst", "python pandas sql")
+            m.add_applicant("ann@x.com", "Illustrator, Photoshop")
+            m.add_applicant("bob@x.com", "Python, Django")
+            m.add_applicant("cat@x.com", "SQL, pandas")
+            return m.run()
+
+        whole = build(64)
+        # a tiny budget forces one row per block
+        blocked = build(0.00001)
+        self.assertEqual(whole[1][0][0], "bob@x.com")
+        self.assertEqual(whole[2][0][0], "ann@x.com")
+        self.assertEqual(whole[3][0][0], "cat@x.com")
+        for job_id in whole:
+            self.assertEqual([e for e, _ in whole[job_id]], [e for e, _ in blocked[job_id]])
+
+    def test_memory_does_not_grow_with_workers(self):
+        import random
+        import tracemalloc
+
+        words = [f"w{i}" for i in range(2000)]
+
+        def peak_mb(workers):
+            rng = random.Random(1)
+            m = BatchMatcher(k=5, memory_budget_mb=2, workers=workers)
+            for i in range(1500):
+                m.add_job(i, "t", " ".join(rng.choices(words, k=20)))
+                m.add_applicant(f"a{i}", " ".join(rng.choices(words, k=10)))
+            tracemalloc.start()
+            try:
+                report = m.run()
+                return tracemalloc.get_traced_memory()[1] / 2 ** 20, report
+            finally:
+                tracemalloc.stop()
+
+        one, report_one = peak_mb(1)
+        eight, report_eight = peak_mb(8)
+        self.assertEqual(report_one, report_eight)
+        self.assertLess(eight, one * 1.5)
+
+
+class CachedDatabaseTests(unittest.TestCase):
+    class CountingDB(IndexerTests.EventDB):
+        def __init__(self):
+            super().__init__()
+            self.calls = 0
+
+        def get_jobs_by_client(self, email, with_counts=False):
+            self.calls += 1
+            return super().get_jobs_by_client(email, with_counts)
+
+        def get_applications(self, job_id):
+            self.calls += 1
+            return super().get_applications(job_id)
+
+        def get_jobs_page(self, after_id=0, page_size=200):
+            self.calls += 1
+            return super().get_jobs_page(after_id, page_size)
+
+    def setUp(self):
+        self.db = self.CountingDB()
+        self.cache = CachedDatabase(self.db, ttl=60)
+
+    def test_repeated_reads_hit_cache(self):
+        self.cache.get_jobs_by_client("c@c.com")
+        self.cache.get_jobs_by_client("c@c.com")
+        self.assertEqual(self.db.calls, 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_write_invalidates_affected_reads_only(self):
+        self.cache.get_applications(7)
+        self.cache.get_jobs_by_client("c@c.com")
+        self.cache.insert_job("New", "d", 10, "Other", "c@c.com")
+        self.cache.get_applications(7)     # untouched by a job insert
+        jobs = self.cache.get_jobs_by_client("c@c.com")
+        self.assertEqual(self.db.calls, 3)
+        self.assertEqual(len(jobs), 1)
+
+    def test_expired_entries_are_refetched(self):
+        self.cache.ttl = 0
+        self.cache.get_jobs_by_client("c@c.com")
+        self.cache.get_jobs_by_client("c@c.com")
+        self.assertEqual(self.db.calls, 2)
+
+    def test_user_list_is_cached_until_a_user_registers(self):
+        with patch.object(self.db, "get_all_users", wraps=self.db.get_all_users) as read:
+            self.cache.get_all_users()
+            self.cache.get_all_users()
+            self.db.register_user("A", "a@a.com", "secret", "Client")
+            self.db.events.publish(USER_REGISTERED, email="a@a.com", role="Client")
+            users = self.cache.get_all_users()
+        self.assertEqual(read.call_count, 2)
+        self.assertEqual([u[2] for u in users], ["a@a.com"])
+
+    def test_table_scans_are_not_kept(self):
+        self.db.insert_job("Job", "d", 10, "Other", "c@c.com")
+        self.cache.get_jobs_page(0, 1000)
+        self.cache.get_jobs_page(0, 1000)
+        self.assertEqual(self.db.calls, 2)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+
+class TaskRunnerTests(unittest.TestCase):
+    class FakeWidget:
+        def __init__(self):
+            self.scheduled = []
+
+        def after(self, ms, fn):
+            self.scheduled.append(fn)
+
+    def test_newer_task_with_same_key_supersedes_older(self):
+        from concurrent.futures import ThreadPoolExecutor
+        import threading
+
+        widget = self.FakeWidget()
+        runner = TaskRunner(widget, executor=ThreadPoolExecutor(max_workers=2))
+        release = threading.Event()
+        results = []
+
+        first = runner.submit(lambda: release.wait(5) and "old", results.append, key="search")
+        second = runner.submit(lambda: "new", results.append, key="search")
+        second.result(timeout=5)
+        release.set()
+        first.result(timeout=5)
+
+        while widget.scheduled:
+            widget.scheduled.pop(0)()
+
+        self.assertEqual(results, ["new"])
+        self.assertFalse(runner.busy)
+        runner.shutdown()
+
+    def test_errors_are_routed_to_on_error(self):
+        errors = []
+        runner = TaskRunner(self.FakeWidget(), executor=InlineExecutor())
+
+        runner.submit(lambda: 1 / 0, on_error=errors.append)
+
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], ZeroDivisionError)
+
+
+class ConnectionPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.connect = MagicMock(side_effect=lambda: MagicMock(name="conn"))
+
+    def test_checkout_times_out_when_pool_is_exhausted(self):
+        pool = ConnectionPool(self.connect, max_size=1, timeout=0.05)
+        conn = pool.checkout()
+        with self.assertRaises(Exception) as ctx:
+            pool.checkout()
+        self.assertIn("Timed out", str(ctx.exception))
+
+        # a slot freed by another thread unblocks the waiter
+        threading.Timer(0.02, pool.checkin, [conn]).start()
+        pool._timeout = 5
+        self.assertIs(pool.checkout(), conn)
+
+    def test_connection_returns_to_lifo_after_clean_use(self):
+        pool = ConnectionPool(self.connect, max_size=2)
+        with pool.connection() as first:
+            with pool.connection() as second:
+                pass
+        with pool.connection() as conn:
+            self.assertIs(conn, first)         # last checked in, first reused
+        self.assertEqual(self.connect.call_count, 2)
+        self.assertIsNot(first, second)
+        first.close.assert_not_called()
+
+    def test_idle_connection_is_health_checked(self):
+        pool = ConnectionPool(self.connect, health_check_after=60)
+        with patch("database.time.monotonic", return_value=1000.0):
+            with pool.connection() as conn:
+                pass
+        with patch("database.time.monotonic", return_value=1059.0):
+            with pool.connection() as reused:
+                pass
+        conn.cursor.assert_not_called()
+        self.assertIs(reused, conn)
+
+        with patch("database.time.monotonic", return_value=1200.0):
+            with pool.connection() as reused:
+                pass
+        conn.cursor.return_value.execute.assert_called_once_with("SELECT 1")
+        self.assertIs(reused, conn)
+
+        # a connection the server dropped while idle is replaced
+        conn.cursor.side_effect = Exception("08S01 link failure")
+        with patch("database.time.monotonic", return_value=1400.0):
+            with pool.connection() as fresh:
+                pass
+        self.assertIsNot(fresh, conn)
+        conn.close.assert_called_once()
+        self.assertEqual(self.connect.call_count, 2)
+
+    def test_disconnected_connection_is_discarded(self):
+        pool = ConnectionPool(self.connect, is_disconnect=lambda e: "08S01" in str(e))
+        with self.assertRaises(Exception):
+            with pool.connection() as conn:
+                raise Exception("08S01 communication link failure")
+        conn.close.assert_called_once()
+
+        with pool.connection() as fresh:
+            pass
+        self.assertIsNot(fresh, conn)
+        self.assertEqual(self.connect.call_count, 2)
+
+        # other errors keep the connection
+        with self.assertRaises(Exception):
+            with pool.connection() as conn:
+                raise Exception("syntax error")
+        with pool.connection() as reused:
+            self.assertIs(reused, conn)
+        conn.close.assert_not_called()
+
+
+class SqliteDatabaseTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with patch("builtins.print"):
+            self.db = Database(SqliteBackend(os.path.join(self.tmp.name, "fjms.db")),
+                               marker_dir=self.tmp.name)
+        self.db.register_user("Client", "c@c.com", "secret", "Client")   # owns the jobs
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_backend_selected_from_config(self):
+        backend = backend_from_config({"FJMS_DB_BACKEND": "sqlite", "FJMS_SQLITE_PATH": "x.db"})
+        self.assertIsInstance(backend, SqliteBackend)
+        self.assertEqual(backend.path, "x.db")
+        with self.assertRaises(Exception):
+            backend_from_config({"FJMS_DB_BACKEND": "oracle"})
+
+    def test_search_and_paging(self):
+        first = self.db.insert_job("Python developer", "Build APIs", 100, "IT", "c@c.com")
+        self.db.insert_job("Logo designer", "Brand work", 50, "Design", "c@c.com")
+
+        self.assertEqual([r[0] for r in self.db.search_jobs("pyth")], [first])
+        self.assertEqual([r[1] for r in self.db.search_jobs(category="Design")], ["Logo designer"])
+        self.assertEqual(len(self.db.get_jobs_page(0, 1)), 1)
+        self.assertEqual(len(self.db.get_jobs_page(first, 10)), 1)
+
+    def test_budget_range_and_sort_are_served_by_indexes(self):
+        for budget, category in ((300, "IT"), (50, "Design"), (120, "IT"), (120, "Design")):
+            self.db.insert_job("Job", "d", budget, category, "c@c.com")
+
+        rows = self.db.search_jobs(min_budget=100, order_by="budget", descending=True)
+        self.assertEqual([(r[0], r[3]) for r in rows], [(1, 300), (4, 120), (3, 120)])
+        rows = self.db.search_jobs(category="IT", max_budget=200, order_by="budget")
+        self.assertEqual([r[0] for r in rows], [3])
+        self.assertEqual([r[0] for r in self.db.search_jobs(order_by="category", limit=2, offset=1)],
+                         [4, 1])
+
+        with self.db._cursor() as cur:
+            cur.execute("EXPLAIN QUERY PLAN SELECT * FROM Jobs WHERE budget >= 100 "
+                        "ORDER BY budget DESC, id DESC LIMIT 200")
+            plan = " ".join(str(r[-1]) for r in cur.fetchall())
+        self.assertIn("IX_Jobs_budget", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_facets_count_categories_and_budgets_and_follow_writes(self):
+        cached = CachedDatabase(self.db, ttl=60)
+        for title, budget, category in (("Python dev", 50, "IT"), ("Python blog", 700, "Writing"),
+                                        ("Logo", 9000, "Design"), ("Python api", 120, "IT")):
+            self.db.insert_job(title, "d", budget, category, "c@c.com")
+
+        facets = cached.get_job_facets("pyth")
+        self.assertEqual(facets["categories"], {"IT": 2, "Writing": 1})
+        self.assertEqual([b[2] for b in facets["budgets"]], [1, 1, 1, 0, 0])
+        self.assertEqual(facets["budgets"][-1][:2], (BUDGET_BUCKETS[-1], None))
+        self.assertIs(cached.get_job_facets("pyth"), facets)
+
+        cached.insert_job("Python ml", "d", 6000, "IT", "c@c.com")
+        facets = cached.get_job_facets("pyth")
+        self.assertEqual(facets["categories"]["IT"], 3)
+        self.assertEqual(facets["budgets"][-1][2], 1)
+        self.assertEqual(sum(cached.get_job_facets()["categories"].values()), 5)
+
+    def test_facets_leave_out_missing_categories_and_budgets(self):
+        self.db.insert_job("Python dev", "d", 50, "IT", "c@c.com")
+        self.db.insert_job("Python odd", "d", None, None, "c@c.com")
+        self.db.insert_job("Python legacy", "d", -5, "IT", "c@c.com")
+
+        facets = self.db.get_job_facets("pyth")
+
+        self.assertEqual(facets["total"], 3)
+        self.assertEqual(len(self.db.search_jobs("pyth", min_budget=0)), 1)
+        self.assertEqual(facets["categories"], {"IT": 2})
+        self.assertEqual([b[2] for b in facets["budgets"]], [1, 0, 0, 0, 0])
+
+    def test_job_summaries_leave_descriptions_to_a_second_query(self):
+        first = self.db.insert_job("Python developer", "Build APIs", 100, "IT", "c@c.com")
+        second = self.db.insert_job("Logo designer", "Brand work", 50, "Design", "c@c.com")
+
+        self.assertEqual(self.db.get_job_summaries_page(0, 10),
+                         [(first, "Python developer", None, 100, "IT", "c@c.com"),
+                          (second, "Logo designer", None, 50, "Design", "c@c.com")])
+        self.assertEqual(self.db.get_job_descriptions([second, 999]), {second: "Brand work"})
+
+    def test_keyword_of_quotes_only_falls_back_to_like(self):
+        quoted = self.db.insert_job('Say "hi"', "d", 10, "IT", "c@c.com")
+        self.db.insert_job("Plain", "d", 10, "IT", "c@c.com")
+
+        self.assertEqual([r[0] for r in self.db.search_jobs('"')], [quoted])
+        self.assertEqual(self.db.get_job_facets('"')["total"], 1)
+
+    def test_deletes_publish_events(self):
+        seen = []
+        self.db.events.subscribe(seen.append)
+        job_id = self.db.insert_job("Job", "d", 10, "IT", "c@c.com")
+        self.db.insert_application(job_id, "f@f.com", "F", "python")
+
+        self.assertTrue(self.db.delete_user(1))
+
+        self.assertEqual(seen[-1].data["job_ids"], [job_id])
+        self.assertEqual(self.db.get_jobs(), [])
+        self.assertEqual(self.db.get_all_applications(), [])
+
+    def test_bulk_import_rejects_bad_rows_and_export_streams(self):
+        src = os.path.join(self.tmp.name, "users.csv")
+        rejects = os.path.join(self.tmp.name, "rejects.jsonl")
+        with open(src, "w", newline="") as f:
+            f.write("fullname,email,password,role\n"
+                    "Ann,ann@x.com,secret1,Client\n"
+                    "Bob,,secret2,Client\n"
+                    "Cat,cat@x.com,secret3,Freelancer\n"
+                    "Ann Again,ann@x.com,secret4,Client\n")
+
+        result = bulk.import_file(self.db, "users", src, chunk_size=2, reject_path=rejects)
+
+        self.assertEqual((result["imported"], result["rejected"]), (2, 2))
+        with open(rejects) as f:
+            self.assertEqual([json.loads(line)["line"] for line in f], [3, 5])
+
+        out = os.path.join(self.tmp.name, "users.jsonl")
+        self.assertEqual(bulk.export_file(self.db, "users", out, fetch_size=1), 3)
+        with open(out) as f:
+            self.assertEqual([json.loads(line)["email"] for line in f],
+                             ["c@c.com", "ann@x.com", "cat@x.com"])
+
+    def test_insert_applications_is_one_batch_with_events(self):
+        seen = []
+        self.db.events.subscribe(seen.append)
+        job_ids = [self.db.insert_job(f"Job {n}", "d", 10, "IT", "c@c.com") for n in range(3)]
+        self.db.backend.max_params = 9      # force two statements: 2 rows + 1 row
+
+        ids = self.db.insert_applications([(j, "f@f.com", "F", "python") for j in job_ids])
+
+        self.assertEqual(len(set(ids)), 3)
+        apps = self.db.get_applications_page()
+        self.assertEqual([(a[0], a[1]) for a in apps], list(zip(ids, job_ids)))
+        self.assertEqual([e.data["application_id"] for e in seen[3:]], ids)
+
+    def test_jobs_by_ids_are_fetched_in_chunks(self):
+        job_ids = [self.db.insert_job(f"Job {n}", "d", 10, "IT", "c@c.com") for n in range(5)]
+        self.db.backend.max_params = 2
+
+        rows = self.db.get_jobs_by_ids(list(reversed(job_ids)) + [999])
+
+        self.assertEqual([r[0] for r in rows], list(reversed(job_ids)))
+
+    def test_batch_ids_follow_row_order_not_returned_values(self):
+        sql = SqlServerBackend.insert_ordered_returning("Applications", ("job_id", "skills"), rows=2)
+        self.assertEqual(sql, "INSERT INTO Applications(job_id, skills) OUTPUT INSERTED.id "
+                              "SELECT job_id, skills FROM (VALUES (?, ?, 0), (?, ?, 1)) "
+                              "AS v(job_id, skills, ordinal) ORDER BY ordinal")
+
+        job_id = self.db.insert_job("Job", "d", 10, "IT", "c@c.com")
+        # identical rows cannot be told apart by value
+        ids = self.db.insert_applications([(job_id, "f@f.com", "F", "s")] * 3)
+        self.assertEqual(ids, sorted(set(ids)))
+
+    def test_migrations_are_recorded_and_idempotent(self):
+        self.assertEqual(migrations.current_version(self.db), migrations.SCHEMA_VERSION)
+        self.assertEqual(migrations.migrate(self.db), [])
+
+    def test_schema_marker_skips_checks_on_next_start(self):
+        with patch("migrations.migrate") as migrate, patch("builtins.print"):
+            again = Database(SqliteBackend(self.db.backend.path), marker_dir=self.tmp.name)
+        again.close()
+        migrate.assert_not_called()
+        self.assertTrue(again.backend.fulltext_enabled)
+
+    def test_deleting_a_job_cascades_to_its_applications(self):
+        job_id = self.db.insert_job("Job", "d", 10, "IT", "c@c.com")
+        other = self.db.insert_job("Other", "d", 10, "IT", "c@c.com")
+        self.db.insert_applications([(job_id, "f@f.com", "F", "s"), (other, "g@g.com", "G", "s")])
+
+        self.db.delete_job(job_id)
+
+        self.assertEqual([a[0] for a in self.db.get_all_applications()], [other])
+
+    def test_upgrade_keeps_existing_rows(self):
+        path = os.path.join(self.tmp.name, "old.db")
+        conn = sqlite3.connect(path)
+        for sql in migrations.MIGRATIONS[0].steps["sqlite"]:
+            conn.execute(sql)
+        conn.execute("INSERT INTO Jobs(title, description, budget, category, client_email) "
+                     "VALUES ('Old', 'd', 5, 'IT', 'gone@x.com')")
+        conn.execute("INSERT INTO Applications(job_id, freelancer_email, freelancer_name, skills) "
+                     "VALUES (1, 'f@f.com', 'F', 's')")
+        conn.commit()
+        conn.close()
+
+        with patch("builtins.print"):
+            db = Database(SqliteBackend(path), marker_dir=self.tmp.name)
+        try:
+            self.assertEqual(migrations.current_version(db), migrations.SCHEMA_VERSION)
+            self.assertEqual([j[1] for j in db.get_jobs()], ["Old"])
+            self.assertEqual(len(db.get_all_applications()), 1)
+        finally:
+            db.close()
+
+
+class BenchmarkTests(unittest.TestCase):
+    def test_marketplace_is_reproducible_and_skewed(self):
+        market = benchmark.Marketplace(10, 200, 300, seed=7)
+        jobs = list(market.job_rows())
+        self.assertEqual(jobs, list(benchmark.Marketplace(10, 200, 300, seed=7).job_rows()))
+        self.assertEqual(len(list(market.user_rows())), 10)
+        self.assertEqual(len(list(market.application_rows())), 300)
+        categories = [job[3] for job in jobs]
+        self.assertGreater(categories.count(CATEGORIES[0]), categories.count(CATEGORIES[-1]))
+
+    def test_run_reports_every_hot_path(self):
+        with patch("builtins.print"):
+            report = benchmark.run(["small"], repeat=1)
+        results = json.loads(json.dumps(report))["scales"]["small"]["results"]
+        for name in ("get_jobs", "search_common_word", "login", "show_applications",
+                     "delete_user_cascade"):
+            self.assertEqual(results[name]["calls"], 1)
+        self.assertEqual(results["bulk_insert"]["Jobs"]["rows"], 1000)
+        self.assertEqual(list(benchmark.compare(report, report)), [])
+
+
+class ServicesTests(unittest.TestCase):
+    def setUp(self):
+        self.db = MockDB()
+        self.services = Services(self.db)
+        self.client = Session("c@c.com", "Client")
+
+    def test_post_job_checks_role_and_fields(self):
+        with self.assertRaises(AuthError):
+            self.services.post_job(Session("f@f.com", "Freelancer"), "T", "D", "10", "Design")
+        with self.assertRaises(ServiceError):
+            self.services.post_job(self.client, "T", "D", "ten", "Design")
+        with self.assertRaises(ServiceError):
+            self.services.post_job(self.client, "T", "D", "-5", "Design")
+
+        self.services.post_job(self.client, " T ", "D", "10", "Design")
+
+        self.assertEqual(self.db.jobs[0][1:], ("T", "D", 10, "Design", "c@c.com"))
+
+    def test_role_errors_name_the_action(self):
+        freelancer = Session("f@f.com", "Freelancer")
+        with self.assertRaisesRegex(AuthError, "as a Client to see your jobs"):
+            self.services.client_jobs(freelancer)
+        with self.assertRaisesRegex(AuthError, "as a Client or an Admin to delete jobs"):
+            self.services.delete_job(freelancer, 1)
+        with self.assertRaisesRegex(AuthError, "as an Admin\\.$"):
+            self.services.all_jobs_page(self.client)
+
+    def test_clients_can_only_delete_their_own_jobs(self):
+        job = self.db.insert_job("T", "D", 10, "Design", "other@c.com")
+        with self.assertRaises(AuthError):
+            self.services.delete_job(self.client, job[0])
+        self.services.delete_job(Session("admin@gmail.com", "Admin"), job[0])
+        self.assertEqual(self.db.jobs, [])
+
+    def test_admin_user_actions_need_the_admin_role(self):
+        user = self.db.register_user("A", "a@a.com", "secret", "Client")
+        admin = Session(ADMIN_EMAIL, "Admin")
+        with self.assertRaises(AuthError):
+            self.services.delete_user(self.client, user[0])
+
+        self.assertEqual(self.services.get_user(admin, user[0])[2], "a@a.com")
+        self.services.delete_user(admin, user[0])
+        with self.assertRaises(NotFound):
+            self.services.get_user(admin, user[0])
+
+    def test_recommendation_count_is_checked_and_capped(self):
+        engine = MagicMock()
+        engine.recommend_jobs.return_value = []
+        services = Services(self.db, get_matcher=lambda: engine)
+
+        with self.assertRaises(ServiceError):
+            services.recommend_jobs("python", k=0)
+        services.recommend_jobs("python", k=10 ** 6)
+        engine.recommend_jobs.assert_called_once_with("python", 1000)
+
+    def test_search_checks_budget_range_and_sort(self):
+        for budget in (50, 300, 120):
+            self.db.insert_job("T", "D", budget, "Design", "c@c.com")
+
+        rows = self.services.search_jobs(min_budget="100", sort="-budget")
+
+        self.assertEqual([r[3] for r in rows], [300, 120])
+        with self.assertRaises(ServiceError):
+            self.services.search_jobs(min_budget="500", max_budget="100")
+        with self.assertRaises(ServiceError):
+            self.services.search_jobs(sort="title")
+
+
+class InstrumentationTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with patch("builtins.print"):
+            self.db = Database(SqliteBackend(os.path.join(self.tmp.name, "fjms.db")),
+                               marker_dir=self.tmp.name)
+        self.instruments = instrumentation.instrument(self.db).instrumentation
+        self.db.register_user("Client", "c@c.com", "secret", "Client")
+        self.db.insert_job("Python developer", "Build APIs", 100, "Technical", "c@c.com")
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_calls_rows_and_bytes_per_method(self):
+        self.assertEqual(len(self.db.get_jobs()), 1)
+        self.assertEqual(len(list(self.db.iter_rows("Jobs"))), 1)
+        stats = self.instruments.metrics.snapshot()
+        self.assertEqual(stats["get_jobs"]["calls"], 1)
+        self.assertEqual(stats["get_jobs"]["rows"], 1)
+        self.assertEqual(stats["get_jobs"]["statements"], 1)
+        self.assertGreater(stats["get_jobs"]["fetched_bytes"], len("Python developer"))
+        self.assertEqual(stats["iter_rows"]["fetched_rows"], 1)
+        self.assertEqual(stats["register_user"]["calls"], 1)
+
+        with self.assertRaises(Exception):
+            self.db.bulk_insert("Nope", [()])
+        self.assertEqual(self.instruments.metrics.snapshot()["bulk_insert"]["errors"], 1)
+
+    def test_slow_query_log_and_trace(self):
+        self.instruments.slow_log.threshold_ms = 0
+        traces = []
+        self.instruments.on_trace.append(traces.append)
+        with self.instruments.trace("login"):
+            self.db.validate_login("c@c.com", "secret", "Client")
+        self.db.get_job_ids()
+
+        self.assertEqual([t.action for t in traces], ["login"])
+        self.assertEqual([q[0] for q in traces[0].queries], ["validate_login"])
+        entries = list(self.instruments.slow_log.entries)
+        self.assertEqual(entries[-2]["action"], "login")
+        self.assertEqual(entries[-1]["method"], "get_job_ids")
+        self.assertNotIn("action", entries[-1])
+
+    def test_slow_actions_are_logged(self):
+        self.instruments.slow_log.threshold_ms = 10 ** 6
+        self.instruments.on_trace.append(self.instruments.slow_log.record_action)
+        with self.instruments.trace("browse"):
+            self.db.get_jobs()
+        self.assertEqual(list(self.instruments.slow_log.entries), [])
+
+        self.instruments.slow_log.threshold_ms = 0
+        with self.instruments.trace("login"):
+            self.db.validate_login("c@c.com", "secret", "Client")
+        entry = self.instruments.slow_log.entries[-1]
+        self.assertEqual((entry["action"], entry["queries"]), ("login", 1))
+        self.assertEqual(entry["slowest"]["method"], "validate_login")
+
+    def test_prometheus_export(self):
+        self.db.get_jobs()
+        self.instruments.metrics.set_gauge("app_time_to_login_seconds", 0.25, "Startup.")
+        text = self.instruments.metrics.to_prometheus()
+        self.assertIn("# TYPE fjms_db_app_time_to_login_seconds gauge", text)
+        self.assertIn("fjms_db_app_time_to_login_seconds 0.25", text)
+        self.assertIn("# TYPE fjms_db_call_duration_seconds histogram", text)
+        self.assertIn('fjms_db_calls_total{method="get_jobs"} 1', text)
+        self.assertIn('fjms_db_call_duration_seconds_count{method="get_jobs"} 1', text)
+
+    def test_disabled_unless_configured(self):
+        db = object.__new__(Database)
+        self.assertIs(instrumentation.from_config(db, {}), db)
+        self.assertFalse(hasattr(db, "instrumentation"))
+        configured = instrumentation.from_config(self.db, {"FJMS_SLOW_QUERY_MS": "50"})
+        self.assertEqual(configured.instrumentation.slow_log.threshold_ms, 50)
+
+
+class AsyncDatabaseTests(unittest.TestCase):
+    SLOW_QUERY = ("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) "
+                  "SELECT COUNT(*) FROM c")      # never finishes on its own
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with patch("builtins.print"):
+            self.db = Database(SqliteBackend(os.path.join(self.tmp.name, "fjms.db")),
+                               marker_dir=self.tmp.name)
+        self.db.register_user("Client", "c@c.com", "secret", "Client")
+        self.adb = AsyncDatabase(self.db, max_workers=1, timeout=5)
+
+    def tearDown(self):
+        self.adb.close()
+        self.db.close()
+        self.tmp.cleanup()
+
+    def slow(self):
+        with self.db._cursor() as cur:
+            cur.execute(self.SLOW_QUERY)
+            return cur.fetchone()
+
+    def test_methods_are_coroutines(self):
+        import asyncio
+
+        async def scenario():
+            job_id = await self.adb.insert_job("Python dev", "APIs", 10, "IT", "c@c.com")
+            return job_id, await self.adb.search_jobs("python")
+
+        job_id, rows = asyncio.run(scenario())
+        self.assertEqual([r[0] for r in rows], [job_id])
+
+    def test_timeout_cancels_the_running_query(self):
+        import asyncio
+
+        async def scenario():
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.adb.run(self.slow, timeout=0.2)
+            # the only worker is free again because the statement was interrupted
+            return await self.adb.get_jobs(timeout=2)
+
+        self.assertEqual(asyncio.run(scenario()), [])
+
+    def test_cancelled_task_cancels_its_query(self):
+        import asyncio
+
+        async def scenario():
+            task = asyncio.ensure_future(self.adb.run(self.slow))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return await self.adb.get_job_ids(timeout=2)
+
+        self.assertEqual(asyncio.run(scenario()), [])
+
+
+class ApiTests(unittest.TestCase):
+    def setUp(self):
+        import asyncio
+        import threading
+
+        self.tmp = tempfile.TemporaryDirectory()
+        with patch("builtins.print"):
+            self.db = Database(SqliteBackend(os.path.join(self.tmp.name, "fjms.db")),
+                               marker_dir=self.tmp.name)
+        self.api = Api(Services(self.db), workers=4)
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(self.api.serve("127.0.0.1", 0))
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        import asyncio
+
+        async def stop():
+            self.server.close()
+            await self.server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(stop(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+        self.api.close()
+        self.db.close()
+        self.tmp.cleanup()
+
+    def request(self, conn, method, path, body=None, token=None):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        conn.request(method, path, json.dumps(body) if body is not None else None, headers)
+        resp = conn.getresponse()
+        data = resp.read()
+        return resp.status, json.loads(data) if data else None
+
+    def test_client_and_freelancer_flow(self):
+        import http.client
+
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        for name, email, role in (("Cli", "c@c.com", "Client"), ("Fay", "f@f.com", "Freelancer")):
+            status, _ = self.request(conn, "POST", "/register", {
+                "fullname": name, "email": email, "password": "secret1", "role": role})
+            self.assertEqual(status, 201)
+
+        _, login = self.request(conn, "POST", "/login",
+                                {"email": "c@c.com", "password": "secret1", "role": "Client"})
+        client = login["token"]
+        job = {"title": "Python dev", "description": "APIs", "budget": 100, "category": "Technical"}
+        self.assertEqual(self.request(conn, "POST", "/jobs", job)[0], 401)
+        status, created = self.request(conn, "POST", "/jobs", job, client)
+        self.assertEqual(status, 201)
+
+        _, login = self.request(conn, "POST", "/login",
+                                {"email": "f@f.com", "password": "secret1", "role": "Freelancer"})
+        freelancer = login["token"]
+        self.assertEqual(self.request(conn, "POST", "/jobs", job, freelancer)[0], 403)
+        _, found = self.request(conn, "GET", "/jobs/search?q=pyth")
+        self.assertEqual([j["id"] for j in found["jobs"]], [created["id"]])
+        _, facets = self.request(conn, "GET", "/jobs/facets?q=pyth")
+        self.assertEqual(facets["categories"], {"Technical": 1})
+        self.assertEqual(facets["budgets"][1], {"min": 100, "max": 499, "count": 1})
+        status, _ = self.request(conn, "POST", "/applications",
+                                 {"job_ids": [created["id"]], "name": "Fay", "skills": "python"},
+                                 freelancer)
+        self.assertEqual(status, 201)
+
+        _, mine = self.request(conn, "GET", "/my/jobs", token=client)
+        self.assertEqual(mine["jobs"][0]["applicants"], 1)
+        self.assertEqual(self.request(conn, "GET", "/nowhere")[0], 404)
+        conn.close()
+
+    def test_request_timeout_returns_504(self):
+        import http.client
+
+        def slow_page(after_id, limit):
+            with self.db._cursor() as cur:
+                cur.execute(AsyncDatabaseTests.SLOW_QUERY)
+                return cur.fetchall()
+
+        self.api.services.browse_jobs = slow_page
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        conn.request("GET", "/jobs", headers={"X-Request-Timeout": "0.2"})
+        self.assertEqual(conn.getresponse().status, 504)
+        conn.close()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,137 @@
+import itertools
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class InlineExecutor:
+    """Executor that runs every task immediately on the calling thread.
+
+    Used by the unit tests (and handy when debugging) so that TaskRunner
+    callbacks fire synchronously, exactly like the old blocking handlers.
+    """
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+class TaskRunner:
+    """Runs blocking work (DB calls) on a thread pool and hands the results
+    back to the Tk main loop.
+
+    Tk is not thread-safe, so workers never touch widgets: finished futures
+    are queued and drained by an after() poll on the main thread, which then
+    calls on_success(result) or on_error(exception).
+
+    Tasks submitted with a key supersede any earlier task with the same key:
+    the earlier one is cancelled if it has not started yet, and its result
+    is dropped if it has. This is what keeps a slow, stale search from
+    overwriting the results of a newer one.
+    """
+
+    def __init__(self, widget, executor=None, max_workers=4, poll_ms=25,
+                 on_busy=None, on_error=None):
+        self.widget = widget
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="fjms-worker")
+        self.poll_ms = poll_ms
+        self.on_busy = on_busy
+        self.on_error = on_error
+        self._done = queue.Queue()
+        self._latest = {}                 # key -> (generation, future)
+        self._counter = itertools.count(1)
+        self._pending = 0
+        self._polling = False
+        self._closed = False
+
+    @property
+    def busy(self):
+        return self._pending > 0
+
+    def submit(self, fn, on_success=None, on_error=None, key=None):
+        if self._closed:
+            return None
+        gen = next(self._counter)
+        if key is not None:
+            self.cancel(key)
+
+        future = self.executor.submit(fn)
+        task = (future, key, gen, on_success, on_error)
+        if key is not None:
+            self._latest[key] = (gen, future)
+        self._set_pending(self._pending + 1)
+
+        if future.done():
+            # inline executors (and very fast tasks) deliver immediately
+            self._deliver(task)
+        else:
+            future.add_done_callback(lambda f: self._done.put(task))
+            self._schedule_poll()
+        return future
+
+    def cancel(self, key):
+        """Supersede the in-flight task for key, if any."""
+        latest = self._latest.pop(key, None)
+        if latest is not None:
+            latest[1].cancel()
+
+    def shutdown(self):
+        self._closed = True
+        self._latest.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule_poll(self):
+        if not self._polling and not self._closed:
+            self._polling = True
+            self.widget.after(self.poll_ms, self._drain)
+
+    def _drain(self):
+        self._polling = False
+        if self._closed:
+            return
+        while True:
+            try:
+                task = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(task)
+        if self._pending:
+            self._schedule_poll()
+
+    def _deliver(self, task):
+        future, key, gen, on_success, on_error = task
+        self._set_pending(self._pending - 1)
+
+        if key is not None:
+            latest = self._latest.get(key)
+            if latest is None or latest[0] != gen:
+                return    # superseded by a newer task with the same key
+            del self._latest[key]
+        if future.cancelled():
+            return
+
+        try:
+            exc = future.exception()
+            if exc is not None:
+                handler = on_error or self.on_error
+                if handler:
+                    handler(exc)
+            elif on_success:
+                on_success(future.result())
+        except Exception as ex:
+            # a failing callback must not stall the rest of the queue
+            if self.on_error:
+                self.on_error(ex)
+
+    def _set_pending(self, value):
+        was_busy = self._pending > 0
+        self._pending = value
+        if self.on_busy and was_busy != (value > 0):
+            self.on_busy(value > 0)